@@ -4,28 +4,850 @@
 - ngrok을 통해 터널링하여 Render 백엔드에서 접근 가능
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import httpx
+import asyncio
+import hashlib
+import json
+import math
 import os
-from typing import Optional
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator, Literal
 import uvicorn
 
+# 설정
+class Settings:
+    OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    
+    # Ollama 백엔드 풀 (쉼표로 구분, 비어 있으면 OLLAMA_BASE_URL 하나만 사용)
+    OLLAMA_BACKENDS = [url.strip() for url in os.getenv("OLLAMA_BACKENDS", "").split(",") if url.strip()] or [OLLAMA_BASE_URL]
+    OLLAMA_PROBE_INTERVAL = float(os.getenv("OLLAMA_PROBE_INTERVAL", "10"))
+    OLLAMA_PROBE_TIMEOUT = float(os.getenv("OLLAMA_PROBE_TIMEOUT", "3"))
+    OLLAMA_EJECT_AFTER_FAILURES = int(os.getenv("OLLAMA_EJECT_AFTER_FAILURES", "2"))
+    OLLAMA_MODEL_LOAD_PENALTY = float(os.getenv("OLLAMA_MODEL_LOAD_PENALTY", "2"))  # 모델 미적재 노드 가중치 (대기 요청 수 환산)
+    OLLAMA_HEDGE_AFTER = float(os.getenv("OLLAMA_HEDGE_AFTER", "0"))  # 첫 토큰이 이 시간(초) 안에 없으면 다른 백엔드에 중복 요청 (0이면 사용 안 함)
+    
+    # Ollama 연결 풀 / 타임아웃 설정
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "60"))
+    
+    # 임베딩 모델 (컨텍스트 검색용)
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "nomic-embed-text")
+    
+    # 응답 캐시 설정
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"  # 켜면 같은 질문에 이전 답을 그대로 반환
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "86400"))
+    RESPONSE_CACHE_DISK_PATH = os.getenv("RESPONSE_CACHE_DISK_PATH", "")  # 비어 있으면 메모리만 사용
+    RESPONSE_CACHE_DISK_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_DISK_MAX_ENTRIES", "10000"))
+    
+    # 추론 스케줄러 설정 (백엔드당 Ollama 동시 생성 수 / 대기열 한도)
+    INFERENCE_SLOTS = int(os.getenv("INFERENCE_SLOTS", "1"))
+    INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "32"))
+    INFERENCE_MAX_QUEUE_PER_USER = int(os.getenv("INFERENCE_MAX_QUEUE_PER_USER", "4"))
+
+settings = Settings()
+
+# HTTP 클라이언트 풀 (업스트림별 공유 클라이언트, 앱 시작/종료 시 생성/정리)
+# >>> shared/upstream_clients.py 복사본 (직접 수정 금지 - shared/에서 고친 뒤 python shared/sync.py 실행)
+def http2_supported() -> bool:
+    """h2 패키지가 설치된 경우에만 HTTP/2 사용 (TLS 업스트림에서만 협상됨)"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class UpstreamClientPool:
+    """업스트림별로 keep-alive 연결을 재사용하는 httpx.AsyncClient 관리"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._limits: Dict[str, httpx.Limits] = {}
+        self._requests: Dict[str, int] = {}
+
+    def register(self, name: str, timeout: httpx.Timeout, limits: httpx.Limits, base_url: str = ""):
+        async def count_request(request: httpx.Request):
+            self._requests[name] += 1
+
+        self._requests[name] = 0
+        self._limits[name] = limits
+        self._clients[name] = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=limits,
+            http2=http2_supported(),
+            event_hooks={"request": [count_request]}
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None:
+            raise RuntimeError(f"HTTP 클라이언트 '{name}'이(가) 초기화되지 않았습니다")
+        return client
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """업스트림별 연결 풀 상태 (모니터링용)"""
+        result = {}
+        for name, client in self._clients.items():
+            pool = getattr(client._transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            limits = self._limits[name]
+            result[name] = {
+                "base_url": str(client.base_url) or None,
+                "http2_enabled": http2_supported(),
+                "requests_total": self._requests[name],
+                "connections": len(connections),
+                "idle_connections": sum(1 for conn in connections if conn.is_idle()),
+                "http2_connections": sum(
+                    1 for conn in connections if "HTTP/2" in conn.info()
+                ),
+                "max_connections": limits.max_connections,
+                "max_keepalive_connections": limits.max_keepalive_connections,
+                "keepalive_expiry": limits.keepalive_expiry
+            }
+        return result
+# <<< shared/upstream_clients.py
+
+def build_http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+    )
+
+http_clients = UpstreamClientPool()
+
+# Ollama 백엔드 풀 (대기 요청 수 + 모델 적재 여부 기준 라우팅, 헬스 프로브로 장애 노드 제외)
+def normalize_model_name(name: str) -> str:
+    return name if ":" in name else f"{name}:latest"
+
+class OllamaBackend:
+    """Ollama 서버 한 대의 상태 (대기 요청 수, 적재/보유 모델, 연속 실패 횟수)"""
+
+    def __init__(self, name: str, base_url: str):
+        self.name = name
+        self.base_url = base_url
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.loaded_models: set = set()
+        self.available_models: Optional[set] = None  # 첫 프로브 전에는 알 수 없음
+        self.avg_first_token_seconds: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+        self.last_probe_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return http_clients.get(self.name)
+
+    def has_model(self, model: str) -> bool:
+        return self.available_models is None or normalize_model_name(model) in self.available_models
+
+    def cost(self, model: str) -> float:
+        """라우팅 비용 - 대기 요청 수 + 모델을 새로 올려야 하면 가중치"""
+        penalty = 0.0 if normalize_model_name(model) in self.loaded_models else settings.OLLAMA_MODEL_LOAD_PENALTY
+        return self.outstanding + penalty
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "loaded_models": sorted(self.loaded_models),
+            "available_models": sorted(self.available_models) if self.available_models is not None else None,
+            "avg_first_token_seconds": round(self.avg_first_token_seconds, 3) if self.avg_first_token_seconds is not None else None,
+            "last_error": self.last_error
+        }
+
+class NoBackendAvailable(Exception):
+    pass
+
+class BackendPool:
+    """여러 Ollama 백엔드 중 요청을 보낼 노드 선택 및 주기적 헬스 프로브"""
+
+    def __init__(self, base_urls: List[str]):
+        self.backends = [OllamaBackend(f"ollama-{i + 1}", url) for i, url in enumerate(base_urls)]
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def register_clients(self):
+        for backend in self.backends:
+            http_clients.register(
+                backend.name,
+                base_url=backend.base_url,
+                timeout=httpx.Timeout(settings.OLLAMA_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+                limits=build_http_limits()
+            )
+
+    def pick(self, model: str, exclude: Tuple[str, ...] = ()) -> OllamaBackend:
+        """정상 노드 중 모델을 가진 노드를 우선, 그중 비용(대기 요청 + 적재 가중치)이 가장 낮은 노드 선택"""
+        candidates = [b for b in self.backends if b.healthy and b.name not in exclude]
+        if not candidates:
+            raise NoBackendAvailable("사용 가능한 Ollama 백엔드가 없습니다")
+        with_model = [b for b in candidates if b.has_model(model)]
+        candidates = with_model or candidates
+        return min(candidates, key=lambda b: (b.cost(model), b.avg_first_token_seconds or 0.0))
+
+    def pick_idle(self, model: str, exclude: Tuple[str, ...]) -> Optional[OllamaBackend]:
+        """헤징용 - 처리 중인 요청이 없는 다른 노드만 사용 (과부하 시 부하를 두 배로 늘리지 않도록)"""
+        try:
+            backend = self.pick(model, exclude)
+        except NoBackendAvailable:
+            return None
+        return backend if backend.outstanding == 0 else None
+
+    def acquire(self, backend: OllamaBackend):
+        backend.outstanding += 1
+        backend.requests += 1
+
+    def release(self, backend: OllamaBackend):
+        backend.outstanding -= 1
+
+    def healthy_backends(self) -> List[OllamaBackend]:
+        return [b for b in self.backends if b.healthy]
+
+    def record_success(self, backend: OllamaBackend):
+        backend.consecutive_failures = 0
+        backend.healthy = True
+
+    def record_failure(self, backend: OllamaBackend, error: str):
+        backend.failures += 1
+        backend.consecutive_failures += 1
+        backend.last_error = error
+        if backend.healthy and backend.consecutive_failures >= settings.OLLAMA_EJECT_AFTER_FAILURES:
+            backend.healthy = False
+            print(f"🚫 Ollama 백엔드 제외: {backend.base_url} ({error})")
+
+    def record_first_token(self, backend: OllamaBackend, seconds: float):
+        if backend.avg_first_token_seconds is None:
+            backend.avg_first_token_seconds = seconds
+        else:
+            backend.avg_first_token_seconds = 0.8 * backend.avg_first_token_seconds + 0.2 * seconds
+
+    async def probe(self, backend: OllamaBackend):
+        """적재된 모델(/api/ps)과 보유 모델(/api/tags) 조회 - 실패하면 연속 실패로 집계"""
+        try:
+            ps = await backend.client.get("/api/ps", timeout=settings.OLLAMA_PROBE_TIMEOUT)
+            tags = await backend.client.get("/api/tags", timeout=settings.OLLAMA_PROBE_TIMEOUT)
+            ps.raise_for_status()
+            tags.raise_for_status()
+        except Exception as e:
+            self.record_failure(backend, f"프로브 실패: {e!r}")
+            return
+        finally:
+            backend.last_probe_at = time.time()
+        backend.loaded_models = {normalize_model_name(m["name"]) for m in ps.json().get("models", [])}
+        backend.available_models = {normalize_model_name(m["name"]) for m in tags.json().get("models", [])}
+        if not backend.healthy:
+            print(f"✅ Ollama 백엔드 복구: {backend.base_url}")
+        self.record_success(backend)
+
+    async def probe_all(self):
+        await asyncio.gather(*(self.probe(backend) for backend in self.backends))
+
+    async def _probe_loop(self):
+        while True:
+            await self.probe_all()
+            await asyncio.sleep(settings.OLLAMA_PROBE_INTERVAL)
+
+    def start(self):
+        self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self):
+        if self._probe_task:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backends": {b.name: b.stats() for b in self.backends},
+            "healthy": len(self.healthy_backends()),
+            "hedge_after_seconds": settings.OLLAMA_HEDGE_AFTER,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins
+        }
+
+backend_pool = BackendPool(settings.OLLAMA_BACKENDS)
+
+# 응답 캐시 (모델 + 프롬프트 + 생성 옵션 기준, 메모리 LRU + 선택적 디스크 계층)
+class ResponseCache:
+    """동일한 추론 요청의 응답을 재사용하는 캐시
+
+    메모리 계층은 항목 수/바이트 수 한도를 넘으면 가장 오래 쓰지 않은 항목부터 지우고,
+    디스크 계층(SQLite 파일)은 재시작 후에도 캐시를 유지합니다. 두 계층 모두 TTL이 지나면 무효입니다.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, disk_path: str = "", disk_max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self.disk_max_entries = disk_max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._bytes = 0
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_lock = threading.Lock()
+        self._disk_writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Ollama 요청 본문(스트리밍 여부 제외)의 해시"""
+        material = {k: v for k, v in payload.items() if k != "stream"}
+        encoded = json.dumps(material, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def open(self):
+        if not self.disk_path:
+            return
+        self._disk = sqlite3.connect(self.disk_path, check_same_thread=False)
+        with self._disk_lock:
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._disk.execute("DELETE FROM response_cache WHERE expires_at < ?", (time.time(),))
+            self._disk.commit()
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._disk_lock:
+            row = self._disk.execute(
+                "SELECT expires_at, value FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+        return row
+
+    def _disk_set(self, key: str, value: str, expires_at: float):
+        with self._disk_lock:
+            self._disk.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._disk_writes += 1
+            if self._disk_writes % 100 == 0:
+                # 만료 항목 정리 및 최대 항목 수 유지
+                self._disk.execute("DELETE FROM response_cache WHERE expires_at < ?", (time.time(),))
+                self._disk.execute(
+                    "DELETE FROM response_cache WHERE key NOT IN ("
+                    "SELECT key FROM response_cache ORDER BY expires_at DESC LIMIT ?)",
+                    (self.disk_max_entries,)
+                )
+            self._disk.commit()
+
+    def _remember(self, key: str, expires_at: float, value: str):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous[1].encode("utf-8"))
+        self._entries[key] = (expires_at, value)
+        self._bytes += len(value.encode("utf-8"))
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.encode("utf-8"))
+            self.evictions += 1
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        now = time.time()
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+            self._bytes -= len(entry[1].encode("utf-8"))
+        
+        if self._disk is not None:
+            row = await asyncio.to_thread(self._disk_get, key)
+            if row is not None and row[0] > now:
+                self._remember(key, row[0], row[1])
+                self.disk_hits += 1
+                return row[1]
+        
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        expires_at = time.time() + self.ttl
+        self._remember(key, expires_at, value)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk_set, key, value, expires_at)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.execute("DELETE FROM response_cache")
+                self._disk.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "enabled": settings.RESPONSE_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "disk_path": self.disk_path or None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+        }
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    ttl=settings.RESPONSE_CACHE_TTL,
+    disk_path=settings.RESPONSE_CACHE_DISK_PATH,
+    disk_max_entries=settings.RESPONSE_CACHE_DISK_MAX_ENTRIES
+)
+
+# 추론 스케줄러 (동시 실행 슬롯 제한 + 사용자별 공정 대기열)
+class QueueFullError(Exception):
+    def __init__(self, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.retry_after = retry_after
+        self.detail = detail
+
+class InferenceScheduler:
+    """Ollama 동시 생성 수를 슬롯으로 제한하고, 대기 중인 요청은 사용자별 라운드로빈으로 깨움"""
+
+    def __init__(self, slots: int, max_queue: int, max_queue_per_user: int):
+        self.slots = slots
+        self.max_queue = max_queue
+        self.max_queue_per_user = max_queue_per_user
+        self.active = 0
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+        self._queued = 0
+        self.rejected = 0
+        self.admitted = 0
+        self.avg_generation_seconds = 10.0
+        self.avg_queue_wait_seconds = 0.0
+
+    def queue_depth(self, user: Optional[str] = None) -> int:
+        if user is not None:
+            return len(self._queues.get(user, ()))
+        return self._queued
+
+    def reserve(self, user: str) -> Optional[asyncio.Future]:
+        """슬롯 예약 - 비어 있으면 바로 점유(None), 아니면 대기열에 넣고 future 반환
+
+        대기열이 가득 찼으면 기다리지 않고 QueueFullError로 거절합니다.
+        """
+        if self.active < self.slots and self._queued == 0:
+            self.active += 1
+            return None
+        if self._queued >= self.max_queue:
+            self.rejected += 1
+            raise QueueFullError(self.estimate_wait(self._queued), "추론 대기열이 가득 찼습니다")
+        if self.queue_depth(user) >= self.max_queue_per_user:
+            self.rejected += 1
+            raise QueueFullError(self.estimate_wait(self._queued), "사용자별 대기 요청 수를 초과했습니다")
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(user, deque()).append(future)
+        self._queued += 1
+        return future
+
+    def estimate_wait(self, depth: int) -> int:
+        """대기열 깊이와 평균 생성 시간으로 Retry-After(초) 추정"""
+        return max(1, math.ceil((depth / max(self.slots, 1) + 1) * self.avg_generation_seconds))
+
+    async def wait(self, user: str, ticket: Optional[asyncio.Future], reserved_at: float) -> float:
+        """예약한 슬롯을 얻을 때까지 대기하고 대기 시간(초) 반환"""
+        if ticket is not None:
+            try:
+                await ticket
+            except asyncio.CancelledError:
+                if ticket.done() and not ticket.cancelled():
+                    # 슬롯을 넘겨받은 직후 취소된 경우 다음 대기자에게 넘김
+                    self.release()
+                else:
+                    self._remove(user, ticket)
+                raise
+        waited = time.monotonic() - reserved_at
+        self.admitted += 1
+        self.avg_queue_wait_seconds = 0.9 * self.avg_queue_wait_seconds + 0.1 * waited
+        return waited
+
+    def cancel_ticket(self, user: str, ticket: asyncio.Future):
+        self._remove(user, ticket)
+        ticket.cancel()
+
+    def _remove(self, user: str, future: asyncio.Future):
+        queue = self._queues.get(user)
+        if queue and future in queue:
+            queue.remove(future)
+            self._queued -= 1
+            if not queue:
+                del self._queues[user]
+
+    def release(self, generation_seconds: Optional[float] = None):
+        """슬롯 반환 - 대기자가 있으면 다음 사용자 차례의 요청에 바로 넘김"""
+        if generation_seconds is not None:
+            self.avg_generation_seconds = 0.8 * self.avg_generation_seconds + 0.2 * generation_seconds
+        while self._queues:
+            user, queue = next(iter(self._queues.items()))
+            future = queue.popleft()
+            self._queued -= 1
+            if queue:
+                # 같은 사용자의 다음 요청은 다른 사용자들 뒤로
+                self._queues.move_to_end(user)
+            else:
+                del self._queues[user]
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "slots": self.slots,
+            "active": self.active,
+            "queued": self._queued,
+            "queued_users": len(self._queues),
+            "max_queue": self.max_queue,
+            "max_queue_per_user": self.max_queue_per_user,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_generation_seconds": round(self.avg_generation_seconds, 3),
+            "avg_queue_wait_seconds": round(self.avg_queue_wait_seconds, 3)
+        }
+
+inference_scheduler = InferenceScheduler(
+    slots=settings.INFERENCE_SLOTS * len(settings.OLLAMA_BACKENDS),
+    max_queue=settings.INFERENCE_MAX_QUEUE,
+    max_queue_per_user=settings.INFERENCE_MAX_QUEUE_PER_USER
+)
+
+# 동일 요청 단일 실행 (single-flight): 진행 중인 같은 생성 작업을 여러 요청이 공유
+class GenerationError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+class Generation:
+    """하나의 Ollama 스트리밍 생성 작업 (토큰을 모아 두고 구독자에게 전달)"""
+
+    def __init__(self, key: str, payload: dict, cache_key: Optional[str], user: str, ticket: Optional[asyncio.Future]):
+        self.key = key
+        self.payload = {**payload, "stream": True}
+        self.cache_key = cache_key
+        self.user = user
+        self.ticket = ticket
+        self.created_at = time.monotonic()
+        self.admitted_at: Optional[float] = None
+        self.backend: Optional[OllamaBackend] = None
+        self.tokens: List[str] = []
+        self.done = False
+        self.error: Optional[GenerationError] = None
+        self.waiters = 0
+        self.task: Optional[asyncio.Task] = None
+        self._update = asyncio.Event()
+        self._finished = asyncio.Event()
+        self._claimed = asyncio.Event()
+
+    def _notify(self):
+        self._update.set()
+        self._update = asyncio.Event()
+
+    def _finish(self, error: Optional[GenerationError] = None):
+        self.done = True
+        self.error = error
+        inflight_generations.discard(self)
+        self._notify()
+        self._finished.set()
+
+    async def run(self):
+        try:
+            await inference_scheduler.wait(self.user, self.ticket, self.created_at)
+        except asyncio.CancelledError:
+            self._finish(GenerationError(499, "모든 요청이 취소되어 생성을 중단했습니다"))
+            raise
+        self.admitted_at = time.monotonic()
+        self._notify()
+        try:
+            await self._generate()
+        finally:
+            inference_scheduler.release(time.monotonic() - self.admitted_at)
+
+    def _claim(self, backend: OllamaBackend) -> bool:
+        """첫 토큰(또는 완료)을 먼저 받은 백엔드가 응답을 맡음 - 헤징 시 나머지는 중단"""
+        if self.backend is None:
+            self.backend = backend
+            self._claimed.set()
+        return self.backend is backend
+
+    async def _attempt(self, backend: OllamaBackend):
+        """백엔드 하나에 생성 요청 - 응답을 맡은 경우에만 토큰을 기록"""
+        started = time.monotonic()
+        try:
+            async with backend.client.stream("POST", "/api/chat", json=self.payload) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    raise GenerationError(
+                        500, f"Ollama API 오류: {response.status_code} - {body.decode(errors='replace')}"
+                    )
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise GenerationError(500, f"Ollama API 오류: {chunk['error']}")
+                    token = chunk.get("message", {}).get("content", "")
+                    if token or chunk.get("done"):
+                        if self.backend is None:
+                            backend_pool.record_first_token(backend, time.monotonic() - started)
+                        if not self._claim(backend):
+                            return
+                    if token:
+                        self.tokens.append(token)
+                        self._notify()
+            self._claim(backend)
+            backend_pool.record_success(backend)
+        except httpx.TransportError as e:
+            if not isinstance(e, httpx.TimeoutException):
+                backend_pool.record_failure(backend, repr(e))
+            raise
+
+    async def _generate(self):
+        """백엔드를 골라 생성 - 첫 토큰 전 연결 실패는 다른 노드로 재시도, 느리면 헤징"""
+        model = self.payload.get("model") or ""
+        attempts: Dict[asyncio.Task, OllamaBackend] = {}
+        hedge_at = time.monotonic() + settings.OLLAMA_HEDGE_AFTER if settings.OLLAMA_HEDGE_AFTER > 0 else None
+        claimed = asyncio.create_task(self._claimed.wait())
+        last_error: Optional[BaseException] = None
+
+        def launch(backend: OllamaBackend) -> asyncio.Task:
+            # 작업이 실제로 시작되기 전에 대기 요청 수를 올려 동시에 고르는 요청들이 분산되도록 함
+            backend_pool.acquire(backend)
+            task = asyncio.create_task(self._attempt(backend))
+            task.add_done_callback(lambda _: backend_pool.release(backend))
+            attempts[task] = backend
+            return task
+
+        try:
+            launch(backend_pool.pick(model))
+            while self.backend is None:
+                pending = [task for task in attempts if not task.done()]
+                if not pending:
+                    # 토큰을 받기 전에 모두 실패 - 연결 오류였다면 아직 안 써 본 노드로 재시도
+                    if isinstance(last_error, httpx.TransportError) and not isinstance(last_error, httpx.TimeoutException):
+                        try:
+                            launch(backend_pool.pick(model, exclude=tuple(b.name for b in attempts.values())))
+                            continue
+                        except NoBackendAvailable:
+                            pass
+                    raise last_error
+                timeout = max(0.0, hedge_at - time.monotonic()) if hedge_at is not None else None
+                done, _ = await asyncio.wait(pending + [claimed], timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task is not claimed and task.exception() is not None:
+                        last_error = task.exception()
+                if not done and hedge_at is not None:
+                    hedge_at = None
+                    backup = backend_pool.pick_idle(model, exclude=tuple(b.name for b in attempts.values()))
+                    if backup is not None:
+                        backend_pool.hedged += 1
+                        launch(backup)
+            winner = next(task for task, backend in attempts.items() if backend is self.backend)
+            if attempts[winner] is not next(iter(attempts.values())):
+                backend_pool.hedge_wins += 1
+            for task in attempts:
+                if task is not winner:
+                    task.cancel()
+            await winner
+            if self.cache_key:
+                # 끝까지 생성된 응답만 캐시
+                await response_cache.set(self.cache_key, "".join(self.tokens))
+            self._finish()
+        except asyncio.CancelledError:
+            self._finish(GenerationError(499, "모든 요청이 취소되어 생성을 중단했습니다"))
+            raise
+        except GenerationError as e:
+            self._finish(e)
+        except NoBackendAvailable as e:
+            self._finish(GenerationError(503, str(e)))
+        except httpx.TimeoutException:
+            self._finish(GenerationError(504, "Ollama 응답 시간 초과"))
+        except Exception as e:
+            self._finish(GenerationError(500, f"채팅 처리 실패: {str(e)}"))
+        finally:
+            claimed.cancel()
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # 헤징에서 진 요청의 오류는 무시
+
+    def on_task_done(self, task: asyncio.Task):
+        """시작도 못 하고 취소된 작업의 슬롯/대기열 예약 정리"""
+        if self.done:
+            return
+        if self.ticket is None or (self.ticket.done() and not self.ticket.cancelled()):
+            inference_scheduler.release()
+        else:
+            inference_scheduler.cancel_ticket(self.user, self.ticket)
+        self._finish(GenerationError(499, "모든 요청이 취소되어 생성을 중단했습니다"))
+
+    def queue_wait_ms(self, joined_at: float) -> Optional[float]:
+        """합류 시점부터 슬롯을 얻기까지 기다린 시간 (ms)"""
+        if self.admitted_at is None:
+            return None
+        return round(max(0.0, self.admitted_at - joined_at) * 1000, 1)
+
+    async def wait_started(self):
+        """첫 토큰이 나오거나 생성이 끝날 때까지 대기"""
+        while not self.tokens and not self.done:
+            await self._update.wait()
+
+    async def result(self) -> str:
+        await self._finished.wait()
+        if self.error:
+            raise self.error
+        return "".join(self.tokens)
+
+    async def iter_tokens(self) -> AsyncIterator[str]:
+        """지금까지 생성된 토큰부터 이어서 전달 (늦게 합류한 요청도 전체 응답을 받음)"""
+        index = 0
+        while True:
+            while index < len(self.tokens):
+                yield self.tokens[index]
+                index += 1
+            if self.done:
+                break
+            await self._update.wait()
+        if self.error:
+            raise self.error
+
+class InflightGenerations:
+    """(모델, 프롬프트, 옵션)이 같은 진행 중 생성 작업 레지스트리"""
+
+    def __init__(self):
+        self._running: Dict[str, Generation] = {}
+        self.started = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    def join(self, payload: dict, cache_key: Optional[str], user: str) -> Generation:
+        """진행 중인 같은 생성 작업에 합류하거나 새로 시작 (대기열이 가득 차면 QueueFullError)"""
+        key = ResponseCache.make_key(payload)
+        generation = self._running.get(key)
+        if generation is None:
+            ticket = inference_scheduler.reserve(user)
+            generation = Generation(key, payload, cache_key, user, ticket)
+            self._running[key] = generation
+            generation.task = asyncio.create_task(generation.run())
+            generation.task.add_done_callback(generation.on_task_done)
+            self.started += 1
+        else:
+            self.coalesced += 1
+        generation.waiters += 1
+        return generation
+
+    def leave(self, generation: Generation):
+        """요청 종료 - 기다리는 요청이 하나도 남지 않으면 생성 취소"""
+        generation.waiters -= 1
+        if generation.waiters <= 0 and not generation.done:
+            self.cancelled += 1
+            generation.task.cancel()
+
+    def discard(self, generation: Generation):
+        if self._running.get(generation.key) is generation:
+            del self._running[generation.key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inflight": len(self._running),
+            "waiters": sum(g.waiters for g in self._running.values()),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled
+        }
+
+inflight_generations = InflightGenerations()
+
 app = FastAPI(
     title="Ollama Local API",
     description="로컬 Ollama를 외부에서 접근할 수 있도록 하는 API 서비스",
     version="1.0.0"
 )
 
+@app.on_event("startup")
+async def startup_event():
+    backend_pool.register_clients()
+    backend_pool.start()
+    if settings.RESPONSE_CACHE_ENABLED:
+        response_cache.open()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await backend_pool.stop()
+    await http_clients.close()
+    response_cache.close()
+
+class ChatTurn(BaseModel):
+    role: Literal["system", "user", "assistant"]
+    content: str
+
 class ChatRequest(BaseModel):
     message: str
     context: Optional[str] = ""
+    messages: Optional[List[ChatTurn]] = None  # 이전 대화 (오래된 순, 현재 메시지는 제외)
     model: Optional[str] = "llama2"
+    options: Optional[Dict[str, Any]] = None  # Ollama 생성 옵션 (temperature 등)
+    use_cache: bool = True  # False 이면 응답 캐시를 건너뛰고 항상 새로 생성
+    user_id: Optional[str] = None  # 공정 대기열 기준 (없으면 클라이언트 주소)
 
 class ChatResponse(BaseModel):
     response: str
     model: str
     success: bool
+    cached: bool = False
+    queue_wait_ms: Optional[float] = None
+
+class EmbedRequest(BaseModel):
+    texts: List[str]
+    model: Optional[str] = None
+
+class EmbedResponse(BaseModel):
+    embeddings: List[List[float]]
+    model: str
 
 class HealthResponse(BaseModel):
     status: str
@@ -40,118 +862,293 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "chat": "/api/chat",
+            "chat_stream": "/api/chat/stream",
+            "embed": "/api/embed",
             "health": "/api/health",
-            "models": "/api/models"
+            "models": "/api/models",
+            "cache": "/api/cache/stats",
+            "backends": "/api/health/backends",
+            "http_pool": "/api/health/http-pool"
         }
     }
 
+async def fetch_backend_tags(backend: OllamaBackend, timeout: float) -> List[Dict[str, Any]]:
+    response = await backend.client.get("/api/tags", timeout=timeout)
+    response.raise_for_status()
+    return response.json().get("models", [])
+
+async def fetch_all_tags(timeout: float) -> Tuple[List[Dict[str, Any]], List[BaseException]]:
+    """모든 백엔드의 모델 목록을 모아 이름 기준으로 합침"""
+    results = await asyncio.gather(
+        *(fetch_backend_tags(backend, timeout) for backend in backend_pool.backends),
+        return_exceptions=True
+    )
+    models: Dict[str, Dict[str, Any]] = {}
+    errors = []
+    for result in results:
+        if isinstance(result, BaseException):
+            errors.append(result)
+            continue
+        for model in result:
+            models.setdefault(model["name"], model)
+    return list(models.values()), errors
+
 @app.get("/api/health", response_model=HealthResponse)
 async def health_check():
-    """헬스 체크 - Ollama 연결 상태 확인"""
-    try:
-        # Ollama 서버 상태 확인
-        async with httpx.AsyncClient() as client:
-            response = await client.get("http://localhost:11434/api/tags", timeout=5.0)
-            if response.status_code == 200:
-                models = response.json()
-                model_list = [model["name"] for model in models.get("models", [])]
-                return HealthResponse(
-                    status="healthy",
-                    ollama_status="connected",
-                    model=", ".join(model_list) if model_list else "no models"
-                )
-            else:
-                return HealthResponse(
-                    status="unhealthy",
-                    ollama_status="disconnected",
-                    model="unknown"
-                )
-    except Exception as e:
+    """헬스 체크 - Ollama 연결 상태 확인 (백엔드가 하나라도 응답하면 healthy)"""
+    models, errors = await fetch_all_tags(timeout=5.0)
+    total = len(backend_pool.backends)
+    if len(errors) == total:
         return HealthResponse(
             status="unhealthy",
-            ollama_status=f"error: {str(e)}",
+            ollama_status=f"error: {str(errors[0])}",
             model="unknown"
         )
+    model_list = [model["name"] for model in models]
+    return HealthResponse(
+        status="healthy",
+        ollama_status="connected" if not errors else f"partial ({total - len(errors)}/{total})",
+        model=", ".join(model_list) if model_list else "no models"
+    )
+
+@app.get("/api/health/backends")
+async def backend_stats():
+    """Ollama 백엔드별 상태 (정상 여부, 대기 요청 수, 적재 모델, 헤징 통계)"""
+    return backend_pool.stats()
+
+@app.get("/api/health/http-pool")
+async def http_pool_stats():
+    """Ollama 연결 풀 상태 조회"""
+    return http_clients.stats()
 
 @app.get("/api/models")
 async def get_models():
     """사용 가능한 모델 목록 조회"""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get("http://localhost:11434/api/tags", timeout=10.0)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(status_code=500, detail="Ollama 서버에 연결할 수 없습니다")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"모델 목록 조회 실패: {str(e)}")
+    models, errors = await fetch_all_tags(timeout=10.0)
+    if len(errors) == len(backend_pool.backends):
+        raise HTTPException(status_code=500, detail=f"모델 목록 조회 실패: {str(errors[0])}")
+    return {"models": models}
+
+def build_prompt(request: ChatRequest) -> str:
+    """컨텍스트를 포함한 최종 프롬프트 구성"""
+    if request.context:
+        return f"사용자 컨텍스트: {request.context}\n\n사용자 질문: {request.message}\n\n위 컨텍스트를 참고하여 친근하게 답변해주세요."
+    return request.message
+
+def build_ollama_payload(request: ChatRequest, stream: bool = False) -> dict:
+    """Ollama /api/chat 요청 본문 구성 (이전 대화 + 컨텍스트를 포함한 현재 메시지)"""
+    history = [{"role": turn.role, "content": turn.content} for turn in request.messages or []]
+    payload = {
+        "model": request.model,
+        "messages": history + [
+            {
+                "role": "user",
+                "content": build_prompt(request)
+            }
+        ],
+        "stream": stream
+    }
+    if request.options:
+        payload["options"] = request.options
+    return payload
+
+def response_cache_key(request: ChatRequest, payload: dict) -> Optional[str]:
+    """캐시를 쓸 요청이면 캐시 키, 아니면 None"""
+    if not settings.RESPONSE_CACHE_ENABLED or not request.use_cache:
+        return None
+    return ResponseCache.make_key(payload)
+
+def queue_user_key(request: ChatRequest, http_request: Request) -> str:
+    if request.user_id:
+        return f"user:{request.user_id}"
+    return f"addr:{http_request.client.host if http_request.client else 'unknown'}"
+
+def queue_full_exception(error: QueueFullError) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=error.detail,
+        headers={"Retry-After": str(error.retry_after)}
+    )
 
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat_with_ollama(request: ChatRequest):
+async def chat_with_ollama(request: ChatRequest, http_request: Request, http_response: Response):
     """Ollama와 채팅"""
     try:
-        # 프롬프트 구성
-        if request.context:
-            prompt = f"사용자 컨텍스트: {request.context}\n\n사용자 질문: {request.message}\n\n위 컨텍스트를 참고하여 친근하게 답변해주세요."
-        else:
-            prompt = request.message
-
         # Ollama API 호출
-        ollama_payload = {
-            "model": request.model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "stream": False
-        }
+        ollama_payload = build_ollama_payload(request)
+        cache_key = response_cache_key(request, ollama_payload)
+        if cache_key:
+            cached = await response_cache.get(cache_key)
+            if cached is not None:
+                return ChatResponse(response=cached, model=request.model, success=True, cached=True)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "http://localhost:11434/api/chat",
-                json=ollama_payload,
-                timeout=60.0
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return ChatResponse(
-                    response=result["message"]["content"],
-                    model=request.model,
-                    success=True
-                )
-            else:
-                raise HTTPException(
-                    status_code=500, 
-                    detail=f"Ollama API 오류: {response.status_code} - {response.text}"
-                )
+        # 같은 요청이 이미 생성 중이면 그 결과를 함께 기다림
+        joined_at = time.monotonic()
+        generation = inflight_generations.join(ollama_payload, cache_key, queue_user_key(request, http_request))
+        try:
+            content = await generation.result()
+        finally:
+            inflight_generations.leave(generation)
+        
+        queue_wait_ms = generation.queue_wait_ms(joined_at)
+        if queue_wait_ms is not None:
+            http_response.headers["X-Queue-Wait-Ms"] = str(queue_wait_ms)
+        return ChatResponse(
+            response=content,
+            model=request.model,
+            success=True,
+            queue_wait_ms=queue_wait_ms
+        )
                 
+    except QueueFullError as e:
+        raise queue_full_exception(e)
+    except GenerationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Ollama 응답 시간 초과")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"채팅 처리 실패: {str(e)}")
 
+@app.post("/api/chat/stream")
+async def chat_with_ollama_stream(request: ChatRequest, http_request: Request):
+    """Ollama와 스트리밍 채팅 (NDJSON)
+
+    각 줄은 {"response": 토큰, "model": 모델, "done": bool} 형태이며,
+    오류 발생 시 {"error": 메시지, "done": true} 줄로 종료됩니다.
+    같은 요청이 이미 생성 중이면 그 스트림을 처음부터 함께 받습니다.
+    대기열에서 기다린 시간은 X-Queue-Wait-Ms 헤더로 전달합니다.
+    """
+    ollama_payload = build_ollama_payload(request, stream=True)
+    cache_key = response_cache_key(request, ollama_payload)
+    if cache_key:
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            async def replay():
+                yield json.dumps({"response": cached, "model": request.model, "done": False, "cached": True}, ensure_ascii=False) + "\n"
+                yield json.dumps({"response": "", "model": request.model, "done": True, "cached": True}, ensure_ascii=False) + "\n"
+            return StreamingResponse(replay(), media_type="application/x-ndjson")
+
+    joined_at = time.monotonic()
+    try:
+        generation = inflight_generations.join(ollama_payload, cache_key, queue_user_key(request, http_request))
+    except QueueFullError as e:
+        raise queue_full_exception(e)
+    try:
+        await generation.wait_started()
+    except BaseException:
+        inflight_generations.leave(generation)
+        raise
+
+    # 첫 토큰 전에 실패하면 HTTP 오류로 응답
+    if generation.error and not generation.tokens:
+        inflight_generations.leave(generation)
+        raise HTTPException(status_code=generation.error.status_code, detail=generation.error.detail)
+
+    async def relay():
+        try:
+            async for token in generation.iter_tokens():
+                yield json.dumps({"response": token, "model": request.model, "done": False}, ensure_ascii=False) + "\n"
+            yield json.dumps({"response": "", "model": request.model, "done": True}, ensure_ascii=False) + "\n"
+        except GenerationError as e:
+            yield json.dumps({"error": e.detail, "done": True}, ensure_ascii=False) + "\n"
+        finally:
+            inflight_generations.leave(generation)
+
+    headers = {}
+    queue_wait_ms = generation.queue_wait_ms(joined_at)
+    if queue_wait_ms is not None:
+        headers["X-Queue-Wait-Ms"] = str(queue_wait_ms)
+    return StreamingResponse(relay(), media_type="application/x-ndjson", headers=headers)
+
+@app.get("/api/health/queue")
+async def queue_stats():
+    """추론 슬롯 사용량 및 대기열 상태"""
+    return inference_scheduler.stats()
+
+@app.get("/api/health/inflight")
+async def inflight_stats():
+    """진행 중인 생성 작업 및 중복 요청 합류 통계"""
+    return inflight_generations.stats()
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """응답 캐시 적중/미스 통계"""
+    return response_cache.stats()
+
+@app.delete("/api/cache")
+async def clear_cache():
+    """응답 캐시 비우기 (메모리 + 디스크)"""
+    response_cache.clear()
+    return {"message": "응답 캐시를 비웠습니다", "success": True}
+
+@app.post("/api/embed", response_model=EmbedResponse)
+async def embed_texts(request: EmbedRequest):
+    """텍스트 임베딩 계산 (Ollama 임베딩 모델)"""
+    model = request.model or settings.EMBEDDING_MODEL
+    if not request.texts:
+        return EmbedResponse(embeddings=[], model=model)
+    
+    try:
+        backend = backend_pool.pick(model)
+        backend_pool.acquire(backend)
+        try:
+            response = await backend.client.post(
+                "/api/embed",
+                json={"model": model, "input": request.texts}
+            )
+        except httpx.TransportError as e:
+            if not isinstance(e, httpx.TimeoutException):
+                backend_pool.record_failure(backend, repr(e))
+            raise
+        finally:
+            backend_pool.release(backend)
+        
+        if response.status_code == 200:
+            return EmbedResponse(embeddings=response.json()["embeddings"], model=model)
+        else:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Ollama 임베딩 오류: {response.status_code} - {response.text}"
+            )
+            
+    except HTTPException:
+        raise
+    except NoBackendAvailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail="Ollama 응답 시간 초과")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"임베딩 처리 실패: {str(e)}")
+
 @app.post("/api/pull")
 async def pull_model(model_name: str):
-    """모델 다운로드"""
+    """모델 다운로드 (정상 상태인 모든 백엔드에)"""
+    backends = backend_pool.healthy_backends()
+    if not backends:
+        raise HTTPException(status_code=503, detail="사용 가능한 Ollama 백엔드가 없습니다")
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"http://localhost:11434/api/pull",
+        responses = await asyncio.gather(*(
+            backend.client.post(
+                "/api/pull",
                 json={"name": model_name},
                 timeout=300.0  # 모델 다운로드는 시간이 오래 걸릴 수 있음
             )
-            
-            if response.status_code == 200:
-                return {"message": f"모델 {model_name} 다운로드 완료", "success": True}
-            else:
-                raise HTTPException(
-                    status_code=500, 
-                    detail=f"모델 다운로드 실패: {response.status_code} - {response.text}"
-                )
+            for backend in backends
+        ))
+        
+        failed = [r for r in responses if r.status_code != 200]
+        if not failed:
+            # 다음 프로브를 기다리지 않고 보유 모델 목록 갱신
+            await asyncio.gather(*(backend_pool.probe(backend) for backend in backends))
+            return {"message": f"모델 {model_name} 다운로드 완료", "success": True}
+        else:
+            raise HTTPException(
+                status_code=500, 
+                detail=f"모델 다운로드 실패: {failed[0].status_code} - {failed[0].text}"
+            )
                 
+    except HTTPException:
+        raise
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="모델 다운로드 시간 초과")
     except Exception as e:
@@ -159,12 +1156,15 @@ async def pull_model(model_name: str):
 
 if __name__ == "__main__":
     print("🚀 Ollama Local API Service 시작")
-    print("📡 로컬 Ollama 서버: http://localhost:11434")
+    print(f"📡 로컬 Ollama 서버: {', '.join(settings.OLLAMA_BACKENDS)}")
     print("🌐 API 서버: http://localhost:8003")
     print("📋 사용 가능한 엔드포인트:")
     print("   - GET  /api/health  : 헬스 체크")
     print("   - GET  /api/models  : 모델 목록")
     print("   - POST /api/chat    : 채팅")
+    print("   - POST /api/chat/stream : 스트리밍 채팅 (NDJSON)")
+    print("   - POST /api/embed   : 텍스트 임베딩")
+    print("   - GET  /api/cache/stats : 응답 캐시 통계")
     print("   - POST /api/pull    : 모델 다운로드")
     
     uvicorn.run(
@@ -0,0 +1,135 @@
+"""
+가짜 Ollama 서버 (백엔드 풀 라우팅/장애 제외/헤징 테스트용)
+- /api/tags, /api/ps, /api/chat(스트리밍 NDJSON)만 흉내 내고, 정해진 토큰을 지연을 넣어 돌려줌
+- --first-token-ms / --token-ms 로 느린 노드, --loaded 로 모델이 올라가 있는지 흉내
+- 실행 중 POST /fake/healthy?value=false 로 모든 요청에 503을 돌려주게 해서 장애 노드를 흉내
+
+사용 예 (ai_api 폴더에서 실행):
+    python scripts/fake_ollama.py --port 11501
+    python scripts/fake_ollama.py --port 11502 --first-token-ms 3000
+    OLLAMA_BACKENDS=http://localhost:11501,http://localhost:11502 OLLAMA_HEDGE_AFTER=1 python app/main.py
+"""
+
+import argparse
+import asyncio
+import json
+from typing import List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+
+class FakeOllama:
+    def __init__(self, models: List[str], loaded: List[str], first_token_delay: float = 0.05,
+                 token_delay: float = 0.01, tokens: int = 5):
+        self.models = models
+        self.loaded = loaded
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.tokens = tokens
+        self.healthy = True
+        self.chats = 0
+        self.probes = 0
+        self.active = 0
+        self.max_active = 0  # 동시에 처리한 최대 생성 수
+        self.cancelled = 0  # 끝나기 전에 클라이언트가 끊은 생성 수 (헤징에서 진 요청)
+        self.port: Optional[int] = None
+        self.app = self.build_app()
+
+    def build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        def unavailable():
+            return Response(status_code=503, content=json.dumps({"error": "fake ollama down"}), media_type="application/json")
+
+        @app.get("/api/tags")
+        async def tags():
+            self.probes += 1
+            if not self.healthy:
+                return unavailable()
+            return {"models": [{"name": name} for name in self.models]}
+
+        @app.get("/api/ps")
+        async def ps():
+            if not self.healthy:
+                return unavailable()
+            return {"models": [{"name": name} for name in self.loaded]}
+
+        @app.post("/fake/healthy")
+        async def set_healthy(value: bool):
+            self.healthy = value
+            return {"healthy": self.healthy}
+
+        @app.post("/api/chat")
+        async def chat(request: Request):
+            if not self.healthy:
+                return unavailable()
+            payload = await request.json()
+            self.chats += 1
+            model = payload.get("model", "")
+            if payload.get("stream") is False:
+                text = "".join(self.generate_tokens())
+                return {"model": model, "message": {"role": "assistant", "content": text}, "done": True}
+            return StreamingResponse(self.stream(model), media_type="application/x-ndjson")
+
+        return app
+
+    def generate_tokens(self) -> List[str]:
+        return [f"t{i} " for i in range(self.tokens)]
+
+    async def stream(self, model: str):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        finished = False
+        try:
+            await asyncio.sleep(self.first_token_delay)
+            for index, token in enumerate(self.generate_tokens()):
+                if index:
+                    await asyncio.sleep(self.token_delay)
+                yield json.dumps({"model": model, "message": {"role": "assistant", "content": token}, "done": False}) + "\n"
+            yield json.dumps({"model": model, "message": {"role": "assistant", "content": ""}, "done": True}) + "\n"
+            finished = True
+        finally:
+            self.active -= 1
+            if not finished:
+                self.cancelled += 1
+
+    def stats(self):
+        return {"healthy": self.healthy, "chats": self.chats, "probes": self.probes,
+                "max_active": self.max_active, "cancelled": self.cancelled}
+
+    async def start(self, port: int = 0) -> str:
+        """현재 이벤트 루프에서 서버 시작 (port=0이면 빈 포트) 후 base URL 반환"""
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+        self._task = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            if self._task.done():
+                self._task.result()  # 포트 충돌 등 시작 실패
+            await asyncio.sleep(0.01)
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{self.port}"
+
+    async def stop(self):
+        self._server.should_exit = True
+        await self._task
+        self.port = None
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 Ollama 서버")
+    parser.add_argument("--port", type=int, default=11501)
+    parser.add_argument("--models", default="llama2:latest", help="보유 모델 (쉼표로 구분)")
+    parser.add_argument("--loaded", default="llama2:latest", help="메모리에 올라가 있는 모델 (쉼표로 구분, 비우면 없음)")
+    parser.add_argument("--first-token-ms", type=float, default=50)
+    parser.add_argument("--token-ms", type=float, default=10)
+    parser.add_argument("--tokens", type=int, default=20)
+    args = parser.parse_args()
+    fake = FakeOllama(
+        [name for name in args.models.split(",") if name],
+        [name for name in args.loaded.split(",") if name],
+        args.first_token_ms / 1000, args.token_ms / 1000, args.tokens
+    )
+    print(f"🦙 가짜 Ollama 시작: 127.0.0.1:{args.port} (첫 토큰 {args.first_token_ms:g}ms)")
+    uvicorn.run(fake.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import asyncio
+import contextlib
+import os
+import sys
+import time
+
+import pytest
+
+AI_API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, AI_API_DIR)
+sys.path.insert(0, os.path.join(AI_API_DIR, "scripts"))
+
+import app.main as main  # noqa: E402
+from fake_ollama import FakeOllama  # noqa: E402
+
+MODEL = "llama2:latest"
+
+@pytest.fixture(autouse=True)
+def isolated_settings(monkeypatch):
+    monkeypatch.setattr(main.settings, "OLLAMA_HEDGE_AFTER", 0.0)
+    monkeypatch.setattr(main.settings, "OLLAMA_EJECT_AFTER_FAILURES", 2)
+    monkeypatch.setattr(main.settings, "OLLAMA_MODEL_LOAD_PENALTY", 2.0)
+    monkeypatch.setattr(main, "inference_scheduler", main.InferenceScheduler(slots=100, max_queue=100, max_queue_per_user=100))
+    return monkeypatch
+
+@contextlib.asynccontextmanager
+async def ollama_pool(monkeypatch, *fakes: FakeOllama):
+    """가짜 Ollama 서버들을 띄우고 그 주소로 만든 BackendPool을 앱 전역 풀 대신 사용"""
+    urls = [await fake.start() for fake in fakes]
+    pool = main.BackendPool(urls)
+    monkeypatch.setattr(main, "backend_pool", pool)
+    pool.register_clients()
+    await pool.probe_all()
+    try:
+        yield pool
+    finally:
+        await main.http_clients.close()
+        for fake in fakes:
+            if fake.port is not None:
+                await fake.stop()
+
+async def generate(message: str):
+    """채팅 한 번 생성 후 (응답, 응답을 맡은 백엔드 이름) 반환"""
+    payload = {"model": MODEL, "messages": [{"role": "user", "content": message}], "stream": True}
+    generation = main.inflight_generations.join(payload, None, "tester")
+    try:
+        return await generation.result(), generation.backend.name
+    finally:
+        main.inflight_generations.leave(generation)
+
+def fake(**kwargs) -> FakeOllama:
+    options = {"models": [MODEL], "loaded": [MODEL], "first_token_delay": 0.01, "token_delay": 0.001, "tokens": 3}
+    return FakeOllama(**{**options, **kwargs})
+
+def test_concurrent_requests_spread_by_outstanding_count(isolated_settings):
+    fakes = [fake(first_token_delay=0.2) for _ in range(3)]
+
+    async def scenario():
+        async with ollama_pool(isolated_settings, *fakes) as pool:
+            results = await asyncio.gather(*(generate(f"질문 {i}") for i in range(6)))
+            assert all(text == "t0 t1 t2 " for text, _ in results)
+            assert all(backend.outstanding == 0 for backend in pool.backends)
+    asyncio.run(scenario())
+    assert [f.chats for f in fakes] == [2, 2, 2]
+    assert [f.max_active for f in fakes] == [2, 2, 2]
+
+def test_prefers_backend_with_model_loaded(isolated_settings):
+    missing = fake(models=[], loaded=[])
+    cold = fake(loaded=[])
+    warm = fake()
+
+    async def scenario():
+        async with ollama_pool(isolated_settings, missing, cold, warm):
+            return [await generate(f"질문 {i}") for i in range(3)]
+    results = asyncio.run(scenario())
+    assert [backend for _, backend in results] == ["ollama-3"] * 3
+    assert (missing.chats, cold.chats) == (0, 0)
+
+def test_ejects_backend_after_probe_failures_and_restores_it(isolated_settings):
+    flaky, steady = fake(), fake()
+
+    async def scenario():
+        async with ollama_pool(isolated_settings, flaky, steady) as pool:
+            first = pool.backends[0]
+            flaky.healthy = False
+            await pool.probe_all()
+            assert first.healthy  # 한 번 실패로는 제외하지 않음
+            await pool.probe_all()
+            assert not first.healthy and first.consecutive_failures == 2
+            backends = [(await generate(f"질문 {i}"))[1] for i in range(3)]
+            assert backends == ["ollama-2"] * 3
+
+            flaky.healthy = True
+            await pool.probe_all()
+            assert first.healthy and first.consecutive_failures == 0
+    asyncio.run(scenario())
+    assert flaky.chats == 0
+
+def test_retries_on_another_backend_when_connection_fails(isolated_settings):
+    down = fake()
+    backup = fake(loaded=[])
+
+    async def scenario():
+        async with ollama_pool(isolated_settings, down, backup) as pool:
+            await down.stop()  # 프로브 후 죽은 노드 (연결 거부)
+            text, backend = await generate("질문")
+            assert (text, backend) == ("t0 t1 t2 ", "ollama-2")
+            assert pool.backends[0].failures == 1
+    asyncio.run(scenario())
+
+def test_hedges_to_idle_backend_when_first_token_is_slow(isolated_settings):
+    isolated_settings.setattr(main.settings, "OLLAMA_HEDGE_AFTER", 0.2)
+    slow = fake(first_token_delay=2.0)
+    fast = fake(loaded=[])
+
+    async def scenario():
+        async with ollama_pool(isolated_settings, slow, fast) as pool:
+            started = time.monotonic()
+            text, backend = await generate("질문")
+            elapsed = time.monotonic() - started
+            await asyncio.sleep(0.1)  # 진 요청이 끊기는 것까지 확인
+            return text, backend, elapsed, pool.hedged, pool.hedge_wins
+    text, backend, elapsed, hedged, hedge_wins = asyncio.run(scenario())
+    assert (text, backend) == ("t0 t1 t2 ", "ollama-2")
+    assert 0.2 <= elapsed < 1.0
+    assert (hedged, hedge_wins) == (1, 1)
+    assert (slow.chats, slow.cancelled) == (1, 1)
+
+def test_no_hedge_when_disabled(isolated_settings):
+    slow = fake(first_token_delay=0.5)
+    fast = fake(loaded=[])
+
+    async def scenario():
+        async with ollama_pool(isolated_settings, slow, fast) as pool:
+            result = await generate("질문")
+            return result, pool.hedged
+    (_, backend), hedged = asyncio.run(scenario())
+    assert (backend, hedged) == ("ollama-1", 0)
+    assert fast.chats == 0
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.main import InferenceScheduler, QueueFullError  # noqa: E402
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_free_slot_is_taken_without_queueing():
+    async def scenario():
+        scheduler = InferenceScheduler(slots=2, max_queue=10, max_queue_per_user=5)
+        assert scheduler.reserve("a") is None
+        assert scheduler.reserve("b") is None
+        assert scheduler.reserve("c") is not None
+        assert scheduler.active == 2 and scheduler.queue_depth() == 1
+    run(scenario())
+
+def test_waiting_requests_are_woken_round_robin_per_user():
+    async def scenario():
+        scheduler = InferenceScheduler(slots=1, max_queue=10, max_queue_per_user=5)
+        assert scheduler.reserve("holder") is None
+        # 사용자 a가 먼저 요청 3개를 몰아서 넣어도 b, c가 a 뒤에 줄 서지 않음
+        tickets = [(user, scheduler.reserve(user)) for user in ["a", "a", "a", "b", "b", "c"]]
+        order = []
+        for _ in tickets:
+            scheduler.release()
+            woken = [(user, ticket) for user, ticket in tickets if ticket.done() and (user, ticket) not in order]
+            assert len(woken) == 1  # 슬롯 하나를 넘겨받은 요청은 정확히 하나
+            order.append(woken[0])
+        assert [user for user, _ in order] == ["a", "b", "c", "a", "b", "a"]
+        assert scheduler.active == 1 and scheduler.queue_depth() == 0
+        scheduler.release()
+        assert scheduler.active == 0
+    run(scenario())
+
+def test_rejects_when_user_or_global_queue_is_full():
+    async def scenario():
+        scheduler = InferenceScheduler(slots=1, max_queue=3, max_queue_per_user=2)
+        scheduler.reserve("holder")
+        scheduler.reserve("a")
+        scheduler.reserve("a")
+        with pytest.raises(QueueFullError) as per_user:
+            scheduler.reserve("a")
+        assert "사용자별" in per_user.value.detail
+        scheduler.reserve("b")
+        with pytest.raises(QueueFullError) as full:
+            scheduler.reserve("c")
+        assert full.value.retry_after >= 1
+        assert scheduler.rejected == 2 and scheduler.queue_depth() == 3
+    run(scenario())
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        scheduler = InferenceScheduler(slots=1, max_queue=10, max_queue_per_user=5)
+        scheduler.reserve("holder")
+        first = scheduler.reserve("a")
+        second = scheduler.reserve("b")
+        waiter = asyncio.create_task(scheduler.wait("a", first, 0.0))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert scheduler.queue_depth("a") == 0
+        scheduler.release()
+        assert second.done()
+    run(scenario())
+
+def test_slot_handed_to_a_cancelled_waiter_is_passed_on():
+    async def scenario():
+        scheduler = InferenceScheduler(slots=1, max_queue=10, max_queue_per_user=5)
+        scheduler.reserve("holder")
+        first = scheduler.reserve("a")
+        second = scheduler.reserve("b")
+        waiter = asyncio.create_task(scheduler.wait("a", first, 0.0))
+        await asyncio.sleep(0)
+        scheduler.release()  # a가 슬롯을 넘겨받은 직후 취소됨
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert second.done()
+        assert scheduler.active == 1
+    run(scenario())
@@ -172,6 +172,19 @@ const Message = styled.div`
     color: #ffffff;
     margin-right: auto;
   }
+
+  &.error {
+    border: 1px solid #dc3545;
+  }
+`;
+
+const ErrorNote = styled.div`
+  color: #ff6b6b;
+  font-size: 14px;
+
+  &.after-text {
+    margin-top: 10px;
+  }
 `;
 
 const ChatPage = () => {
@@ -215,28 +228,81 @@ const ChatPage = () => {
     setMessage('');
     setIsLoading(true);
 
+    // 스트리밍 중인 어시스턴트 메시지가 있으면 그 메시지에 오류를 표시하고, 없으면 오류 메시지를 새로 추가
+    let streaming = false;
+    const showError = (text) => {
+      setMessages(prev => {
+        if (!streaming) return [...prev, { role: 'assistant', message: '', error: text }];
+        const updated = [...prev];
+        updated[updated.length - 1] = { ...updated[updated.length - 1], error: text };
+        return updated;
+      });
+    };
+
     try {
       const token = localStorage.getItem('access_token');
       const apiUrl = process.env.REACT_APP_API_URL || 'http://localhost:8000';
-      const response = await axios.post(`${apiUrl}/api/chat`, {
-        message: message.trim(),
-        session_id: sessionId
-      }, {
-        headers: { Authorization: `Bearer ${token}` }
+      const response = await fetch(`${apiUrl}/api/chat/stream`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          Authorization: `Bearer ${token}`
+        },
+        body: JSON.stringify({
+          message: userMessage.message,
+          session_id: sessionId
+        })
       });
 
-      const assistantMessage = { 
-        role: 'assistant', 
-        message: response.data.message 
+      if (!response.ok || !response.body) {
+        throw new Error(`HTTP ${response.status}`);
+      }
+
+      // 토큰이 도착하는 대로 어시스턴트 메시지에 이어 붙이기
+      setMessages(prev => [...prev, { role: 'assistant', message: '' }]);
+      streaming = true;
+      setIsLoading(false);
+
+      const appendToken = (text) => {
+        setMessages(prev => {
+          const updated = [...prev];
+          const last = updated[updated.length - 1];
+          updated[updated.length - 1] = { ...last, message: last.message + text };
+          return updated;
+        });
       };
-      setMessages(prev => [...prev, assistantMessage]);
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      let failed = false;
+      while (!failed) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const event of events) {
+          if (!event.startsWith('data: ')) continue;
+          const data = JSON.parse(event.slice(6));
+          if (data.session_id && !sessionId) setSessionId(data.session_id);
+          if (data.token) appendToken(data.token);
+          if (data.error) {
+            // 오류 이벤트는 응답 토큰이 아니므로 본문에 붙이지 않고 오류로 표시
+            showError(data.error);
+            failed = true;
+            break;
+          }
+        }
+      }
+      if (failed) reader.cancel();
     } catch (error) {
       console.error('메시지 전송 실패:', error);
-      const errorMessage = { 
-        role: 'assistant', 
-        message: '죄송합니다. 메시지를 전송할 수 없습니다.' 
-      };
-      setMessages(prev => [...prev, errorMessage]);
+      showError(streaming
+        ? '응답을 받는 중 연결이 끊겼습니다.'
+        : '죄송합니다. 메시지를 전송할 수 없습니다.');
     } finally {
       setIsLoading(false);
     }
@@ -289,8 +355,9 @@ const ChatPage = () => {
         <>
           <MessagesContainer>
             {messages.map((msg, index) => (
-              <Message key={index} className={msg.role}>
+              <Message key={index} className={msg.error ? `${msg.role} error` : msg.role}>
                 {msg.message}
+                {msg.error && <ErrorNote className={msg.message ? 'after-text' : ''}>{msg.error}</ErrorNote>}
               </Message>
             ))}
             {isLoading && (
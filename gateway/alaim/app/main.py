@@ -0,0 +1,995 @@
+"""
+오터스 API 게이트웨이 (리버스 프록시)
+- 경로 prefix 기반으로 llmlink / alarm / googleauth 서비스로 요청 전달 (라우트 설정: routes.json)
+- 업스트림 인스턴스별 HTTP/1.1 keep-alive 연결 풀 재사용
+- 요청/응답 본문을 버퍼링하지 않고 그대로 스트리밍 (대용량 업로드, SSE 채팅 스트림)
+- 업스트림 헬스 체크, 장애 인스턴스는 건너뛰고 다른 인스턴스로 페일오버
+- 사용자(JWT user_id)별 토큰 버킷 속도 제한, 채팅처럼 비싼 요청은 별도 한도 (RateLimit-* 헤더, 429)
+"""
+
+from fastapi import FastAPI
+from urllib.parse import urlsplit
+import asyncio
+import json
+import math
+import os
+import ssl
+import time
+import uvicorn
+from typing import Optional, Dict, Any, List, Tuple
+from jwt.exceptions import InvalidTokenError
+import jwt
+
+# 설정
+class Settings:
+    GATEWAY_ROUTES_FILE = os.getenv(
+        "GATEWAY_ROUTES_FILE",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "routes.json")
+    )
+
+    # 업스트림 연결 풀 / 타임아웃 설정 (업스트림별 응답 timeout은 routes.json에서 지정)
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "200"))  # 인스턴스당 동시 연결 수
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "100"))  # 인스턴스당 유휴 연결 수
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "30"))
+
+    # 업스트림 헬스 체크
+    HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", "5"))  # 확인 주기(초)
+    HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+    HEALTH_CHECK_FAILURES = int(os.getenv("HEALTH_CHECK_FAILURES", "2"))  # 연속 실패 시 제외
+
+    # 요청 속도 제한 (정책은 routes.json의 rate_limits)
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "")  # 설정하면 게이트웨이 복제본끼리 Redis로 한도 공유
+    RATE_LIMIT_TOKEN_CACHE_SIZE = int(os.getenv("RATE_LIMIT_TOKEN_CACHE_SIZE", "10000"))  # 해석한 JWT 캐시 크기
+    # 서비스와 같은 JWT 서명 키 (속도 제한을 켜려면 필수 - 서명과 만료를 확인한 토큰만 user_id로 묶음)
+    SECRET_KEY = os.getenv("SECRET_KEY", "")
+    ALGORITHM = "HS256"
+
+    # 게이트웨이가 직접 만드는 응답(429, 502 등)에도 CORS 헤더를 붙일 프론트엔드 도메인
+    ALLOWED_ORIGINS = ["http://localhost:3000", "https://otters-gpynyvem1-joonhyuck-yangs-projects.vercel.app"]
+
+settings = Settings()
+
+# 업스트림 연결 풀
+class UpstreamError(Exception):
+    """업스트림 연결/응답 오류 (status_code로 게이트웨이 응답 코드 결정)"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+class UpstreamConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.idle_since = 0.0
+        self.timed_out = False
+
+    def close(self):
+        self.writer.transport.abort()
+
+    def _expire(self):
+        self.timed_out = True
+        self.close()
+
+    async def timed(self, awaitable, timeout: float):
+        """읽기 제한 시간 - 초과하면 연결을 끊어서 읽기를 중단시키고 TimeoutError
+        (asyncio.wait_for는 읽을 때마다 태스크를 새로 만들어서 지연이 늘어남)"""
+        timer = asyncio.get_running_loop().call_later(timeout, self._expire)
+        try:
+            result = await awaitable
+        except (ConnectionError, asyncio.IncompleteReadError):
+            if self.timed_out:
+                raise asyncio.TimeoutError(f"{timeout}초 동안 응답 없음") from None
+            raise
+        finally:
+            timer.cancel()
+        if self.timed_out:
+            raise asyncio.TimeoutError(f"{timeout}초 동안 응답 없음")
+        return result
+
+class ConnectionPool:
+    """업스트림 인스턴스 하나의 HTTP/1.1 keep-alive 연결 풀
+
+    httpx 클라이언트는 요청당 처리 비용이 커서 게이트웨이 홉마다 1ms 이상이 더해지므로,
+    프록시 경로에서는 asyncio 스트림 위에 필요한 만큼만 구현한 HTTP/1.1 클라이언트를 사용합니다.
+    """
+
+    def __init__(self, url: str, max_connections: int, max_keepalive: int, keepalive_expiry: float, connect_timeout: float):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"지원하지 않는 업스트림 주소: {url}")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.host_header = parts.netloc.encode()
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle: List[UpstreamConnection] = []
+        self.max_connections = max_connections
+        self.connections = 0
+        self.opened = 0
+        self.reused = 0
+
+    async def acquire(self) -> Tuple[UpstreamConnection, bool]:
+        """(연결, 재사용 여부) - 유휴 연결이 없으면 새로 연결"""
+        await self._slots.acquire()
+        now = time.monotonic()
+        while self._idle:
+            conn = self._idle.pop()
+            if now - conn.idle_since < self.keepalive_expiry and not conn.reader.at_eof():
+                self.reused += 1
+                return conn, True
+            self._discard(conn)
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=self.ssl),
+                self.connect_timeout
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        self.connections += 1
+        self.opened += 1
+        return UpstreamConnection(reader, writer), False
+
+    def release(self, conn: UpstreamConnection, reusable: bool):
+        if reusable and len(self._idle) < self.max_keepalive:
+            conn.idle_since = time.monotonic()
+            self._idle.append(conn)
+        else:
+            self._discard(conn)
+        self._slots.release()
+
+    def _discard(self, conn: UpstreamConnection):
+        conn.close()
+        self.connections -= 1
+
+    def close(self):
+        while self._idle:
+            self._discard(self._idle.pop())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": self.connections,
+            "idle_connections": len(self._idle),
+            "opened_total": self.opened,
+            "reused_total": self.reused,
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive,
+            "keepalive_expiry": self.keepalive_expiry
+        }
+
+# 연결 단위 헤더는 전달하지 않음 (RFC 9110 7.6.1), expect는 게이트웨이(uvicorn)가 처리
+HOP_BY_HOP_HEADERS = {
+    b"connection", b"keep-alive", b"proxy-authenticate", b"proxy-authorization",
+    b"te", b"trailer", b"transfer-encoding", b"upgrade", b"expect"
+}
+# date / server는 게이트웨이(uvicorn)가 직접 붙임
+SKIP_RESPONSE_HEADERS = HOP_BY_HOP_HEADERS | {b"date", b"server"}
+
+class UpstreamResponse:
+    """업스트림 응답 헤더와 본문 스트림 (본문을 끝까지 읽으면 연결 재사용 가능)"""
+
+    def __init__(self, conn: UpstreamConnection, status: int, headers: List[Tuple[bytes, bytes]],
+                 length: Optional[int], chunked: bool, keep_alive: bool):
+        self.conn = conn
+        self.status = status
+        self.headers = headers
+        self.length = length  # None이면 chunked 또는 연결 종료까지
+        self.chunked = chunked
+        self.keep_alive = keep_alive
+        self.complete = False
+
+    async def iter_body(self, timeout: float):
+        conn = self.conn
+        reader = conn.reader
+        if self.chunked:
+            while True:
+                line = await conn.timed(reader.readuntil(b"\r\n"), timeout)
+                remaining = int(line.split(b";", 1)[0], 16)
+                if remaining == 0:
+                    # trailer는 전달하지 않고 건너뜀
+                    while await conn.timed(reader.readuntil(b"\r\n"), timeout) != b"\r\n":
+                        pass
+                    break
+                while remaining > 0:
+                    data = await conn.timed(reader.read(min(remaining, 65536)), timeout)
+                    if not data:
+                        raise asyncio.IncompleteReadError(b"", remaining)
+                    remaining -= len(data)
+                    yield data
+                await conn.timed(reader.readexactly(2), timeout)
+        elif self.length is not None:
+            remaining = self.length
+            while remaining > 0:
+                data = await conn.timed(reader.read(min(remaining, 65536)), timeout)
+                if not data:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                remaining -= len(data)
+                yield data
+        else:
+            self.keep_alive = False
+            while True:
+                data = await conn.timed(reader.read(65536), timeout)
+                if not data:
+                    break
+                yield data
+        self.complete = True
+
+async def read_response_head(conn: UpstreamConnection, method: str, timeout: float) -> UpstreamResponse:
+    while True:
+        head = await conn.timed(conn.reader.readuntil(b"\r\n\r\n"), timeout)
+        lines = head[:-4].split(b"\r\n")
+        status_line = lines[0].split(b" ", 2)
+        status = int(status_line[1])
+        # 100 Continue 등 중간 응답은 건너뜀
+        if not 100 <= status < 200:
+            break
+
+    keep_alive = status_line[0] == b"HTTP/1.1"
+    length = None
+    chunked = False
+    headers = []
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        value = value.strip()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"transfer-encoding":
+            chunked = b"chunked" in value.lower()
+        elif name == b"connection":
+            tokens = value.lower()
+            if b"close" in tokens:
+                keep_alive = False
+            elif b"keep-alive" in tokens:
+                keep_alive = True
+        if name not in SKIP_RESPONSE_HEADERS:
+            headers.append((name, value))
+
+    if method == "HEAD" or status in (204, 304):
+        length, chunked = 0, False
+    elif chunked:
+        # transfer-encoding이 있으면 content-length는 무시 (RFC 9112 6.3)
+        length = None
+        headers = [(name, value) for name, value in headers if name != b"content-length"]
+    return UpstreamResponse(conn, status, headers, length, chunked, keep_alive)
+
+# 라우트 설정
+class UpstreamTarget:
+    """업스트림 인스턴스 하나 (헬스 체크 / 프록시 결과로 상태 갱신)"""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.pool = ConnectionPool(
+            self.url,
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            connect_timeout=settings.HTTP_CONNECT_TIMEOUT
+        )
+        self.healthy = True
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.requests = 0
+        self.errors = 0
+
+    def record_success(self):
+        self.failures = 0
+        if not self.healthy:
+            self.healthy = True
+            print(f"✅ 업스트림 복구: {self.url}")
+
+    def record_failure(self, error: str, threshold: int):
+        self.failures += 1
+        self.last_error = error
+        if self.healthy and self.failures >= threshold:
+            self.healthy = False
+            print(f"⚠️ 업스트림 제외: {self.url} ({error})")
+
+class Upstream:
+    def __init__(self, name: str, targets: List[str], health_path: Optional[str], timeout: float):
+        if not targets:
+            raise ValueError(f"업스트림 '{name}'에 targets가 없습니다")
+        self.name = name
+        self.targets = [UpstreamTarget(url) for url in targets]
+        self.health_path = health_path
+        self.timeout = timeout
+        self._next = 0
+
+    def candidates(self) -> List[UpstreamTarget]:
+        """라운드 로빈 순서로 정상 인스턴스 먼저, 모두 장애면 제외된 인스턴스도 시도"""
+        if len(self.targets) == 1:
+            return self.targets
+        start = self._next
+        self._next = (start + 1) % len(self.targets)
+        ordered = self.targets[start:] + self.targets[:start]
+        return [t for t in ordered if t.healthy] + [t for t in ordered if not t.healthy]
+
+class Route:
+    def __init__(self, prefix: str, upstream: Optional[Upstream]):
+        self.prefix = prefix.rstrip("/")
+        self.upstream = upstream  # None이면 외부에 공개하지 않는 경로 (404)
+
+    def matches(self, path: str) -> bool:
+        # "/api/chat"은 "/api/chat", "/api/chat/history"와 일치하고 "/api/chatroom"과는 일치하지 않음
+        return path.startswith(self.prefix) and (len(path) == len(self.prefix) or path[len(self.prefix)] == "/")
+
+class RouteTable:
+    def __init__(self, upstreams: Dict[str, Upstream], routes: List[Route]):
+        self.upstreams = upstreams
+        # 가장 긴 prefix부터 비교
+        self.routes = sorted(routes, key=lambda route: len(route.prefix), reverse=True)
+
+    def match(self, path: str) -> Optional[Route]:
+        for route in self.routes:
+            if route.matches(path):
+                return route
+        return None
+
+def load_route_table(path: str) -> RouteTable:
+    """routes.json 읽기 (targets에는 $LLMLINK_SERVICE_URL 같은 환경 변수 사용 가능)"""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+
+    upstreams = {
+        name: Upstream(
+            name,
+            [os.path.expandvars(url) for url in upstream["targets"]],
+            upstream.get("health_path", "/health"),
+            float(upstream.get("timeout", settings.UPSTREAM_TIMEOUT))
+        )
+        for name, upstream in config["upstreams"].items()
+    }
+    routes = []
+    for route in config["routes"]:
+        name = route.get("upstream")
+        if name is not None and name not in upstreams:
+            raise ValueError(f"라우트 {route['prefix']}: 알 수 없는 업스트림 '{name}'")
+        routes.append(Route(route["prefix"], upstreams[name] if name is not None else None))
+    return RouteTable(upstreams, routes)
+
+route_table = load_route_table(settings.GATEWAY_ROUTES_FILE)
+
+# 업스트림 헬스 체크
+class UpstreamHealthChecker:
+    """주기적으로 각 인스턴스의 health_path를 호출해서 상태 갱신"""
+
+    def __init__(self, interval: float, timeout: float, failure_threshold: int):
+        self.interval = interval
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self._task: Optional[asyncio.Task] = None
+
+    async def check(self, upstream: Upstream, target: UpstreamTarget):
+        try:
+            conn, _ = await target.pool.acquire()
+        except (OSError, asyncio.TimeoutError) as e:
+            target.record_failure(f"연결 실패: {type(e).__name__} {e}", self.failure_threshold)
+            return
+        response = None
+        try:
+            conn.writer.write(
+                f"GET {upstream.health_path} HTTP/1.1\r\n".encode() + b"host: " + target.pool.host_header + b"\r\n\r\n"
+            )
+            response = await read_response_head(conn, "GET", self.timeout)
+            async for _ in response.iter_body(self.timeout):
+                pass
+        except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError) as e:
+            target.record_failure(f"{type(e).__name__}: {e}", self.failure_threshold)
+            return
+        finally:
+            target.pool.release(conn, response is not None and response.complete and response.keep_alive)
+
+        if response.status >= 500:
+            target.record_failure(f"HTTP {response.status}", self.failure_threshold)
+        else:
+            target.record_success()
+
+    async def _run(self):
+        while True:
+            await asyncio.gather(*(
+                self.check(upstream, target)
+                for upstream in route_table.upstreams.values() if upstream.health_path
+                for target in upstream.targets
+            ))
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+health_checker = UpstreamHealthChecker(
+    interval=settings.HEALTH_CHECK_INTERVAL,
+    timeout=settings.HEALTH_CHECK_TIMEOUT,
+    failure_threshold=settings.HEALTH_CHECK_FAILURES
+)
+
+# 요청 속도 제한
+class RateLimitPolicy:
+    """window초에 limit개 속도로 채워지고 최대 burst개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, name: str, limit: float, window: float, burst: Optional[int] = None):
+        if limit <= 0 or window <= 0:
+            raise ValueError(f"속도 제한 정책 '{name}': limit과 window는 0보다 커야 합니다")
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.burst = burst or int(limit)
+        self.rate = limit / window  # 초당 채워지는 토큰 수
+        self.policy_header = f'{limit:g};w={window:g};burst={self.burst};name="{name}"'.encode()
+
+class RateLimitRule:
+    def __init__(self, prefix: str, policy: RateLimitPolicy, methods: Optional[List[str]] = None, exact: bool = False):
+        self.prefix = prefix.rstrip("/")
+        self.policy = policy
+        self.methods = {method.upper() for method in methods} if methods else None
+        self.exact = exact
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods is not None and method not in self.methods:
+            return False
+        if self.exact:
+            return path.rstrip("/") == self.prefix
+        return path.startswith(self.prefix) and (len(path) == len(self.prefix) or path[len(self.prefix)] == "/")
+
+class RateLimitBackend:
+    """토큰 버킷 저장소 인터페이스 - take()는 (허용 여부, 남은 토큰 수)"""
+
+    async def take(self, key: str, policy: RateLimitPolicy) -> Tuple[bool, float]:
+        raise NotImplementedError
+
+    def sweep(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """게이트웨이 프로세스 안의 토큰 버킷 (복제본마다 따로 계산)"""
+
+    def __init__(self):
+        self._buckets: Dict[str, List[float]] = {}  # key → [남은 토큰, 갱신 시각, 다시 가득 차는 시각]
+
+    async def take(self, key: str, policy: RateLimitPolicy) -> Tuple[bool, float]:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(policy.burst)
+            bucket = self._buckets[key] = [tokens, now, now]
+        else:
+            tokens = min(policy.burst, bucket[0] + (now - bucket[1]) * policy.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        bucket[0] = tokens
+        bucket[1] = now
+        bucket[2] = now + (policy.burst - tokens) / policy.rate
+        return allowed, tokens
+
+    def sweep(self):
+        """다시 가득 찬 버킷은 없는 것과 같으므로 삭제"""
+        now = time.monotonic()
+        for key in [key for key, bucket in self._buckets.items() if bucket[2] <= now]:
+            del self._buckets[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "buckets": len(self._buckets)}
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Redis에 토큰 버킷을 두고 Lua 스크립트로 원자적으로 갱신 (게이트웨이 복제본끼리 같은 한도 공유)
+
+    시각은 Redis 서버 시계(TIME)를 써서 복제본 간 시계 차이의 영향을 받지 않습니다.
+    """
+
+    SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, url: str, key_prefix: str = "gateway:ratelimit:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL을 사용하려면 redis 패키지가 필요합니다 (pip install redis)")
+        self.url = url
+        self.key_prefix = key_prefix
+        self._redis = redis.from_url(url)
+        self._script = self._redis.register_script(self.SCRIPT)
+
+    async def take(self, key: str, policy: RateLimitPolicy) -> Tuple[bool, float]:
+        allowed, tokens = await self._script(keys=[self.key_prefix + key], args=[policy.rate, policy.burst])
+        return int(allowed) == 1, float(tokens)
+
+    async def close(self):
+        await self._redis.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "url": self.url}
+
+RATE_LIMIT_EXPOSE_HEADERS = b"RateLimit-Limit, RateLimit-Remaining, RateLimit-Reset, RateLimit-Policy, Retry-After"
+
+class RateLimiter:
+    """요청을 정책별 토큰 버킷에 대조 (키: 정책 + JWT user_id, 토큰이 없거나 검증에 실패하면 클라이언트 IP)
+
+    검증하지 않은 토큰의 user_id로 키를 만들면 클라이언트가 요청마다 다른 user_id를 넣어
+    한도를 피하거나 다른 사용자의 버킷을 비울 수 있으므로, 서명과 만료를 확인한 토큰만 사용합니다.
+    """
+
+    def __init__(self, rules: List[RateLimitRule], default_policy: Optional[RateLimitPolicy],
+                 backend: RateLimitBackend, secret_key: str, token_cache_size: int):
+        self.rules = sorted(rules, key=lambda rule: len(rule.prefix), reverse=True)
+        self.default_policy = default_policy
+        self.backend = backend
+        self.secret_key = secret_key
+        self.token_cache_size = token_cache_size
+        self._identities: Dict[bytes, Tuple[str, float]] = {}  # JWT → (키, 만료 시각)
+        self._task: Optional[asyncio.Task] = None
+        self.allowed: Dict[str, int] = {}
+        self.rejected: Dict[str, int] = {}
+        self.rejected_by_client: Dict[str, int] = {}
+        self.backend_errors = 0
+
+    def policy_for(self, method: str, path: str) -> Optional[RateLimitPolicy]:
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule.policy
+        return self.default_policy
+
+    def identity(self, scope) -> str:
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                if value[:7].lower() == b"bearer ":
+                    token = value[7:].strip()
+                break
+
+        if token and self.secret_key:
+            cached = self._identities.get(token)
+            if cached is not None and cached[1] > time.time():
+                return cached[0]
+            try:
+                payload = jwt.decode(token, self.secret_key, algorithms=[settings.ALGORITHM], options={"require": ["exp"]})
+            except InvalidTokenError:
+                payload = None
+            if payload and payload.get("user_id") is not None and payload.get("type", "access") == "access":
+                key = f"user:{payload['user_id']}"
+                if len(self._identities) >= self.token_cache_size:
+                    del self._identities[next(iter(self._identities))]
+                self._identities[token] = (key, float(payload["exp"]))
+                return key
+
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def check(self, scope) -> Optional[Tuple[bool, List[Tuple[bytes, bytes]]]]:
+        """(허용 여부, 응답에 붙일 RateLimit 헤더) - 적용할 정책이 없으면 None"""
+        policy = self.policy_for(scope["method"], scope["path"])
+        if policy is None:
+            return None
+
+        client_key = self.identity(scope)
+        try:
+            allowed, tokens = await self.backend.take(f"{policy.name}:{client_key}", policy)
+        except Exception as e:
+            # 저장소 장애로 서비스 전체를 막지 않도록 허용 (fail-open)
+            if self.backend_errors == 0 or self.backend_errors % 1000 == 0:
+                print(f"⚠️ 속도 제한 저장소 오류, 제한 없이 통과: {e}")
+            self.backend_errors += 1
+            return None
+
+        headers = [
+            (b"ratelimit-limit", str(policy.burst).encode()),
+            (b"ratelimit-remaining", str(int(tokens)).encode()),
+            (b"ratelimit-reset", str(math.ceil((policy.burst - tokens) / policy.rate)).encode()),
+            (b"ratelimit-policy", policy.policy_header)
+        ]
+        if allowed:
+            self.allowed[policy.name] = self.allowed.get(policy.name, 0) + 1
+        else:
+            self.rejected[policy.name] = self.rejected.get(policy.name, 0) + 1
+            self.rejected_by_client[client_key] = self.rejected_by_client.get(client_key, 0) + 1
+            headers.append((b"retry-after", str(math.ceil((1 - tokens) / policy.rate)).encode()))
+        return allowed, headers
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(60)
+            self.backend.sweep()
+            now = time.time()
+            for token in [token for token, (_, exp) in self._identities.items() if exp <= now]:
+                del self._identities[token]
+            # 거부 횟수는 최근 상위 클라이언트만 유지
+            if len(self.rejected_by_client) > 1000:
+                top = sorted(self.rejected_by_client.items(), key=lambda item: item[1], reverse=True)[:100]
+                self.rejected_by_client = dict(top)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        policies = {rule.policy.name: rule.policy for rule in self.rules}
+        if self.default_policy is not None:
+            policies[self.default_policy.name] = self.default_policy
+        return {
+            **self.backend.stats(),
+            "backend_errors": self.backend_errors,
+            "policies": {
+                name: {
+                    "limit": policy.limit,
+                    "window": policy.window,
+                    "burst": policy.burst,
+                    "allowed": self.allowed.get(name, 0),
+                    "rejected": self.rejected.get(name, 0)
+                }
+                for name, policy in policies.items()
+            },
+            "top_rejected_clients": dict(
+                sorted(self.rejected_by_client.items(), key=lambda item: item[1], reverse=True)[:20]
+            ),
+            "cached_tokens": len(self._identities)
+        }
+
+def load_rate_limiter(path: str) -> Optional[RateLimiter]:
+    """routes.json의 rate_limits 읽기 (없거나 RATE_LIMIT_ENABLED=false면 None)"""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f).get("rate_limits")
+    if not config or not settings.RATE_LIMIT_ENABLED:
+        return None
+    if not settings.SECRET_KEY:
+        raise RuntimeError("속도 제한을 사용하려면 서비스와 같은 SECRET_KEY가 필요합니다 (사용하지 않으려면 RATE_LIMIT_ENABLED=false)")
+
+    policies = {
+        name: RateLimitPolicy(name, policy["limit"], policy["window"], policy.get("burst"))
+        for name, policy in config["policies"].items()
+    }
+    rules = []
+    for rule in config.get("rules", []):
+        if rule["policy"] not in policies:
+            raise ValueError(f"속도 제한 규칙 {rule['prefix']}: 알 수 없는 정책 '{rule['policy']}'")
+        rules.append(RateLimitRule(rule["prefix"], policies[rule["policy"]], rule.get("methods"), rule.get("exact", False)))
+    default_policy = config.get("default_policy")
+    if default_policy is not None and default_policy not in policies:
+        raise ValueError(f"알 수 없는 기본 속도 제한 정책 '{default_policy}'")
+
+    backend = RedisRateLimitBackend(settings.RATE_LIMIT_REDIS_URL) if settings.RATE_LIMIT_REDIS_URL else MemoryRateLimitBackend()
+    return RateLimiter(
+        rules,
+        policies[default_policy] if default_policy is not None else None,
+        backend,
+        settings.SECRET_KEY,
+        settings.RATE_LIMIT_TOKEN_CACHE_SIZE
+    )
+
+rate_limiter = load_rate_limiter(settings.GATEWAY_ROUTES_FILE)
+
+# 리버스 프록시
+async def send_error(send, status_code: int, detail: str, headers: Optional[List[Tuple[bytes, bytes]]] = None):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())] + (headers or [])
+    })
+    await send({"type": "http.response.body", "body": body})
+
+def build_request_head(scope, host_header: bytes, chunked: bool) -> bytes:
+    """클라이언트 요청 헤더에서 연결 단위 헤더를 빼고 X-Forwarded-* 추가"""
+    path = scope.get("raw_path") or scope["path"].encode()
+    if scope["query_string"]:
+        path += b"?" + scope["query_string"]
+    parts = [scope["method"].encode(), b" ", path, b" HTTP/1.1\r\nhost: ", host_header, b"\r\n"]
+    forwarded_for = b""
+    forwarded_host = b""
+    for name, value in scope["headers"]:
+        if name == b"host":
+            forwarded_host = value
+        elif name == b"x-forwarded-for":
+            forwarded_for = value + b", "
+        elif name not in HOP_BY_HOP_HEADERS and not (chunked and name == b"content-length"):
+            parts += [name, b": ", value, b"\r\n"]
+    client = scope.get("client")
+    parts += [b"x-forwarded-for: ", forwarded_for, client[0].encode() if client else b"unknown", b"\r\n"]
+    parts += [b"x-forwarded-proto: ", scope.get("scheme", "http").encode(), b"\r\n"]
+    if forwarded_host:
+        parts += [b"x-forwarded-host: ", forwarded_host, b"\r\n"]
+    if chunked:
+        parts.append(b"transfer-encoding: chunked\r\n")
+    parts.append(b"\r\n")
+    return b"".join(parts)
+
+def request_body_framing(scope) -> Tuple[bool, bool]:
+    """(본문 있음, chunked 전송) - 길이를 모르는 본문은 업스트림에도 chunked로 전달"""
+    has_body = chunked = False
+    for name, value in scope["headers"]:
+        if name == b"content-length":
+            has_body = value != b"0"
+        elif name == b"transfer-encoding":
+            has_body = chunked = True
+    return has_body, chunked
+
+async def send_request(upstream: Upstream, target: UpstreamTarget, scope, receive, first_body: bytes,
+                       more_body: bool, chunked: bool) -> UpstreamResponse:
+    """업스트림으로 요청을 보내고 응답 헤더까지 읽기"""
+    pool = target.pool
+    for attempt in range(2):
+        conn, reused = await pool.acquire()
+        streamed = False
+        try:
+            head = build_request_head(scope, pool.host_header, chunked)
+            if chunked:
+                body = b"%x\r\n%s\r\n" % (len(first_body), first_body) if first_body else b""
+                if not more_body:
+                    body += b"0\r\n\r\n"
+            else:
+                body = first_body
+            # 헤더와 첫 본문 조각을 한 번에 전송
+            conn.writer.write(head + body)
+            if more_body:
+                # 나머지 본문은 버퍼링하지 않고 받는 대로 전달 (이후에는 재시도 불가)
+                streamed = True
+                while True:
+                    message = await receive()
+                    if message["type"] == "http.disconnect":
+                        raise UpstreamError(499, "Client disconnected")
+                    chunk = message.get("body", b"")
+                    if chunk:
+                        conn.writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk) if chunked else chunk)
+                    if not message.get("more_body", False):
+                        break
+                    await conn.writer.drain()
+                if chunked:
+                    conn.writer.write(b"0\r\n\r\n")
+            await conn.writer.drain()
+            return await read_response_head(conn, scope["method"], upstream.timeout)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            pool.release(conn, False)
+            # 오래된 keep-alive 연결을 업스트림이 이미 닫은 경우 새 연결로 한 번 더 시도
+            if reused and not streamed and attempt == 0:
+                continue
+            raise UpstreamError(502, f"Upstream '{upstream.name}' connection lost: {type(e).__name__}")
+        except asyncio.TimeoutError:
+            pool.release(conn, False)
+            raise UpstreamError(504, f"Upstream '{upstream.name}' timed out")
+        except BaseException:
+            pool.release(conn, False)
+            raise
+
+async def proxy_request(upstream: Upstream, scope, receive, send):
+    """요청을 업스트림으로 전달하고 응답을 버퍼링 없이 그대로 스트리밍"""
+    has_body, chunked = request_body_framing(scope)
+    first_body = b""
+    more_body = False
+    if has_body:
+        # 한 번에 받은 본문은 메모리에 있으므로 다른 인스턴스로 재시도해도 안전
+        message = await receive()
+        first_body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+    response = None
+    for target in upstream.candidates():
+        target.requests += 1
+        try:
+            response = await send_request(upstream, target, scope, receive, first_body, more_body, chunked)
+            break
+        except (OSError, asyncio.TimeoutError) as e:
+            # 연결하지 못한 경우 요청이 전달되지 않았으므로 다음 인스턴스로 페일오버
+            target.errors += 1
+            target.record_failure(f"연결 실패: {type(e).__name__} {e}", settings.HEALTH_CHECK_FAILURES)
+        except UpstreamError as e:
+            if e.status_code == 499:
+                return
+            target.errors += 1
+            print(f"❌ 업스트림 요청 실패 ({target.url}{scope['path']}): {e.detail}")
+            await send_error(send, e.status_code, e.detail)
+            return
+        except (ValueError, asyncio.LimitOverrunError) as e:
+            target.errors += 1
+            print(f"❌ 업스트림 응답 해석 실패 ({target.url}{scope['path']}): {e}")
+            await send_error(send, 502, f"Upstream '{upstream.name}' sent an invalid response")
+            return
+
+    if response is None:
+        print(f"❌ 업스트림 '{upstream.name}'의 모든 인스턴스에 연결 실패 ({scope['path']})")
+        await send_error(send, 503, f"Upstream '{upstream.name}' unavailable")
+        return
+
+    # 길이를 모르는 스트리밍 응답(SSE 등)은 클라이언트가 끊으면 업스트림 연결도 끊어서 작업 중단
+    # (요청 본문은 이미 모두 보냈으므로 이후 receive()는 연결 종료만 알려줌)
+    disconnect_watcher = None
+    if response.length is None:
+        async def watch_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            response.conn.close()
+        disconnect_watcher = asyncio.create_task(watch_disconnect())
+
+    try:
+        await send({"type": "http.response.start", "status": response.status, "headers": response.headers})
+        # 길이를 알면 마지막 조각에 응답 끝을 함께 보내서 send 호출 한 번 절약
+        remaining = response.length if response.length is not None else -1
+        async for chunk in response.iter_body(upstream.timeout):
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": remaining != 0})
+        if remaining != 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+    except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+        if disconnect_watcher is None or not disconnect_watcher.done():
+            # 이미 응답을 보내기 시작했으므로 응답을 끝내지 않고 반환 (uvicorn이 클라이언트 연결을 끊음)
+            target.errors += 1
+            print(f"❌ 업스트림 응답 스트리밍 중단 ({target.url}{scope['path']}): {type(e).__name__} {e}")
+    finally:
+        if disconnect_watcher is not None:
+            disconnect_watcher.cancel()
+        target.pool.release(response.conn, response.complete and response.keep_alive)
+
+def allowed_origin(scope) -> Optional[bytes]:
+    for name, value in scope["headers"]:
+        if name == b"origin":
+            return value if value.decode("latin-1") in settings.ALLOWED_ORIGINS else None
+    return None
+
+def with_response_headers(send, extra_headers: List[Tuple[bytes, bytes]], origin: Optional[bytes]):
+    """응답 헤더에 RateLimit 헤더 추가, 게이트웨이가 직접 만든 응답에는 CORS 헤더도 추가"""
+    async def send_with_headers(message):
+        if message["type"] == "http.response.start":
+            headers = list(message.get("headers", [])) + extra_headers
+            if origin is not None:
+                if not any(name == b"access-control-allow-origin" for name, _ in headers):
+                    headers += [
+                        (b"access-control-allow-origin", origin),
+                        (b"access-control-allow-credentials", b"true"),
+                        (b"vary", b"Origin")
+                    ]
+                if extra_headers:
+                    headers.append((b"access-control-expose-headers", RATE_LIMIT_EXPOSE_HEADERS))
+            message = {**message, "headers": headers}
+        await send(message)
+    return send_with_headers
+
+class ReverseProxyMiddleware:
+    """routes.json에 등록된 경로는 업스트림으로 전달하고 나머지(/health 등)는 게이트웨이 앱에서 처리"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            route = route_table.match(scope["path"])
+            if route is not None:
+                origin = allowed_origin(scope)
+                extra_headers = []
+                if route.upstream is not None and rate_limiter is not None and scope["method"] != "OPTIONS":
+                    result = await rate_limiter.check(scope)
+                    if result is not None:
+                        allowed, extra_headers = result
+                        if not allowed:
+                            await send_error(with_response_headers(send, extra_headers, origin), 429, "Too Many Requests")
+                            return
+                if extra_headers or origin is not None:
+                    send = with_response_headers(send, extra_headers, origin)
+
+                if route.upstream is None:
+                    await send_error(send, 404, "Not Found")
+                else:
+                    await proxy_request(route.upstream, scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+# FastAPI 앱 생성
+app = FastAPI(
+    title="오터스 API 게이트웨이",
+    description="서비스별 요청 라우팅 리버스 프록시",
+    version="1.0.0"
+)
+
+# CORS 헤더는 각 서비스 응답을 그대로 전달
+app.add_middleware(ReverseProxyMiddleware)
+
+# 기본 엔드포인트
+@app.get("/")
+async def root():
+    return {
+        "message": "오터스 API 게이트웨이",
+        "status": "running",
+        "routes": {
+            route.prefix: route.upstream.name if route.upstream else None
+            for route in route_table.routes
+        }
+    }
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy", "service": "api-gateway"}
+
+@app.get("/health/upstreams")
+async def upstream_health():
+    return {
+        name: {
+            "health_path": upstream.health_path,
+            "timeout": upstream.timeout,
+            "targets": [
+                {
+                    "url": target.url,
+                    "healthy": target.healthy,
+                    "failures": target.failures,
+                    "last_error": target.last_error,
+                    "requests": target.requests,
+                    "errors": target.errors,
+                    "pool": target.pool.stats()
+                }
+                for target in upstream.targets
+            ]
+        }
+        for name, upstream in route_table.upstreams.items()
+    }
+
+@app.get("/health/rate-limits")
+async def rate_limit_stats():
+    if rate_limiter is None:
+        return {"enabled": False}
+    return {"enabled": True, **rate_limiter.stats()}
+
+@app.on_event("startup")
+async def startup_event():
+    health_checker.start()
+    if rate_limiter is not None:
+        rate_limiter.start()
+    print(f"📋 라우트 {len(route_table.routes)}개 로드: {settings.GATEWAY_ROUTES_FILE}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await health_checker.close()
+    if rate_limiter is not None:
+        await rate_limiter.close()
+    for upstream in route_table.upstreams.values():
+        for target in upstream.targets:
+            target.pool.close()
+
+if __name__ == "__main__":
+    print("🚀 오터스 API 게이트웨이 시작")
+    print(f"📋 라우트 설정: {settings.GATEWAY_ROUTES_FILE}")
+    for route in route_table.routes:
+        target = ", ".join(t.url for t in route.upstream.targets) if route.upstream else "차단"
+        print(f"   - {route.prefix} → {target}")
+
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8080,
+        reload=True,
+        log_level="info"
+    )
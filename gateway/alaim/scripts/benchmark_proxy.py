@@ -0,0 +1,72 @@
+"""
+게이트웨이 오버헤드 벤치마크
+- 같은 요청을 업스트림 스텁에 직접 보낸 경우와 게이트웨이를 거친 경우의 지연 시간을 비교
+- 두 경로를 번갈아 측정해서 시스템 부하 변화가 한쪽에만 반영되지 않도록 함
+
+사용 예 (gateway/alaim 폴더에서 실행):
+    uvicorn scripts.upstream_stub:app --port 9001 --log-level warning
+    GATEWAY_ROUTES_FILE=scripts/bench_routes.json uvicorn app.main:app --port 8080 --log-level warning
+    python scripts/benchmark_proxy.py --requests 5000 --concurrency 1
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def measure(client: httpx.AsyncClient, url: str, requests: int, concurrency: int) -> List[float]:
+    latencies: List[float] = []
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.get(url)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+async def run(direct_url: str, gateway_url: str, path: str, requests: int, concurrency: int, rounds: int):
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+    direct: List[float] = []
+    proxied: List[float] = []
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        # 연결 예열
+        await measure(client, direct_url + path, 200, concurrency)
+        await measure(client, gateway_url + path, 200, concurrency)
+        for _ in range(rounds):
+            direct += await measure(client, direct_url + path, requests // rounds, concurrency)
+            proxied += await measure(client, gateway_url + path, requests // rounds, concurrency)
+
+    print(f"📊 {path} - 요청 {len(direct)}개씩, 동시 {concurrency}개")
+    for pct in (50, 90, 99):
+        d = percentile(direct, pct) * 1000
+        p = percentile(proxied, pct) * 1000
+        print(f"   p{pct}: 직접 {d:.3f}ms / 게이트웨이 {p:.3f}ms / 오버헤드 {p - d:.3f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="게이트웨이 오버헤드 벤치마크")
+    parser.add_argument("--direct-url", default="http://localhost:9001", help="업스트림 스텁 주소")
+    parser.add_argument("--gateway-url", default="http://localhost:8080", help="게이트웨이 주소")
+    parser.add_argument("--path", default="/api/chat/ping")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=10, help="직접/게이트웨이를 번갈아 측정하는 횟수")
+    args = parser.parse_args()
+    asyncio.run(run(args.direct_url, args.gateway_url, args.path, args.requests, args.concurrency, args.rounds))
+
+if __name__ == "__main__":
+    main()
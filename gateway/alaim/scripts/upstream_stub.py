@@ -0,0 +1,63 @@
+"""
+게이트웨이 벤치마크용 업스트림 스텁 (프레임워크 없는 ASGI 앱, 스텁 자체 지연 최소화)
+- GET  /health, /api/chat/ping : 작은 JSON 응답
+- GET  /api/chat/large?size=N : N바이트 응답을 64KB 조각으로 스트리밍
+- GET  /api/chat/sse?events=N&interval=S : SSE 이벤트 N개를 S초 간격으로 전송
+- POST /api/chat/echo : 받은 본문 크기를 세서 반환 (본문을 메모리에 모으지 않음)
+
+사용 예:
+    uvicorn scripts.upstream_stub:app --port 9001 --log-level warning
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+CHUNK = b"x" * 65536
+
+async def send_json(send, payload: dict, status: int = 200):
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+async def app(scope, receive, send):
+    if scope["type"] != "http":
+        return
+    path = scope["path"]
+    query = {key: values[0] for key, values in parse_qs(scope["query_string"].decode()).items()}
+
+    if path in ("/health", "/api/chat/ping"):
+        await send_json(send, {"status": "ok", "path": path})
+    elif path == "/api/chat/large":
+        size = int(query.get("size", 10 * 1024 * 1024))
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/octet-stream"), (b"content-length", str(size).encode())]
+        })
+        while size > 0:
+            chunk = CHUNK[:size]
+            size -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": size > 0})
+    elif path == "/api/chat/sse":
+        events = int(query.get("events", 5))
+        interval = float(query.get("interval", 0.5))
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/event-stream")]})
+        for i in range(events):
+            await send({"type": "http.response.body", "body": f"data: {i}\n\n".encode(), "more_body": True})
+            await asyncio.sleep(interval)
+        await send({"type": "http.response.body", "body": b""})
+    elif path == "/api/chat/echo":
+        received = 0
+        while True:
+            message = await receive()
+            received += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        await send_json(send, {"received": received})
+    else:
+        await send_json(send, {"detail": "Not Found"}, status=404)
@@ -0,0 +1,9 @@
+import os
+import sys
+
+SECRET_KEY = "gateway-test-secret-key-0123456789"
+# app.main은 import할 때 routes.json의 속도 제한을 읽으므로 먼저 서명 키 지정
+os.environ.setdefault("SECRET_KEY", SECRET_KEY)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import app.main as main  # noqa: E402,F401
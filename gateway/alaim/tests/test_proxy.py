@@ -0,0 +1,237 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from conftest import main
+
+async def read_request(reader: asyncio.StreamReader):
+    """업스트림 쪽에서 요청 하나 읽기 - (method, path, headers, body), 연결이 닫혔으면 None"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    lines = head[:-4].decode("latin-1").split("\r\n")
+    method, path, _ = lines[0].split(" ", 2)
+    headers = []
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers.append((name.strip().lower(), value.strip()))
+    fields = dict(headers)
+    body = b""
+    if fields.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+            if size == 0:
+                await reader.readuntil(b"\r\n")
+                break
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+    elif "content-length" in fields:
+        body = await reader.readexactly(int(fields["content-length"]))
+    return method, path, headers, body
+
+class UpstreamStub:
+    """asyncio 소켓 서버 업스트림 - 연결마다 serve(stub, 연결 번호, reader, writer) 실행"""
+
+    def __init__(self, serve):
+        self.serve = serve
+        self.requests = []
+        self.connections = 0
+        self.closed = asyncio.Event()
+
+    async def handle(self, reader, writer):
+        number = self.connections
+        self.connections += 1
+        try:
+            await self.serve(self, number, reader, writer)
+        finally:
+            writer.close()
+            self.closed.set()
+
+    async def next_request(self, reader):
+        request = await read_request(reader)
+        if request is not None:
+            self.requests.append(request)
+        return request
+
+@asynccontextmanager
+async def upstream_stub(serve, timeout: float = 5):
+    stub = UpstreamStub(serve)
+    server = await asyncio.start_server(stub.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    upstream = main.Upstream("stub", [f"http://127.0.0.1:{port}"], None, timeout)
+    try:
+        yield stub, upstream
+    finally:
+        upstream.targets[0].pool.close()
+        server.close()
+
+def response_bytes(status: str, headers, body: bytes = b"") -> bytes:
+    return f"HTTP/1.1 {status}\r\n".encode() + b"".join(f"{name}: {value}\r\n".encode() for name, value in headers) + b"\r\n" + body
+
+async def keep_alive(stub, number, reader, writer):
+    """요청마다 경로에 따라 Content-Length 또는 chunked 응답, 연결은 계속 유지"""
+    while (request := await stub.next_request(reader)) is not None:
+        _, path, _, body = request
+        payload = b"echo:" + body if body else path.encode()
+        if path.startswith("/chunked"):
+            writer.write(response_bytes("200 OK", [("Transfer-Encoding", "chunked"), ("X-Upstream", str(number))]))
+            for start in range(0, len(payload), 3):
+                piece = payload[start:start + 3]
+                writer.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+            writer.write(b"0\r\nX-Trailer: ignored\r\n\r\n")
+        else:
+            writer.write(response_bytes("200 OK", [
+                ("Content-Length", len(payload)), ("X-Upstream", str(number)),
+                ("Connection", "keep-alive"), ("Keep-Alive", "timeout=5"), ("Server", "stub")
+            ], payload))
+        await writer.drain()
+
+def scope(path: str, method: str = "GET", headers=(), client=("10.0.0.1", 5000)):
+    return {
+        "type": "http", "method": method, "path": path, "raw_path": path.encode(), "query_string": b"",
+        "scheme": "http", "headers": [(name.encode(), value.encode()) for name, value in headers], "client": client
+    }
+
+async def proxy(upstream, scope, body_chunks=(), disconnect: asyncio.Event = None):
+    """proxy_request 실행 - (상태, 헤더 dict, 본문, 보낸 body 메시지 목록)"""
+    pending = list(body_chunks)
+    sent = []
+
+    async def receive():
+        if pending:
+            chunk = pending.pop(0)
+            return {"type": "http.request", "body": chunk, "more_body": bool(pending)}
+        if disconnect is not None:
+            await disconnect.wait()
+        else:
+            await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await main.proxy_request(upstream, scope, receive, send)
+    start, bodies = sent[0], sent[1:]
+    headers = {name.decode(): value.decode() for name, value in start["headers"]}
+    return start["status"], headers, b"".join(message.get("body", b"") for message in bodies), bodies
+
+def test_content_length_and_chunked_responses_reuse_one_connection():
+    async def scenario():
+        async with upstream_stub(keep_alive) as (stub, upstream):
+            pool = upstream.targets[0].pool
+            status, headers, body, messages = await proxy(upstream, scope("/plain"))
+            assert (status, body) == (200, b"/plain")
+            assert headers["content-length"] == "6" and headers["x-upstream"] == "0"
+            # 연결 단위 헤더와 게이트웨이가 붙이는 헤더는 전달하지 않음
+            assert not {"connection", "keep-alive", "server"} & set(headers)
+            assert messages[-1]["more_body"] is False
+
+            status, headers, body, messages = await proxy(upstream, scope("/chunked/stream"))
+            assert (status, body) == (200, b"/chunked/stream")
+            assert "transfer-encoding" not in headers and "content-length" not in headers
+            assert [message["body"] for message in messages[:-1]] == [b"/ch", b"unk", b"ed/", b"str", b"eam"]
+            assert messages[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+            assert headers["x-upstream"] == "0"
+
+            await proxy(upstream, scope("/plain"))
+            assert stub.connections == 1
+            assert (pool.opened, pool.reused, pool.stats()["idle_connections"]) == (1, 2, 1)
+    asyncio.run(scenario())
+
+def test_request_bodies_are_forwarded_with_their_framing():
+    async def scenario():
+        async with upstream_stub(keep_alive) as (stub, upstream):
+            status, _, body, _ = await proxy(
+                upstream, scope("/upload", "POST", [("content-length", "11")]), [b"hello ", b"world"]
+            )
+            assert (status, body) == (200, b"echo:hello world")
+            status, _, body, _ = await proxy(
+                upstream, scope("/upload", "POST", [("transfer-encoding", "chunked")]), [b"a", b"", b"bc"]
+            )
+            assert (status, body) == (200, b"echo:abc")
+        first, second = stub.requests
+        assert ("content-length", "11") in first[2] and first[3] == b"hello world"
+        assert ("transfer-encoding", "chunked") in second[2] and second[3] == b"abc"
+        assert stub.connections == 1
+    asyncio.run(scenario())
+
+def test_headers_pass_through_without_hop_by_hop_headers():
+    async def scenario():
+        async with upstream_stub(keep_alive) as (stub, upstream):
+            await proxy(upstream, scope("/headers", headers=[
+                ("host", "api.example.com"), ("authorization", "Bearer abc"), ("x-request-id", "r-1"),
+                ("cookie", "a=1"), ("cookie", "b=2"), ("x-forwarded-for", "1.2.3.4"),
+                ("connection", "keep-alive, x-secret"), ("te", "trailers"), ("upgrade", "websocket")
+            ]))
+            return stub.requests[0][2], upstream.targets[0].pool.host_header.decode()
+    headers, host = asyncio.run(scenario())
+    assert headers == [
+        ("host", host),
+        ("authorization", "Bearer abc"), ("x-request-id", "r-1"), ("cookie", "a=1"), ("cookie", "b=2"),
+        ("x-forwarded-for", "1.2.3.4, 10.0.0.1"), ("x-forwarded-proto", "http"), ("x-forwarded-host", "api.example.com")
+    ]
+
+def test_pooled_connection_closed_by_upstream_is_replaced():
+    async def close_after_each(stub, number, reader, writer):
+        # 첫 연결: 응답 후 바로 닫음 / 둘째 연결: 다음 요청을 받고 응답 없이 닫음 (유휴 연결 만료와 요청이 겹친 경우)
+        await stub.next_request(reader)
+        writer.write(response_bytes("200 OK", [("Content-Length", 2)], b"ok"))
+        await writer.drain()
+        if number == 1:
+            await stub.next_request(reader)
+
+    async def scenario():
+        async with upstream_stub(close_after_each) as (stub, upstream):
+            pool = upstream.targets[0].pool
+            assert (await proxy(upstream, scope("/a")))[0] == 200
+            await stub.closed.wait()
+            await asyncio.sleep(0.01)
+            # 이미 닫힌 유휴 연결은 꺼내면서 버리고 새로 연결
+            assert (await proxy(upstream, scope("/b")))[0] == 200
+            assert (pool.opened, pool.reused) == (2, 0)
+            # 재사용한 연결이 요청 도중 끊기면 새 연결로 한 번 재시도
+            status, _, body, _ = await proxy(upstream, scope("/c"))
+            assert (status, body) == (200, b"ok")
+            assert (pool.opened, pool.reused, stub.connections) == (3, 1, 3)
+            assert [request[1] for request in stub.requests] == ["/a", "/b", "/c", "/c"]
+            assert upstream.targets[0].errors == 0
+    asyncio.run(scenario())
+
+def test_new_connection_dropped_by_upstream_is_not_retried():
+    async def drop(stub, number, reader, writer):
+        await stub.next_request(reader)
+
+    async def scenario():
+        async with upstream_stub(drop) as (stub, upstream):
+            status, headers, body, _ = await proxy(upstream, scope("/a"))
+            assert status == 502 and b"connection lost" in body
+            assert stub.connections == 1
+            assert upstream.targets[0].pool.stats()["connections"] == 0
+    asyncio.run(scenario())
+
+def test_client_disconnect_mid_stream_closes_upstream_connection():
+    async def endless_events(stub, number, reader, writer):
+        await stub.next_request(reader)
+        writer.write(response_bytes("200 OK", [("Content-Type", "text/event-stream"), ("Transfer-Encoding", "chunked")]))
+        writer.write(b"%x\r\n%s\r\n" % (len(b"data: 1\n\n"), b"data: 1\n\n"))
+        await writer.drain()
+        # 클라이언트가 끊으면 게이트웨이가 연결을 닫아서 EOF
+        assert await reader.read() == b""
+        stub.upstream_closed.set()
+
+    async def scenario():
+        async with upstream_stub(endless_events) as (stub, upstream):
+            stub.upstream_closed = asyncio.Event()
+            disconnect = asyncio.Event()
+            task = asyncio.create_task(proxy(upstream, scope("/api/chat/stream", "POST"), disconnect=disconnect))
+            await asyncio.sleep(0.05)
+            assert not task.done()
+            disconnect.set()
+            status, _, body, messages = await asyncio.wait_for(task, 2)
+            assert (status, body) == (200, b"data: 1\n\n")
+            assert messages[-1]["more_body"] is True  # 응답을 끝내지 않음
+            await asyncio.wait_for(stub.upstream_closed.wait(), 2)
+            pool = upstream.targets[0].pool
+            assert pool.stats()["connections"] == 0 and pool.stats()["idle_connections"] == 0
+            assert upstream.targets[0].errors == 0
+    asyncio.run(scenario())
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import httpx
+import jwt
+import pytest
+
+from conftest import SECRET_KEY, main
+
+def token(key: str = SECRET_KEY, **claims) -> str:
+    payload = {"user_id": 1, "type": "access", "exp": int(time.time()) + 600, **claims}
+    payload = {name: value for name, value in payload.items() if value is not None}
+    return jwt.encode(payload, key, algorithm="HS256")
+
+def scope(path: str = "/api/chat", method: str = "POST", bearer: str = None, ip: str = "10.0.0.1"):
+    headers = [(b"authorization", f"Bearer {bearer}".encode())] if bearer else []
+    return {"type": "http", "method": method, "path": path, "headers": headers, "client": (ip, 5000)}
+
+def limiter(secret_key: str = SECRET_KEY, chat_limit: float = 60, chat_window: float = 60) -> main.RateLimiter:
+    chat = main.RateLimitPolicy("chat", chat_limit, chat_window, burst=3)
+    default = main.RateLimitPolicy("default", 600, 60, burst=100)
+    rules = [main.RateLimitRule("/api/chat", chat, methods=["POST"], exact=True)]
+    return main.RateLimiter(rules, default, main.MemoryRateLimitBackend(), secret_key, 100)
+
+def test_bucket_allows_burst_then_rejects_with_retry_after():
+    async def scenario():
+        rate_limiter = limiter()
+        results = [await rate_limiter.check(scope(bearer=token())) for _ in range(4)]
+        assert [allowed for allowed, _ in results] == [True, True, True, False]
+        headers = dict(results[-1][1])
+        assert headers[b"ratelimit-limit"] == b"3"
+        assert headers[b"ratelimit-remaining"] == b"0"
+        assert int(headers[b"retry-after"]) == 1  # 60초에 60개 → 1초 뒤 한 개
+        assert b"retry-after" not in dict(results[0][1])
+        # 다른 사용자, 다른 정책은 별도 버킷
+        assert (await rate_limiter.check(scope(bearer=token(user_id=2))))[0]
+        assert (await rate_limiter.check(scope(method="GET", bearer=token())))[0]
+        assert rate_limiter.rejected == {"chat": 1}
+        assert rate_limiter.rejected_by_client == {"user:1": 1}
+    asyncio.run(scenario())
+
+def test_bucket_refills_over_time():
+    async def scenario():
+        rate_limiter = limiter(chat_limit=100, chat_window=1)
+        results = [(await rate_limiter.check(scope()))[0] for _ in range(4)]
+        assert results == [True, True, True, False]
+        await asyncio.sleep(0.02)  # 초당 100개 → 0.02초면 한 개 이상 충전
+        assert (await rate_limiter.check(scope()))[0]
+    asyncio.run(scenario())
+
+def test_only_verified_tokens_are_keyed_by_user():
+    rate_limiter = limiter()
+    assert rate_limiter.identity(scope(bearer=token())) == "user:1"
+    unverifiable = [
+        token(key="someone-elses-key-0123456789abcdef", user_id=2),
+        token(user_id=3, exp=int(time.time()) - 10),
+        token(user_id=4, exp=None),
+        token(user_id=5, type="refresh"),
+        jwt.encode({"user_id": 6, "exp": int(time.time()) + 600}, None, algorithm="none"),
+        "not-a-jwt"
+    ]
+    assert [rate_limiter.identity(scope(bearer=value)) for value in unverifiable] == ["ip:10.0.0.1"] * len(unverifiable)
+
+def test_without_secret_key_every_request_is_keyed_by_ip():
+    rate_limiter = limiter(secret_key="")
+    assert rate_limiter.identity(scope(bearer=token())) == "ip:10.0.0.1"
+    assert rate_limiter.identity(scope(bearer=token(key="any-key-anyone-can-sign-with-0123"), ip="10.0.0.2")) == "ip:10.0.0.2"
+
+def test_refuses_to_start_without_secret_key(monkeypatch):
+    monkeypatch.setattr(main.settings, "SECRET_KEY", "")
+    with pytest.raises(RuntimeError):
+        main.load_rate_limiter(main.settings.GATEWAY_ROUTES_FILE)
+    monkeypatch.setattr(main.settings, "RATE_LIMIT_ENABLED", False)
+    assert main.load_rate_limiter(main.settings.GATEWAY_ROUTES_FILE) is None
+
+def test_forged_tokens_share_the_client_ip_bucket(monkeypatch):
+    async def upstream(upstream, scope, receive, send):
+        await main.send_error(send, 200, "ok")
+    monkeypatch.setattr(main, "proxy_request", upstream)
+    monkeypatch.setattr(main, "rate_limiter", limiter())
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app, client=("10.0.0.9", 5000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+            # 요청마다 user_id를 바꾼 위조 토큰이어도 같은 IP 버킷에서 차감
+            responses = [
+                await client.post("/api/chat", headers={"Authorization": f"Bearer {token(key='forged-key-0123456789abcdefghijklm', user_id=i)}"})
+                for i in range(4)
+            ]
+            verified = await client.post("/api/chat", headers={"Authorization": f"Bearer {token()}"})
+        return responses, verified
+    responses, verified = asyncio.run(scenario())
+    assert [response.status_code for response in responses] == [200, 200, 200, 429]
+    assert responses[-1].json() == {"detail": "Too Many Requests"}
+    assert int(responses[-1].headers["retry-after"]) >= 1
+    assert responses[-1].headers["ratelimit-remaining"] == "0"
+    assert verified.status_code == 200
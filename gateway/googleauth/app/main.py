@@ -3,16 +3,24 @@
 - 프론트엔드에서 오는 구글 로그인 요청을 받아서 처리
 - 구글 OAuth2 토큰 검증 및 사용자 정보 조회
 - JWT 토큰 발급 및 리다이렉트
+- INTERNAL_AUTH_SECRET이 설정되면 검증한 사용자 정보를 서명해서 LLM Link 서비스로 전달
+  (LLM Link 서비스가 구글 API를 다시 호출하지 않아 로그인당 구글 호출 1회)
+- 구글 ID 토큰은 캐시된 공개키(JWKS)로 로컬에서 검증 (로그인 시 구글 호출 없음)
 """
 
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
+from datetime import datetime, timedelta, timezone
+from jwt.exceptions import InvalidTokenError
+import asyncio
 import httpx
+import jwt
 import os
+import time
 import uvicorn
-from typing import Optional
+from typing import Optional, Dict, Any, List, Callable
 
 # 설정
 class Settings:
@@ -21,10 +29,252 @@ class Settings:
     FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
     LLMLINK_SERVICE_URL = os.getenv("LLMLINK_SERVICE_URL", "http://localhost:8000")
     SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
+    GOOGLE_USERINFO_URL = os.getenv("GOOGLE_USERINFO_URL", "https://www.googleapis.com/oauth2/v2/userinfo")
+    
+    # 구글 ID 토큰 로컬 검증 (JWKS 공개키 캐시, GOOGLE_CLIENT_ID가 있어야 사용 가능)
+    GOOGLE_JWKS_URL = os.getenv("GOOGLE_JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+    GOOGLE_ID_TOKEN_ISSUERS = os.getenv("GOOGLE_ID_TOKEN_ISSUERS", "https://accounts.google.com,accounts.google.com").split(",")
+    GOOGLE_JWKS_DEFAULT_MAX_AGE = float(os.getenv("GOOGLE_JWKS_DEFAULT_MAX_AGE", "3600"))  # Cache-Control이 없을 때 캐시 시간(초)
+    GOOGLE_JWKS_MIN_REFRESH_INTERVAL = float(os.getenv("GOOGLE_JWKS_MIN_REFRESH_INTERVAL", "30"))  # 공개키 갱신 최소 간격(초)
+    
+    # 내부 인증 채널 (LLM Link 서비스와 같은 값, 비어 있으면 구글 토큰을 그대로 전달)
+    INTERNAL_AUTH_SECRET = os.getenv("INTERNAL_AUTH_SECRET", "")
+    INTERNAL_AUTH_TTL = int(os.getenv("INTERNAL_AUTH_TTL", "60"))  # 서명한 사용자 정보 유효 시간(초)
     ALLOWED_ORIGINS = ["http://localhost:3000", "https://otters-gpynyvem1-joonhyuck-yangs-projects.vercel.app"]
+    
+    # 업스트림 HTTP 연결 풀 / 타임아웃 설정
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    GOOGLE_API_TIMEOUT = float(os.getenv("GOOGLE_API_TIMEOUT", "10"))
+    LLMLINK_TIMEOUT = float(os.getenv("LLMLINK_TIMEOUT", "10"))
 
 settings = Settings()
 
+# HTTP 클라이언트 풀 (업스트림별 공유 클라이언트, 앱 시작/종료 시 생성/정리)
+# >>> shared/upstream_clients.py 복사본 (직접 수정 금지 - shared/에서 고친 뒤 python shared/sync.py 실행)
+def http2_supported() -> bool:
+    """h2 패키지가 설치된 경우에만 HTTP/2 사용 (TLS 업스트림에서만 협상됨)"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class UpstreamClientPool:
+    """업스트림별로 keep-alive 연결을 재사용하는 httpx.AsyncClient 관리"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._limits: Dict[str, httpx.Limits] = {}
+        self._requests: Dict[str, int] = {}
+
+    def register(self, name: str, timeout: httpx.Timeout, limits: httpx.Limits, base_url: str = ""):
+        async def count_request(request: httpx.Request):
+            self._requests[name] += 1
+
+        self._requests[name] = 0
+        self._limits[name] = limits
+        self._clients[name] = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=limits,
+            http2=http2_supported(),
+            event_hooks={"request": [count_request]}
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None:
+            raise RuntimeError(f"HTTP 클라이언트 '{name}'이(가) 초기화되지 않았습니다")
+        return client
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """업스트림별 연결 풀 상태 (모니터링용)"""
+        result = {}
+        for name, client in self._clients.items():
+            pool = getattr(client._transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            limits = self._limits[name]
+            result[name] = {
+                "base_url": str(client.base_url) or None,
+                "http2_enabled": http2_supported(),
+                "requests_total": self._requests[name],
+                "connections": len(connections),
+                "idle_connections": sum(1 for conn in connections if conn.is_idle()),
+                "http2_connections": sum(
+                    1 for conn in connections if "HTTP/2" in conn.info()
+                ),
+                "max_connections": limits.max_connections,
+                "max_keepalive_connections": limits.max_keepalive_connections,
+                "keepalive_expiry": limits.keepalive_expiry
+            }
+        return result
+# <<< shared/upstream_clients.py
+
+def build_http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+    )
+
+http_clients = UpstreamClientPool()
+
+# 구글 ID 토큰 로컬 검증 (JWKS 공개키 캐시, 검증 시 구글 API 호출 없음)
+# >>> shared/google_id_token.py 복사본 (직접 수정 금지 - shared/에서 고친 뒤 python shared/sync.py 실행)
+class GoogleIdTokenVerifier:
+    """구글 ID 토큰 서명/클레임을 캐시된 JWKS 공개키로 검증
+
+    공개키는 응답의 Cache-Control max-age에 맞춰 백그라운드에서 갱신하고,
+    모르는 kid의 토큰이 오면(키 교체 직후) min_refresh_interval마다 최대 한 번 바로 다시 가져옵니다.
+    갱신이 실패하면 마지막으로 받은 키로 계속 검증합니다.
+    이메일이 들어 있는 토큰은 구글이 소유를 확인한 이메일(email_verified)일 때만 통과시킵니다.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        http_client: Callable[[], httpx.AsyncClient],
+        audience: str,
+        issuers: List[str],
+        default_max_age: float,
+        min_refresh_interval: float,
+        leeway: float = 30
+    ):
+        self.jwks_url = jwks_url
+        self.http_client = http_client
+        self.audience = audience
+        self.issuers = issuers
+        self.default_max_age = default_max_age
+        self.min_refresh_interval = min_refresh_interval
+        self.leeway = leeway
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._expires_at = 0.0
+        self._last_fetch = float("-inf")
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.fallback_fetches = 0
+        self.verified = 0
+        self.rejected = 0
+
+    def _max_age(self, headers: httpx.Headers) -> float:
+        for directive in headers.get("cache-control", "").split(","):
+            name, _, value = directive.strip().partition("=")
+            if name.lower() == "max-age" and value.isdigit():
+                age = headers.get("age", "")
+                return max(self.min_refresh_interval, int(value) - (int(age) if age.isdigit() else 0))
+        return self.default_max_age
+
+    async def _fetch(self) -> bool:
+        self._last_fetch = time.monotonic()
+        try:
+            response = await self.http_client().get(self.jwks_url)
+            response.raise_for_status()
+            keys = {}
+            for jwk in response.json().get("keys", []):
+                try:
+                    key = jwt.PyJWK(jwk)
+                except jwt.exceptions.PyJWKError:
+                    continue
+                if key.key_id:
+                    keys[key.key_id] = key
+            if not keys:
+                raise ValueError("JWKS에 사용할 수 있는 키가 없습니다")
+        except Exception as e:
+            self.refresh_failures += 1
+            print(f"⚠️ 구글 공개키(JWKS) 갱신 실패, 기존 키 {len(self._keys)}개로 계속 검증: {e}")
+            return False
+        
+        self._keys = keys
+        self._expires_at = time.monotonic() + self._max_age(response.headers)
+        self.refreshes += 1
+        return True
+
+    async def refresh(self) -> bool:
+        async with self._lock:
+            return await self._fetch()
+
+    async def _run(self):
+        while True:
+            await self.refresh()
+            # 만료 시각에 갱신, 실패했으면 min_refresh_interval 뒤에 다시 시도
+            await asyncio.sleep(max(self.min_refresh_interval, self._expires_at - time.monotonic()))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _key_for(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+        async with self._lock:
+            # 진행 중인 갱신이 끝나길 기다린 뒤 다시 확인 (최근에 가져왔으면 재요청하지 않음)
+            if kid not in self._keys and time.monotonic() - self._last_fetch >= self.min_refresh_interval:
+                self.fallback_fetches += 1
+                await self._fetch()
+        return self._keys.get(kid)
+
+    async def verify(self, id_token: str) -> Dict[str, Any]:
+        """검증된 ID 토큰 클레임 반환 (실패하면 InvalidTokenError)"""
+        try:
+            kid = jwt.get_unverified_header(id_token).get("kid")
+            key = await self._key_for(kid)
+            if key is None:
+                raise InvalidTokenError(f"알 수 없는 서명 키: {kid}")
+            claims = jwt.decode(
+                id_token,
+                key.key,
+                algorithms=["RS256"],
+                audience=self.audience,
+                leeway=self.leeway,
+                options={"require": ["exp", "iat", "iss", "aud", "sub"]}
+            )
+            if claims["iss"] not in self.issuers:
+                raise InvalidTokenError(f"잘못된 발급자: {claims['iss']}")
+            # 확인되지 않은 이메일은 남의 이메일일 수 있으므로 신뢰하지 않음 (구버전 토큰은 문자열 "true")
+            if "email" in claims and claims.get("email_verified") not in (True, "true"):
+                raise InvalidTokenError(f"인증되지 않은 이메일: {claims['email']}")
+        except InvalidTokenError:
+            self.rejected += 1
+            raise
+        self.verified += 1
+        return claims
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "keys": sorted(self._keys),
+            "expires_in": round(self._expires_at - time.monotonic(), 1) if self._keys else None,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "fallback_fetches": self.fallback_fetches,
+            "verified": self.verified,
+            "rejected": self.rejected
+        }
+# <<< shared/google_id_token.py
+
+google_id_tokens = GoogleIdTokenVerifier(
+    jwks_url=settings.GOOGLE_JWKS_URL,
+    http_client=lambda: http_clients.get("google"),
+    audience=settings.GOOGLE_CLIENT_ID,
+    issuers=settings.GOOGLE_ID_TOKEN_ISSUERS,
+    default_max_age=settings.GOOGLE_JWKS_DEFAULT_MAX_AGE,
+    min_refresh_interval=settings.GOOGLE_JWKS_MIN_REFRESH_INTERVAL
+)
+
 # FastAPI 앱 생성
 app = FastAPI(
     title="오터스 게이트웨이 - 구글 인증",
@@ -45,6 +295,9 @@ app.add_middleware(
 class GoogleAuthRequest(BaseModel):
     access_token: str
 
+class GoogleIdTokenRequest(BaseModel):
+    id_token: str
+
 class GoogleUserInfo(BaseModel):
     id: str
     email: str
@@ -57,6 +310,27 @@ class AuthResponse(BaseModel):
     redirect_url: Optional[str] = None
     user_info: Optional[GoogleUserInfo] = None
 
+# 내부 인증 채널
+INTERNAL_AUTH_ISSUER = "gateway-googleauth"
+INTERNAL_AUTH_AUDIENCE = "llmlink"
+
+def create_identity_assertion(user_info: GoogleUserInfo) -> str:
+    """검증한 구글 사용자 정보를 INTERNAL_AUTH_SECRET으로 서명한 짧은 만료의 JWT"""
+    now = datetime.now(timezone.utc)
+    return jwt.encode(
+        {
+            "iss": INTERNAL_AUTH_ISSUER,
+            "aud": INTERNAL_AUTH_AUDIENCE,
+            "sub": user_info.id,
+            "email": user_info.email,
+            "name": user_info.name,
+            "iat": now,
+            "exp": now + timedelta(seconds=settings.INTERNAL_AUTH_TTL)
+        },
+        settings.INTERNAL_AUTH_SECRET,
+        algorithm="HS256"
+    )
+
 # 기본 엔드포인트
 @app.get("/")
 async def root():
@@ -65,6 +339,7 @@ async def root():
         "status": "running",
         "endpoints": {
             "auth": "/api/auth/google",
+            "id_token_auth": "/api/auth/google/id-token",
             "health": "/health"
         }
     }
@@ -73,6 +348,35 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "gateway-google-auth"}
 
+@app.get("/health/http-pool")
+async def http_pool_stats():
+    return http_clients.stats()
+
+@app.get("/health/google-keys")
+async def google_keys_stats():
+    return google_id_tokens.stats()
+
+@app.on_event("startup")
+async def startup_event():
+    http_clients.register(
+        "google",
+        timeout=httpx.Timeout(settings.GOOGLE_API_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+        limits=build_http_limits()
+    )
+    http_clients.register(
+        "llmlink",
+        base_url=settings.LLMLINK_SERVICE_URL,
+        timeout=httpx.Timeout(settings.LLMLINK_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+        limits=build_http_limits()
+    )
+    if settings.GOOGLE_CLIENT_ID:
+        google_id_tokens.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await google_id_tokens.close()
+    await http_clients.close()
+
 # 구글 인증 엔드포인트
 @app.post("/api/auth/google", response_model=AuthResponse)
 async def google_auth(request: GoogleAuthRequest):
@@ -81,21 +385,20 @@ async def google_auth(request: GoogleAuthRequest):
         print(f"🔐 구글 인증 요청 받음")
         
         # 구글 API로 사용자 정보 조회
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://www.googleapis.com/oauth2/v2/userinfo?access_token={request.access_token}",
-                timeout=10.0
+        response = await http_clients.get("google").get(
+            settings.GOOGLE_USERINFO_URL,
+            params={"access_token": request.access_token}
+        )
+        
+        if response.status_code != 200:
+            print(f"❌ 구글 API 오류: {response.status_code}")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid Google token"
             )
-            
-            if response.status_code != 200:
-                print(f"❌ 구글 API 오류: {response.status_code}")
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid Google token"
-                )
-            
-            google_user = response.json()
-            print(f"✅ 구글 사용자 정보 조회 성공: {google_user.get('email')}")
+        
+        google_user = response.json()
+        print(f"✅ 구글 사용자 정보 조회 성공: {google_user.get('email')}")
         
         # 사용자 정보 파싱
         user_info = GoogleUserInfo(
@@ -105,42 +408,8 @@ async def google_auth(request: GoogleAuthRequest):
             picture=google_user.get("picture")
         )
         
-        # LLM Link 서비스로 사용자 정보 전달하여 JWT 토큰 발급
-        try:
-            async with httpx.AsyncClient() as client:
-                llm_response = await client.post(
-                    f"{settings.LLMLINK_SERVICE_URL}/api/auth/google",
-                    json={"access_token": request.access_token},
-                    timeout=10.0
-                )
-                
-                if llm_response.status_code == 200:
-                    llm_data = llm_response.json()
-                    print(f"✅ LLM 서비스에서 JWT 토큰 발급 성공")
-                    
-                    # 프론트엔드로 리다이렉트 (토큰 포함)
-                    redirect_url = f"{settings.FRONTEND_URL}/chat?token={llm_data.get('access_token')}"
-                    
-                    return AuthResponse(
-                        success=True,
-                        message="로그인 성공",
-                        redirect_url=redirect_url,
-                        user_info=user_info
-                    )
-                else:
-                    print(f"❌ LLM 서비스 오류: {llm_response.status_code}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail="Failed to create user session"
-                    )
-                    
-        except httpx.ConnectError:
-            print(f"❌ LLM 서비스 연결 실패: {settings.LLMLINK_SERVICE_URL}")
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="LLM service unavailable"
-            )
-            
+        return await create_llmlink_session(user_info, request.access_token)
+        
     except HTTPException:
         raise
     except Exception as e:
@@ -150,6 +419,83 @@ async def google_auth(request: GoogleAuthRequest):
             detail=f"Authentication failed: {str(e)}"
         )
 
+@app.post("/api/auth/google/id-token", response_model=AuthResponse)
+async def google_id_token_auth(request: GoogleIdTokenRequest):
+    """구글 ID 토큰을 캐시된 공개키로 로컬 검증 후 사용자 인증 (구글 API 호출 없음)
+
+    검증한 사용자 정보는 내부 인증 채널로 LLM Link 서비스에 전달하므로 INTERNAL_AUTH_SECRET이 필요합니다.
+    """
+    if not settings.GOOGLE_CLIENT_ID or not settings.INTERNAL_AUTH_SECRET:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="ID token login requires GOOGLE_CLIENT_ID and INTERNAL_AUTH_SECRET"
+        )
+    
+    try:
+        claims = await google_id_tokens.verify(request.id_token)
+    except InvalidTokenError as e:
+        print(f"❌ 구글 ID 토큰 검증 실패: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid Google ID token"
+        )
+    
+    if not claims.get("email"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Missing required user information"
+        )
+    
+    user_info = GoogleUserInfo(
+        id=claims["sub"],
+        email=claims["email"],
+        name=claims.get("name") or claims["email"].split("@")[0],
+        picture=claims.get("picture")
+    )
+    return await create_llmlink_session(user_info)
+
+async def create_llmlink_session(user_info: GoogleUserInfo, access_token: Optional[str] = None) -> AuthResponse:
+    """LLM Link 서비스로 사용자 정보 전달하여 JWT 토큰 발급"""
+    try:
+        if settings.INTERNAL_AUTH_SECRET:
+            # 이미 검증한 사용자 정보를 서명해서 전달 (구글 API 재호출 없음)
+            llm_response = await http_clients.get("llmlink").post(
+                "/api/auth/internal/google",
+                json={"assertion": create_identity_assertion(user_info)}
+            )
+        else:
+            llm_response = await http_clients.get("llmlink").post(
+                "/api/auth/google",
+                json={"access_token": access_token}
+            )
+        
+        if llm_response.status_code == 200:
+            llm_data = llm_response.json()
+            print(f"✅ LLM 서비스에서 JWT 토큰 발급 성공")
+            
+            # 프론트엔드로 리다이렉트 (토큰 포함)
+            redirect_url = f"{settings.FRONTEND_URL}/chat?token={llm_data.get('access_token')}"
+            
+            return AuthResponse(
+                success=True,
+                message="로그인 성공",
+                redirect_url=redirect_url,
+                user_info=user_info
+            )
+        else:
+            print(f"❌ LLM 서비스 오류: {llm_response.status_code}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to create user session"
+            )
+            
+    except httpx.ConnectError:
+        print(f"❌ LLM 서비스 연결 실패: {settings.LLMLINK_SERVICE_URL}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="LLM service unavailable"
+        )
+
 # 구글 로그인 페이지 리다이렉트
 @app.get("/api/auth/google/login")
 async def google_login_redirect():
@@ -170,37 +516,37 @@ async def google_callback(code: str):
     """구글 OAuth2 콜백 처리"""
     try:
         # 구글에서 액세스 토큰 교환
-        async with httpx.AsyncClient() as client:
-            token_response = await client.post(
-                "https://oauth2.googleapis.com/token",
-                data={
-                    "client_id": settings.GOOGLE_CLIENT_ID,
-                    "client_secret": settings.GOOGLE_CLIENT_SECRET,
-                    "code": code,
-                    "grant_type": "authorization_code",
-                    "redirect_uri": f"{settings.FRONTEND_URL}/auth/callback"
-                },
-                timeout=10.0
+        token_response = await http_clients.get("google").post(
+            "https://oauth2.googleapis.com/token",
+            data={
+                "client_id": settings.GOOGLE_CLIENT_ID,
+                "client_secret": settings.GOOGLE_CLIENT_SECRET,
+                "code": code,
+                "grant_type": "authorization_code",
+                "redirect_uri": f"{settings.FRONTEND_URL}/auth/callback"
+            }
+        )
+        
+        if token_response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Failed to exchange code for token"
             )
-            
-            if token_response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Failed to exchange code for token"
-                )
-            
-            token_data = token_response.json()
-            access_token = token_data.get("access_token")
-            
-            if not access_token:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="No access token received"
-                )
         
-        # 구글 인증 처리
-        auth_request = GoogleAuthRequest(access_token=access_token)
-        auth_response = await google_auth(auth_request)
+        token_data = token_response.json()
+        access_token = token_data.get("access_token")
+        
+        if not access_token:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No access token received"
+            )
+        
+        # 구글 인증 처리 (ID 토큰을 로컬에서 검증할 수 있으면 userinfo 호출 생략)
+        if token_data.get("id_token") and settings.GOOGLE_CLIENT_ID and settings.INTERNAL_AUTH_SECRET:
+            auth_response = await google_id_token_auth(GoogleIdTokenRequest(id_token=token_data["id_token"]))
+        else:
+            auth_response = await google_auth(GoogleAuthRequest(access_token=access_token))
         
         if auth_response.success:
             return RedirectResponse(url=auth_response.redirect_url)
@@ -217,6 +563,7 @@ if __name__ == "__main__":
     print(f"🔗 LLM 서비스 URL: {settings.LLMLINK_SERVICE_URL}")
     print("📋 사용 가능한 엔드포인트:")
     print("   - POST /api/auth/google     : 구글 토큰 검증")
+    print("   - POST /api/auth/google/id-token : 구글 ID 토큰 로컬 검증")
     print("   - GET  /api/auth/google/login : 구글 로그인 리다이렉트")
     print("   - GET  /api/auth/google/callback : 구글 콜백 처리")
     
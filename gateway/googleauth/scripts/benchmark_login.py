@@ -0,0 +1,87 @@
+"""
+로그인 처리량 벤치마크
+- 게이트웨이 POST /api/auth/google 에 동시에 로그인 요청을 보내 처리량과 지연 시간 측정
+- 구글 API 스텁(scripts/google_stub.py)의 호출 수로 로그인당 구글 호출 횟수도 함께 확인
+- --id-token 을 주면 스텁에서 ID 토큰을 미리 발급받아 POST /api/auth/google/id-token 으로 측정
+
+사용 예:
+    STUB_LATENCY_MS=80 uvicorn scripts.google_stub:app --port 8099
+    GOOGLE_USERINFO_URL=http://localhost:8099/oauth2/v2/userinfo uvicorn app.main:app --port 8000   # service/llmlink
+    GOOGLE_USERINFO_URL=http://localhost:8099/oauth2/v2/userinfo uvicorn app.main:app --port 8001   # gateway/googleauth
+    python scripts/benchmark_login.py --users 50 --requests 300 --concurrency 16
+
+    # ID 토큰 로컬 검증 경로 (게이트웨이에 GOOGLE_CLIENT_ID, INTERNAL_AUTH_SECRET, GOOGLE_JWKS_URL 설정)
+    python scripts/benchmark_login.py --id-token --users 50 --requests 300 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def run(url: str, stub_url: str, users: int, requests: int, concurrency: int, id_token: bool):
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async with httpx.AsyncClient(timeout=30) as client:
+        if id_token:
+            path = "/api/auth/google/id-token"
+            bodies = [
+                {"id_token": (await client.get(f"{stub_url}/id-token", params={"user": f"bench-token-{i}"})).json()["id_token"]}
+                for i in range(users)
+            ]
+        else:
+            path = "/api/auth/google"
+            bodies = [{"access_token": f"bench-token-{i}"} for i in range(users)]
+        calls_before = (await client.get(f"{stub_url}/stats")).json()
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                body = bodies[remaining % users]
+                started = time.perf_counter()
+                try:
+                    response = await client.post(f"{url}{path}", json=body)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        calls_after = (await client.get(f"{stub_url}/stats")).json()
+        calls = {name: count - calls_before.get(name, 0) for name, count in calls_after.items()}
+
+    ms = [value * 1000 for value in latencies]
+    print(f"📊 로그인 {requests}회 ({path}) - 동시 {concurrency}개, 실패 {errors}개")
+    print(f"   처리량: {requests / elapsed:.1f} req/s ({elapsed:.2f}s)")
+    print(f"   지연: p50 {percentile(ms, 50):.1f}ms / p95 {percentile(ms, 95):.1f}ms / max {max(ms, default=0):.1f}ms")
+    for name, count in calls.items():
+        print(f"   구글 {name} 호출: {count}회 (로그인당 {count / requests:.2f}회)")
+
+def main():
+    parser = argparse.ArgumentParser(description="로그인 처리량 벤치마크")
+    parser.add_argument("--url", default="http://localhost:8001", help="게이트웨이 주소")
+    parser.add_argument("--stub-url", default="http://localhost:8099", help="구글 API 스텁 주소")
+    parser.add_argument("--users", type=int, default=50, help="서로 다른 구글 토큰 수")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--id-token", action="store_true", help="ID 토큰 로컬 검증 엔드포인트로 측정")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.stub_url, args.users, args.requests, args.concurrency, args.id_token))
+
+if __name__ == "__main__":
+    main()
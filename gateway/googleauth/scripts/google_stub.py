@@ -0,0 +1,97 @@
+"""
+구글 API 로컬 스텁 (로그인 처리량 테스트용)
+- GET /oauth2/v2/userinfo?access_token=... : 토큰 문자열로 가짜 사용자 정보 반환
+  (토큰이 "invalid"로 시작하면 401)
+- GET /oauth2/v3/certs : ID 토큰 서명 공개키(JWKS), Cache-Control max-age 포함
+- GET /id-token?user=...&aud=... : 스텁 키로 서명한 구글 ID 토큰 발급 (exp_in으로 만료 시간 조절)
+- POST /rotate : 서명 키 교체 (이전 키도 JWKS에 남겨 둠, keep=0이면 새 키만 공개)
+- GET /stats : 지금까지 받은 userinfo / certs 호출 수
+
+사용 예:
+    STUB_LATENCY_MS=80 uvicorn scripts.google_stub:app --port 8099
+
+    # 게이트웨이 / LLM Link 서비스가 스텁을 보도록 설정
+    GOOGLE_USERINFO_URL=http://localhost:8099/oauth2/v2/userinfo
+    GOOGLE_JWKS_URL=http://localhost:8099/oauth2/v3/certs
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI, HTTPException, Response, status
+
+LATENCY = float(os.getenv("STUB_LATENCY_MS", "80")) / 1000  # 실제 구글 API 왕복 지연 흉내
+JWKS_MAX_AGE = int(os.getenv("STUB_JWKS_MAX_AGE", "3600"))
+CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "stub-client-id")
+ISSUER = "https://accounts.google.com"
+
+app = FastAPI(title="구글 API 스텁")
+calls = {"userinfo": 0, "certs": 0}
+signing_keys = []  # (kid, private_key), 마지막 항목이 현재 서명 키
+
+def stub_user(seed: str) -> dict:
+    uid = str(int(hashlib.sha1(seed.encode()).hexdigest()[:15], 16))
+    return {
+        "id": uid,
+        "email": f"stub{uid[:8]}@example.com",
+        "name": f"스텁 사용자 {uid[:4]}",
+        "picture": None
+    }
+
+def new_signing_key():
+    signing_keys.append((uuid.uuid4().hex, rsa.generate_private_key(public_exponent=65537, key_size=2048)))
+
+new_signing_key()
+
+@app.get("/oauth2/v2/userinfo")
+async def userinfo(access_token: str):
+    calls["userinfo"] += 1
+    await asyncio.sleep(LATENCY)
+    if access_token.startswith("invalid"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Credentials")
+    return stub_user(access_token)
+
+@app.get("/oauth2/v3/certs")
+async def certs(response: Response):
+    calls["certs"] += 1
+    await asyncio.sleep(LATENCY)
+    keys = []
+    for kid, key in signing_keys:
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key()))
+        jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+        keys.append(jwk)
+    response.headers["Cache-Control"] = f"public, max-age={JWKS_MAX_AGE}, must-revalidate, no-transform"
+    return {"keys": keys}
+
+@app.get("/id-token")
+async def id_token(user: str, aud: str = CLIENT_ID, iss: str = ISSUER, exp_in: int = 3600):
+    kid, key = signing_keys[-1]
+    info = stub_user(user)
+    now = int(time.time())
+    claims = {
+        "iss": iss,
+        "aud": aud,
+        "sub": info["id"],
+        "email": info["email"],
+        "email_verified": True,
+        "name": info["name"],
+        "iat": now,
+        "exp": now + exp_in
+    }
+    return {"id_token": jwt.encode(claims, key, algorithm="RS256", headers={"kid": kid})}
+
+@app.post("/rotate")
+async def rotate(keep: int = 1):
+    new_signing_key()
+    del signing_keys[:-(keep + 1)]
+    return {"kids": [kid for kid, _ in signing_keys]}
+
+@app.get("/stats")
+async def stats():
+    return calls
@@ -1,9 +1,10 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index, select, update, or_, and_, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session, relationship
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from pydantic import BaseModel
 from datetime import datetime, timedelta
@@ -16,10 +17,17 @@ import asyncio
 import schedule
 import threading
 import smtplib
+import queue
+import ssl
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.date import DateTrigger
+import math
+import random
+import socket
+import time
+import uuid
 
 # 설정
 class Settings:
@@ -41,12 +49,40 @@ class Settings:
     SMTP_USERNAME = os.getenv("SMTP_USERNAME", "")
     SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
     FROM_EMAIL = os.getenv("FROM_EMAIL", "noreply@oters.com")
+    SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() == "true"  # STARTTLS
+    SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))  # 유지하는 SMTP 연결 수 = 동시 발송 수
+    SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+    SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))  # 이보다 오래 쉰 연결은 서버가 끊었을 수 있으므로 새로 연결
+    SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))  # 연결당 보내고 다시 연결
+    
+    # 알람 로딩 설정 (앞으로 ALARM_LOAD_HORIZON_HOURS 안에 울릴 알람만 스케줄러에 올림)
+    ALARM_LOAD_HORIZON_HOURS = float(os.getenv("ALARM_LOAD_HORIZON_HOURS", "24"))
+    ALARM_LOAD_INTERVAL_MINUTES = float(os.getenv("ALARM_LOAD_INTERVAL_MINUTES", "60"))  # 다음 구간을 불러오는 주기
+    ALARM_LOAD_BATCH_SIZE = int(os.getenv("ALARM_LOAD_BATCH_SIZE", "1000"))  # DB에서 한 번에 읽는 일정 수
+    ALARM_MISSED_GRACE_HOURS = float(os.getenv("ALARM_MISSED_GRACE_HOURS", "1"))  # 서비스가 내려가 있던 동안 놓친 알람을 늦게라도 보내는 한도
+    ALARM_TICK_SECONDS = float(os.getenv("ALARM_TICK_SECONDS", "1"))  # 알람 디스패처 해상도 (같은 틱의 알람은 한 배치로 발송)
+    ALARM_FIRE_CONCURRENCY = int(os.getenv("ALARM_FIRE_CONCURRENCY", "50"))  # 동시에 처리하는 알람 수
+    
+    # 여러 프로세스/복제본이 같은 DB를 쓸 때 알람을 나눠 보내기 위한 선점(lease) 설정
+    ALARM_WORKER_ID = os.getenv("ALARM_WORKER_ID", "") or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    ALARM_CLAIM_BATCH_SIZE = int(os.getenv("ALARM_CLAIM_BATCH_SIZE", "200"))  # 한 번에 선점하는 알람 수
+    ALARM_LEASE_SECONDS = float(os.getenv("ALARM_LEASE_SECONDS", "60"))  # 선점 유지 시간 (발송 중에는 계속 연장)
 
 settings = Settings()
 
-# 데이터베이스 설정
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, pool_recycle=300, echo=settings.DEBUG)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 데이터베이스 설정 (이벤트 루프를 막지 않도록 async 드라이버 사용)
+def async_database_url(url: str) -> str:
+    """동기 드라이버 URL을 async 드라이버 URL로 변환 (sqlite -> aiosqlite, postgresql -> asyncpg)"""
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    if url.startswith("postgres://"):
+        return "postgresql+asyncpg://" + url[len("postgres://"):]
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://"):]
+    return url
+
+engine = create_async_engine(async_database_url(settings.DATABASE_URL), pool_pre_ping=True, pool_recycle=300, echo=settings.DEBUG)
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 # 데이터베이스 모델
@@ -97,8 +133,17 @@ class Schedule(Base):
     is_completed = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    lease_owner = Column(String(100), nullable=True)  # 알람을 선점해서 발송 중인 워커
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)  # 지나면 다른 워커가 다시 선점 가능
     
     user = relationship("User", back_populates="schedules")
+    
+    __table_args__ = (
+        # 울릴 알람 로딩용 (활성 + 미완료 일정을 시간순으로 키셋 스캔)
+        Index("ix_schedules_pending_time", "is_active", "is_completed", "scheduled_time", "id"),
+        # 만료된 선점 회수용
+        Index("ix_schedules_lease_expires", "lease_expires_at"),
+    )
 
 # Pydantic 스키마
 class GoogleAuthRequest(BaseModel):
@@ -149,12 +194,9 @@ class ScheduleUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 # 의존성
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 security = HTTPBearer()
 
@@ -189,7 +231,7 @@ def get_user_id_from_token(token: str) -> Optional[int]:
         return payload.get("user_id")
     return None
 
-# 스케줄러 설정
+# 스케줄러 설정 (주기 작업용, 개별 알람은 AlarmDispatcher가 관리)
 scheduler = AsyncIOScheduler()
 
 # FastAPI 앱 생성
@@ -217,116 +259,622 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "alarm"}
 
+@app.get("/health/alarm-loader")
+async def alarm_loader_stats():
+    return alarm_loader.stats()
+
+@app.get("/health/alarm-dispatcher")
+async def alarm_dispatcher_stats():
+    return alarm_dispatcher.stats()
+
+@app.get("/health/smtp")
+async def smtp_stats():
+    return smtp_pool.stats()
+
+@app.get("/health/alarm-worker")
+async def alarm_worker_stats():
+    return alarm_worker.stats()
+
 # 이메일 알림 관련 함수들
-async def send_email_notification(user_email: str, user_name: str, title: str, description: str):
-    """이메일 알림 전송 함수"""
-    try:
-        # 이메일 내용 생성
-        subject = f"🔔 오터스 알림: {title}"
+class SMTPConnectionPool:
+    """로그인까지 마친 SMTP 연결을 재사용하는 발송 풀
+    
+    smtplib은 블로킹이므로 전용 스레드 풀(pool_size개)에서 실행해 이벤트 루프를 막지 않고,
+    스레드 수만큼만 동시에 보냅니다. 재사용한 연결이 끊겨 있으면 새로 연결해서 한 번 더 보냅니다.
+    """
+    
+    def __init__(self, server: str, port: int, username: str, password: str, use_tls: bool,
+                 pool_size: int, timeout: float, idle_timeout: float, max_messages: int):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="smtp")
+        self._idle: queue.LifoQueue = queue.LifoQueue()  # (연결, 마지막 사용 시각, 보낸 메일 수)
+        self.pool_size = pool_size
+        self.sent = 0
+        self.failed = 0
+        self.connects = 0
+        self.reconnects = 0
+        self.in_flight = 0
+    
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                connection.starttls(context=ssl.create_default_context())
+            if self.username:
+                connection.login(self.username, self.password)
+        except Exception:
+            self._discard(connection)
+            raise
+        self.connects += 1
+        return connection
+    
+    @staticmethod
+    def _discard(connection: smtplib.SMTP):
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
+    
+    def _checkout(self):
+        """(연결, 보낸 메일 수, 재사용 여부) - 오래 쉰 연결은 버리고 새로 연결"""
+        while True:
+            try:
+                connection, last_used, count = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect(), 0, False
+            if time.monotonic() - last_used < self.idle_timeout:
+                return connection, count, True
+            self._discard(connection)
+    
+    def _send_sync(self, message: MIMEMultipart):
+        connection, count, reused = self._checkout()
+        try:
+            connection.send_message(message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+            connection.close()
+            if not reused:
+                raise
+            # 서버가 먼저 끊은 유휴 연결 - 메일은 전달되지 않았으므로 새 연결로 재시도
+            self.reconnects += 1
+            connection, count = self._connect(), 0
+            try:
+                connection.send_message(message)
+            except Exception:
+                self._discard(connection)
+                raise
+        except smtplib.SMTPResponseException:
+            # 수신자 거부 등 메일 단위 오류 - 연결은 계속 사용
+            try:
+                connection.rset()
+                self._idle.put((connection, time.monotonic(), count))
+            except Exception:
+                self._discard(connection)
+            raise
+        except Exception:
+            self._discard(connection)
+            raise
         
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <h2 style="color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px;">
-                    🔔 오터스 알림
-                </h2>
-                
-                <div style="background: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                    <h3 style="color: #2c3e50; margin-top: 0;">{title}</h3>
-                    {f'<p style="color: #666;">{description}</p>' if description else ''}
-                </div>
-                
-                <div style="background: #e8f4fd; padding: 15px; border-radius: 8px; margin: 20px 0;">
-                    <p style="margin: 0; color: #2c3e50;">
-                        안녕하세요, {user_name}님!<br>
-                        설정하신 일정 시간이 되었습니다.
-                    </p>
-                </div>
-                
-                <div style="text-align: center; margin: 30px 0;">
-                    <a href="http://localhost:3000" 
-                       style="background: #3498db; color: white; padding: 12px 24px; 
-                              text-decoration: none; border-radius: 6px; display: inline-block;">
-                        오터스로 이동
-                    </a>
-                </div>
-                
-                <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
-                <p style="color: #999; font-size: 12px; text-align: center;">
-                    이 이메일은 오터스 AI 비서 서비스에서 자동으로 발송되었습니다.<br>
-                    문의사항이 있으시면 고객지원팀에 연락해주세요.
+        if count + 1 >= self.max_messages:
+            self._discard(connection)
+        else:
+            self._idle.put((connection, time.monotonic(), count + 1))
+    
+    async def send(self, message: MIMEMultipart):
+        self.in_flight += 1
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._send_sync, message)
+            self.sent += 1
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+    
+    def close(self):
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                connection, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(connection)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pool_size": self.pool_size,
+            "idle_connections": self._idle.qsize(),
+            "in_flight": self.in_flight,
+            "sent": self.sent,
+            "failed": self.failed,
+            "connects": self.connects,
+            "reconnects": self.reconnects
+        }
+
+smtp_pool = SMTPConnectionPool(
+    settings.SMTP_SERVER,
+    settings.SMTP_PORT,
+    settings.SMTP_USERNAME,
+    settings.SMTP_PASSWORD,
+    settings.SMTP_USE_TLS,
+    settings.SMTP_POOL_SIZE,
+    settings.SMTP_TIMEOUT,
+    settings.SMTP_IDLE_TIMEOUT,
+    settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+)
+
+def build_notification_email(user_email: str, user_name: str, title: str, description: str) -> MIMEMultipart:
+    """알림 이메일 메시지 생성"""
+    subject = f"🔔 오터스 알림: {title}"
+    
+    html_content = f"""
+    <html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+        <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+            <h2 style="color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px;">
+                🔔 오터스 알림
+            </h2>
+            
+            <div style="background: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0;">
+                <h3 style="color: #2c3e50; margin-top: 0;">{title}</h3>
+                {f'<p style="color: #666;">{description}</p>' if description else ''}
+            </div>
+            
+            <div style="background: #e8f4fd; padding: 15px; border-radius: 8px; margin: 20px 0;">
+                <p style="margin: 0; color: #2c3e50;">
+                    안녕하세요, {user_name}님!<br>
+                    설정하신 일정 시간이 되었습니다.
                 </p>
             </div>
-        </body>
-        </html>
-        """
-        
-        # 이메일 전송
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = subject
-        msg['From'] = settings.FROM_EMAIL
-        msg['To'] = user_email
-        
-        html_part = MIMEText(html_content, 'html', 'utf-8')
-        msg.attach(html_part)
-        
-        # SMTP 서버 연결 및 전송
-        server = smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT)
-        server.starttls()
-        server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-        server.send_message(msg)
-        server.quit()
-        
+            
+            <div style="text-align: center; margin: 30px 0;">
+                <a href="http://localhost:3000" 
+                   style="background: #3498db; color: white; padding: 12px 24px; 
+                          text-decoration: none; border-radius: 6px; display: inline-block;">
+                    오터스로 이동
+                </a>
+            </div>
+            
+            <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
+            <p style="color: #999; font-size: 12px; text-align: center;">
+                이 이메일은 오터스 AI 비서 서비스에서 자동으로 발송되었습니다.<br>
+                문의사항이 있으시면 고객지원팀에 연락해주세요.
+            </p>
+        </div>
+    </body>
+    </html>
+    """
+    
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = subject
+    msg['From'] = settings.FROM_EMAIL
+    msg['To'] = user_email
+    
+    html_part = MIMEText(html_content, 'html', 'utf-8')
+    msg.attach(html_part)
+    return msg
+
+async def send_email_notification(user_email: str, user_name: str, title: str, description: str) -> bool:
+    """이메일 알림 전송 함수 (SMTP 연결 풀 사용), 성공 여부 반환"""
+    try:
+        await smtp_pool.send(build_notification_email(user_email, user_name, title, description))
         print(f"이메일 알림 전송 완료: {user_email} - {title}")
+        return True
         
     except Exception as e:
         print(f"이메일 알림 전송 실패: {e}")
+        return False
 
-async def send_notification(user_id: int, schedule_id: int, title: str, description: str):
-    """실제 알람 전송 함수 (이메일)"""
-    try:
-        # 사용자 정보 가져오기
-        db = SessionLocal()
-        try:
-            user = db.query(User).filter(User.id == user_id).first()
-            schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
-            
-            if user and schedule:
-                # 이메일 알림 전송
-                await send_email_notification(
-                    user.email, 
-                    user.name, 
-                    title, 
-                    description
-                )
+class AlarmWorker:
+    """DB 선점(lease)으로 여러 워커 프로세스/복제본이 알람을 나눠 보내는 발송기
+    
+    모든 워커가 같은 알람을 디스패처에 올려 두고 같은 틱에 fire()를 호출하지만,
+    lease_expires_at이 비었거나 지난 일정만 조건부 UPDATE로 선점하므로 한 일정은 한 워커만 보냅니다.
+    다른 워커에서 시각을 늦춘 일정은 이 워커의 디스패처에 예전 시각으로 남아 있을 수 있으므로, 시각이 된 일정만 선점합니다.
+    발송 중에는 선점을 연장하고, 워커가 죽어서 만료된 선점이나 아무도 울리지 않은 알람은 reclaim_expired()로 다른 워커가 다시 가져갑니다.
+    """
+    
+    def __init__(self, worker_id: str, claim_batch_size: int, lease_seconds: float, concurrency: int):
+        self.worker_id = worker_id
+        self.claim_batch_size = claim_batch_size
+        self.lease = timedelta(seconds=lease_seconds)
+        self.concurrency = concurrency
+        self.claimed = 0
+        self.skipped = 0  # 다른 워커가 먼저 선점했거나 그 사이 완료/비활성화된 일정
+        self.sent = 0
+        self.failed = 0
+        self.reclaimed = 0
+    
+    async def fire(self, schedule_ids: List[int]):
+        """같은 틱에 울리는 알람들을 claim_batch_size개씩 선점해서 발송
+        
+        선점한 일정과 사용자는 조인 쿼리 한 번으로 읽고, concurrency개씩 동시에 보내면서
+        성공한 일정을 1초마다 한 번의 UPDATE로 모아서 완료 처리합니다 (워커가 죽었을 때 다시 보내는 메일 최소화).
+        실패한 일정은 선점이 만료되면 다시 시도합니다.
+        """
+        schedule_ids = list(schedule_ids)
+        random.shuffle(schedule_ids)  # 워커마다 다른 묶음부터 선점해서 일을 고르게 나눔
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        for offset in range(0, len(schedule_ids), self.claim_batch_size):
+            chunk = schedule_ids[offset:offset + self.claim_batch_size]
+            pending: set = set()
+            sent_ids: List[int] = []
+            finished = asyncio.Event()
+            maintainer = None
+            try:
+                rows = await self._claim(chunk)
+                self.skipped += len(chunk) - len(rows)
+                if not rows:
+                    continue
+                pending.update(row.id for row in rows)
+                maintainer = asyncio.create_task(self._maintain(pending, sent_ids, finished))
                 
-                # 일정 완료 처리
-                schedule.is_completed = True
-                db.commit()
+                async def send_one(row):
+                    async with semaphore:
+                        try:
+                            if await send_email_notification(row.email, row.name, row.title, row.description or ""):
+                                sent_ids.append(row.id)
+                                self.sent += 1
+                            else:
+                                self.failed += 1
+                        finally:
+                            pending.discard(row.id)
                 
-        finally:
-            db.close()
-            
-    except Exception as e:
-        print(f"알람 전송 실패: {e}")
+                await asyncio.gather(*(send_one(row) for row in rows))
+            except Exception as e:
+                print(f"알람 전송 실패 ({len(chunk)}개): {e}")
+            finally:
+                # 완료 처리 중간에 끊기지 않도록 취소하지 않고 멈추라고 알린 뒤 기다림
+                finished.set()
+                if maintainer is not None:
+                    await maintainer
+            if sent_ids:
+                try:
+                    await self._complete(sent_ids)
+                except Exception as e:
+                    print(f"알람 완료 처리 실패 ({len(sent_ids)}개): {e}")
+    
+    async def _claim(self, schedule_ids: List[int]):
+        """시각이 되었고 선점이 없거나 만료된 대기 중 일정을 이 워커 것으로 표시하고, 선점한 일정 + 사용자 정보 반환"""
+        now = datetime.now().astimezone()
+        async with SessionLocal() as db:
+            claimed_ids = (await db.scalars(
+                update(Schedule)
+                .where(
+                    Schedule.id.in_(schedule_ids),
+                    Schedule.is_active == True,
+                    Schedule.is_completed == False,
+                    Schedule.scheduled_time <= db_time(now),
+                    or_(Schedule.lease_expires_at == None, Schedule.lease_expires_at < db_time(now))
+                )
+                .values(lease_owner=self.worker_id, lease_expires_at=db_time(now + self.lease))
+                .returning(Schedule.id)
+                .execution_options(synchronize_session=False)
+            )).all()
+            await db.commit()
+            if not claimed_ids:
+                return []
+            self.claimed += len(claimed_ids)
+            return (await db.execute(
+                select(Schedule.id, Schedule.title, Schedule.description, User.email, User.name)
+                .join(User, User.id == Schedule.user_id)
+                .where(Schedule.id.in_(claimed_ids))
+            )).all()
+    
+    async def _maintain(self, pending: set, sent_ids: List[int], finished: asyncio.Event):
+        """발송 중인 묶음 관리 - 1초마다 보낸 일정 완료 처리, lease의 1/3마다 남은 일정 선점 연장"""
+        renewed_at = time.monotonic()
+        while not finished.is_set():
+            try:
+                await asyncio.wait_for(finished.wait(), timeout=1)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                if sent_ids:
+                    done = sent_ids[:]
+                    del sent_ids[:len(done)]
+                    await self._complete(done)
+                if pending and time.monotonic() - renewed_at >= self.lease.total_seconds() / 3:
+                    renewed_at = time.monotonic()
+                    async with SessionLocal() as db:
+                        await db.execute(
+                            update(Schedule)
+                            .where(Schedule.id.in_(list(pending)), Schedule.lease_owner == self.worker_id)
+                            .values(lease_expires_at=db_time(datetime.now().astimezone() + self.lease))
+                            .execution_options(synchronize_session=False)
+                        )
+                        await db.commit()
+            except Exception as e:
+                print(f"알람 선점 관리 실패: {e}")
+    
+    async def _complete(self, schedule_ids: List[int]):
+        """발송 완료 표시 (이미 완료된 일정은 그대로 두므로 여러 번 호출해도 같은 결과)
+        
+        발송 중에 시각을 늦춘 일정은 완료 처리하지 않고 남겨서 바뀐 시각에 다시 울립니다.
+        """
+        async with SessionLocal() as db:
+            await db.execute(
+                update(Schedule)
+                .where(
+                    Schedule.id.in_(schedule_ids),
+                    Schedule.is_completed == False,
+                    Schedule.scheduled_time <= db_time(datetime.now().astimezone())
+                )
+                .values(is_completed=True, lease_owner=None, lease_expires_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+    
+    async def reclaim_expired(self):
+        """시각이 지났는데 발송되지 않은 미완료 일정을 다시 디스패처에 올림
+        
+        - 선점이 만료된 일정: 발송 중 워커가 죽었거나 발송 실패
+        - 선점된 적 없는 일정: API로 만들거나 시각을 바꾼 일정은 요청을 받은 워커의 디스패처에만 올라가므로,
+          그 워커가 울리기 전에 죽으면 다른 워커의 로딩 구간은 이미 지나 있어 아무도 보내지 않음
+        """
+        now = datetime.now().astimezone()
+        async with SessionLocal() as db:
+            schedule_ids = (await db.scalars(
+                select(Schedule.id).where(
+                    or_(Schedule.lease_expires_at == None, Schedule.lease_expires_at < db_time(now)),
+                    Schedule.is_active == True,
+                    Schedule.is_completed == False,
+                    Schedule.scheduled_time >= db_time(now - timedelta(hours=settings.ALARM_MISSED_GRACE_HOURS)),
+                    # 제시간에 울린 알람은 한 틱 안에 선점되므로 그보다 지난 일정만 (발송 중에 시각을 늦춘 일정은 바뀐 시각에 울림)
+                    Schedule.scheduled_time <= db_time(now - timedelta(seconds=settings.ALARM_TICK_SECONDS))
+                )
+            )).all()
+        for schedule_id in schedule_ids:
+            if schedule_id not in alarm_dispatcher:
+                register_notification(schedule_id, now)
+        if schedule_ids:
+            self.reclaimed += len(schedule_ids)
+            print(f"♻️ 발송되지 않은 알람 {len(schedule_ids)}개 다시 발송 대기")
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "lease_seconds": self.lease.total_seconds(),
+            "claimed": self.claimed,
+            "skipped": self.skipped,
+            "sent": self.sent,
+            "failed": self.failed,
+            "reclaimed": self.reclaimed
+        }
 
-def schedule_notification(schedule_id: int, user_id: int, title: str, description: str, scheduled_time: datetime):
-    """스케줄러에 알람 작업 추가"""
-    scheduler.add_job(
-        send_notification,
-        trigger=DateTrigger(run_date=scheduled_time),
-        args=[user_id, schedule_id, title, description],
-        id=f"alarm_{schedule_id}",
-        replace_existing=True
-    )
+alarm_worker = AlarmWorker(
+    settings.ALARM_WORKER_ID,
+    settings.ALARM_CLAIM_BATCH_SIZE,
+    settings.ALARM_LEASE_SECONDS,
+    settings.ALARM_FIRE_CONCURRENCY
+)
+
+class AlarmDispatcher:
+    """일정 id를 발송 시각의 틱(ALARM_TICK_SECONDS 단위 epoch)별 슬롯에 담아 두는 해시 타이밍 휠
+    
+    등록/취소는 딕셔너리 연산 한 번(O(1))이고 일정당 id 하나만 보관합니다.
+    틱마다 지난 슬롯을 꺼내 한 배치로 fire_batch에 넘기며, 이미 지난 시각은 다음 틱에 바로 발송합니다.
+    """
+    
+    def __init__(self, tick_seconds: float, fire_batch):
+        self.tick_seconds = tick_seconds
+        self.fire_batch = fire_batch
+        self._slots: Dict[int, set] = {}  # 틱 → 일정 id 집합
+        self._ticks: Dict[int, int] = {}  # 일정 id → 틱
+        self._current = math.floor(time.time() / tick_seconds)  # 마지막으로 처리한 틱
+        self._task: Optional[asyncio.Task] = None
+        self._batches: set = set()
+        self.fired = 0
+        self.fired_batches = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+    
+    def __len__(self) -> int:
+        return len(self._ticks)
+    
+    def __contains__(self, schedule_id: int) -> bool:
+        return schedule_id in self._ticks
+    
+    def add(self, schedule_id: int, when: float):
+        """when(epoch 초)에 알람 등록 (이미 있으면 시각 변경)"""
+        self.cancel(schedule_id)
+        tick = max(math.ceil(when / self.tick_seconds), self._current + 1)
+        slot = self._slots.get(tick)
+        if slot is None:
+            slot = self._slots[tick] = set()
+        slot.add(schedule_id)
+        self._ticks[schedule_id] = tick
+    
+    def cancel(self, schedule_id: int):
+        tick = self._ticks.pop(schedule_id, None)
+        if tick is not None:
+            slot = self._slots[tick]
+            slot.discard(schedule_id)
+            if not slot:
+                del self._slots[tick]
+    
+    def _advance(self, now_tick: int) -> List[int]:
+        """now_tick까지 지난 슬롯을 비우고 일정 id 목록 반환"""
+        if now_tick - self._current <= len(self._slots):
+            due_ticks = [tick for tick in range(self._current + 1, now_tick + 1) if tick in self._slots]
+        else:
+            # 오래 멈춰 있었으면 (시스템 절전 등) 틱을 하나씩 세지 않고 남은 슬롯만 확인
+            due_ticks = sorted(tick for tick in self._slots if tick <= now_tick)
+        self._current = now_tick
+        due: List[int] = []
+        for tick in due_ticks:
+            for schedule_id in self._slots.pop(tick):
+                del self._ticks[schedule_id]
+                due.append(schedule_id)
+        if due_ticks:
+            self.last_lag = time.time() - due_ticks[-1] * self.tick_seconds
+            self.max_lag = max(self.max_lag, self.last_lag)
+        return due
+    
+    async def _run(self):
+        while True:
+            now = time.time()
+            due = self._advance(math.floor(now / self.tick_seconds))
+            if due:
+                self.fired += len(due)
+                self.fired_batches += 1
+                # 발송이 오래 걸려도 다음 틱이 밀리지 않도록 배치는 별도 태스크로 실행
+                task = asyncio.create_task(self._fire(due))
+                self._batches.add(task)
+                task.add_done_callback(self._batches.discard)
+            await asyncio.sleep((self._current + 1) * self.tick_seconds - time.time())
+    
+    async def _fire(self, schedule_ids: List[int]):
+        try:
+            await self.fire_batch(schedule_ids)
+        except Exception as e:
+            print(f"알람 배치 발송 실패 ({len(schedule_ids)}개): {e}")
+    
+    def start(self):
+        self._current = math.floor(time.time() / self.tick_seconds)
+        self._task = asyncio.create_task(self._run())
+    
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._ticks),
+            "slots": len(self._slots),
+            "tick_seconds": self.tick_seconds,
+            "fired": self.fired,
+            "fired_batches": self.fired_batches,
+            "running_batches": len(self._batches),
+            "last_lag_ms": round(self.last_lag * 1000, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 1)
+        }
+
+alarm_dispatcher = AlarmDispatcher(settings.ALARM_TICK_SECONDS, alarm_worker.fire)
+
+def register_notification(schedule_id: int, scheduled_time: datetime):
+    """디스패처에 알람 등록 (이미 지난 시각이면 다음 틱에 바로 발송)"""
+    alarm_dispatcher.add(schedule_id, local_time(scheduled_time).timestamp())
+
+def schedule_notification(schedule_id: int, scheduled_time: datetime):
+    """알람 등록 - 로딩 구간 밖의 먼 미래 일정은 DB에만 두고 AlarmLoader가 나중에 불러옴"""
+    if alarm_loader.covers(scheduled_time):
+        register_notification(schedule_id, scheduled_time)
+
+def unschedule_notification(schedule_id: int):
+    alarm_dispatcher.cancel(schedule_id)  # 아직 로딩 구간 밖이거나 이미 발송된 알람이면 아무 일도 없음
+
+def local_time(value: datetime) -> datetime:
+    """타임존 없는 시각은 스케줄러와 같이 서버 로컬 시각으로 해석"""
+    return value.astimezone() if value.tzinfo is None else value
+
+def db_time(value: datetime) -> datetime:
+    """DB 비교용 시각 (SQLite는 타임존 없이 저장하므로 로컬 시각으로 비교)"""
+    if engine.dialect.name == "sqlite":
+        return local_time(value).astimezone().replace(tzinfo=None)
+    return local_time(value)
+
+class AlarmLoader:
+    """DB의 대기 중 일정을 시간 구간 단위로 디스패처에 올림
+    
+    일정 전체를 메모리에 올리지 않고 loaded_until까지 울릴 알람만 등록해 둡니다.
+    시작할 때 (지금 - 놓친 알람 유예, 지금 + 호라이즌] 구간을 배치로 읽고,
+    이후 ALARM_LOAD_INTERVAL_MINUTES마다 (loaded_until, 지금 + 호라이즌] 구간을 이어서 읽습니다.
+    """
+    
+    def __init__(self, horizon: timedelta, batch_size: int):
+        self.horizon = horizon
+        self.batch_size = batch_size
+        self.loaded_until: Optional[datetime] = None  # None이면 아직 로딩 전 (모든 일정을 바로 등록)
+        self.last_load: Dict[str, Any] = {}
+        self.total_loaded = 0
+        self._lock = asyncio.Lock()
+    
+    def covers(self, scheduled_time: datetime) -> bool:
+        return self.loaded_until is None or local_time(scheduled_time) <= self.loaded_until
+    
+    async def load_next_window(self):
+        """loaded_until 이후부터 지금 + 호라이즌까지의 알람 등록"""
+        async with self._lock:
+            now = datetime.now().astimezone()
+            initial = self.loaded_until is None
+            start = self.loaded_until or now - timedelta(hours=settings.ALARM_MISSED_GRACE_HOURS)
+            end = now + self.horizon
+            if end <= start:
+                return
+            # 구간을 먼저 넓혀 두면 로딩 도중 생성/수정된 일정은 API 쪽에서 직접 등록함 (중복 등록은 덮어씀)
+            self.loaded_until = end
+            started = time.perf_counter()
+            loaded = await self._load(start, end)
+            self.total_loaded += loaded
+            self.last_load = {
+                "from": start.isoformat(),
+                "until": end.isoformat(),
+                "loaded": loaded,
+                "seconds": round(time.perf_counter() - started, 3)
+            }
+            if loaded or initial:
+                print(f"⏰ 알람 {loaded}개 로드 ({start:%m-%d %H:%M} ~ {end:%m-%d %H:%M}, {self.last_load['seconds']}초)")
+    
+    async def _load(self, start: datetime, end: datetime) -> int:
+        """(start, end] 구간의 대기 중 일정을 (scheduled_time, id) 키셋으로 batch_size개씩 읽어 등록"""
+        loaded = 0
+        last_time, last_id = db_time(start), None
+        async with SessionLocal() as db:
+            while True:
+                after = Schedule.scheduled_time > last_time
+                if last_id is not None:
+                    after = or_(after, and_(Schedule.scheduled_time == last_time, Schedule.id > last_id))
+                rows = (await db.execute(
+                    select(Schedule.id, Schedule.scheduled_time)
+                    .where(
+                        Schedule.is_active == True,
+                        Schedule.is_completed == False,
+                        after,
+                        Schedule.scheduled_time <= db_time(end)
+                    )
+                    .order_by(Schedule.scheduled_time.asc(), Schedule.id.asc())
+                    .limit(self.batch_size)
+                )).all()
+                for row in rows:
+                    register_notification(row.id, row.scheduled_time)
+                loaded += len(rows)
+                if len(rows) < self.batch_size:
+                    return loaded
+                last_time, last_id = rows[-1].scheduled_time, rows[-1].id
+                await asyncio.sleep(0)  # 대량 로딩 중에도 API 요청 처리
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "horizon_hours": self.horizon.total_seconds() / 3600,
+            "loaded_until": self.loaded_until.isoformat() if self.loaded_until else None,
+            "total_loaded": self.total_loaded,
+            "last_load": self.last_load
+        }
+
+# 호라이즌이 로딩 주기보다 짧으면 다음 로딩 전에 울릴 알람이 빠지므로 최소 주기 2배
+alarm_loader = AlarmLoader(
+    timedelta(hours=max(settings.ALARM_LOAD_HORIZON_HOURS, settings.ALARM_LOAD_INTERVAL_MINUTES * 2 / 60)),
+    settings.ALARM_LOAD_BATCH_SIZE
+)
 
 # 스케줄링 엔드포인트
 @app.post("/api/schedule", response_model=ScheduleResponse)
 async def create_schedule(
     schedule: ScheduleCreate,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """일정 생성 및 알람 설정"""
     token = credentials.credentials
@@ -347,17 +895,11 @@ async def create_schedule(
     )
     
     db.add(schedule_entry)
-    db.commit()
-    db.refresh(schedule_entry)
+    await db.commit()
+    await db.refresh(schedule_entry)
     
     # 알람 스케줄링
-    schedule_notification(
-        schedule_entry.id,
-        user_id,
-        schedule_entry.title,
-        schedule_entry.description or "",
-        schedule_entry.scheduled_time
-    )
+    schedule_notification(schedule_entry.id, schedule_entry.scheduled_time)
     
     return ScheduleResponse(
         id=schedule_entry.id,
@@ -372,7 +914,7 @@ async def create_schedule(
 @app.get("/api/schedule", response_model=List[ScheduleResponse])
 async def get_schedules(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """사용자의 일정 목록 조회"""
     token = credentials.credentials
@@ -384,7 +926,9 @@ async def get_schedules(
             detail="Invalid token"
         )
     
-    schedules = db.query(Schedule).filter(Schedule.user_id == user_id).order_by(Schedule.scheduled_time.asc()).all()
+    schedules = (await db.scalars(
+        select(Schedule).where(Schedule.user_id == user_id).order_by(Schedule.scheduled_time.asc())
+    )).all()
     
     return [
         ScheduleResponse(
@@ -404,7 +948,7 @@ async def update_schedule(
     schedule_id: int,
     schedule_update: ScheduleUpdate,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """일정 수정"""
     token = credentials.credentials
@@ -416,10 +960,10 @@ async def update_schedule(
             detail="Invalid token"
         )
     
-    schedule = db.query(Schedule).filter(
+    schedule = await db.scalar(select(Schedule).where(
         Schedule.id == schedule_id,
         Schedule.user_id == user_id
-    ).first()
+    ))
     
     if not schedule:
         raise HTTPException(
@@ -427,6 +971,16 @@ async def update_schedule(
             detail="Schedule not found"
         )
     
+    # 울리는 시각/상태가 바뀌는지 (제목/설명만 바뀌면 알람과 선점은 그대로 둠)
+    reschedule = any(
+        value is not None and value != getattr(schedule, field)
+        for field, value in [
+            ("scheduled_time", schedule_update.scheduled_time),
+            ("is_completed", schedule_update.is_completed),
+            ("is_active", schedule_update.is_active)
+        ]
+    )
+    
     # 업데이트할 필드들
     if schedule_update.title is not None:
         schedule.title = schedule_update.title
@@ -438,21 +992,21 @@ async def update_schedule(
         schedule.is_completed = schedule_update.is_completed
     if schedule_update.is_active is not None:
         schedule.is_active = schedule_update.is_active
+    # 다시 울려야 하는 일정이 예전 (만료된) 선점에 막히지 않도록 해제
+    # 발송 중인 선점은 그대로 두어야 다른 워커가 같은 알람을 한 번 더 보내지 않음
+    lease_held = schedule.lease_expires_at is not None and schedule.lease_expires_at > db_time(datetime.now().astimezone())
+    if reschedule and not lease_held:
+        schedule.lease_owner = None
+        schedule.lease_expires_at = None
     
-    db.commit()
-    db.refresh(schedule)
+    await db.commit()
+    await db.refresh(schedule)
     
-    # 알람 시간이 변경된 경우 스케줄러 업데이트
-    if schedule_update.scheduled_time is not None:
-        scheduler.remove_job(f"alarm_{schedule_id}")
-        if schedule.is_active:
-            schedule_notification(
-                schedule.id,
-                user_id,
-                schedule.title,
-                schedule.description or "",
-                schedule.scheduled_time
-            )
+    # 알람 다시 등록
+    if reschedule:
+        unschedule_notification(schedule_id)
+        if schedule.is_active and not schedule.is_completed:
+            schedule_notification(schedule.id, schedule.scheduled_time)
     
     return ScheduleResponse(
         id=schedule.id,
@@ -468,7 +1022,7 @@ async def update_schedule(
 async def delete_schedule(
     schedule_id: int,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """일정 삭제"""
     token = credentials.credentials
@@ -480,10 +1034,10 @@ async def delete_schedule(
             detail="Invalid token"
         )
     
-    schedule = db.query(Schedule).filter(
+    schedule = await db.scalar(select(Schedule).where(
         Schedule.id == schedule_id,
         Schedule.user_id == user_id
-    ).first()
+    ))
     
     if not schedule:
         raise HTTPException(
@@ -492,31 +1046,72 @@ async def delete_schedule(
         )
     
     # 스케줄러에서 작업 제거
-    try:
-        scheduler.remove_job(f"alarm_{schedule_id}")
-    except:
-        pass  # 작업이 없어도 무시
+    unschedule_notification(schedule_id)
     
-    db.delete(schedule)
-    db.commit()
+    await db.delete(schedule)
+    await db.commit()
     
     return {"message": "Schedule deleted successfully"}
 
 # 데이터베이스 테이블 생성 함수
-def create_tables():
+def add_missing_columns(conn):
+    """이미 있는 테이블에 나중에 추가된 nullable 컬럼 추가 (create_all은 기존 테이블을 바꾸지 않음)"""
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                print(f"🧱 {table.name}.{column.name} 컬럼 추가")
+
+def create_missing_indexes(conn):
+    """이미 있는 테이블에 나중에 추가된 인덱스 생성 (create_all은 새 테이블의 인덱스만 만듦)"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+async def create_tables():
     """데이터베이스 테이블 생성"""
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
+        await conn.run_sync(create_missing_indexes)
 
-# 애플리케이션 시작 시 테이블 생성 및 스케줄러 시작
+# 애플리케이션 시작 시 테이블 생성, 대기 중 알람 복원 및 스케줄러 시작
 @app.on_event("startup")
 async def startup_event():
-    create_tables()
+    await create_tables()
+    alarm_dispatcher.start()
     scheduler.start()
+    await alarm_loader.load_next_window()
+    scheduler.add_job(
+        alarm_loader.load_next_window,
+        "interval",
+        minutes=settings.ALARM_LOAD_INTERVAL_MINUTES,
+        id="alarm_loader",
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1
+    )
+    scheduler.add_job(
+        alarm_worker.reclaim_expired,
+        "interval",
+        seconds=settings.ALARM_LEASE_SECONDS,
+        id="alarm_lease_reclaimer",
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1
+    )
     print("알람 서비스가 시작되었습니다.")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     scheduler.shutdown()
+    await alarm_dispatcher.close()
+    await asyncio.to_thread(smtp_pool.close)
     print("알람 서비스가 종료되었습니다.")
 
 # 애플리케이션 실행
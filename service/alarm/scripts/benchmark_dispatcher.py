@@ -0,0 +1,133 @@
+"""
+알람 디스패처 벤치마크
+- 대기 중 알람 N개를 등록했을 때 메모리 사용량과 등록/취소 속도, 발송 시각 지연(lag) 측정
+- 대부분은 먼 미래(--horizon 안)에 흩어 두고, --due개는 측정 시작 후 --spread초 안에 울리도록 등록
+- --apscheduler 를 주면 같은 부하를 알람마다 APScheduler DateTrigger 작업 하나로 등록해서 비교
+
+사용 예 (service/alarm 폴더에서 실행, 모드마다 프로세스를 따로 띄워야 메모리 비교가 정확함):
+    python scripts/benchmark_dispatcher.py --alarms 1000000 --due 100000 --spread 10
+    python scripts/benchmark_dispatcher.py --alarms 100000 --due 10000 --spread 10 --apscheduler
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.main import AlarmDispatcher  # noqa: E402
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def rss_mb() -> float:
+    """현재 RSS (리눅스 /proc 기준, 없으면 최대 RSS)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+async def run(alarms: int, due: int, spread: float, horizon: float, tick: float, cancel: int, use_apscheduler: bool):
+    when: Dict[int, float] = {}
+    lags: List[float] = []
+    batches = 0
+    done = asyncio.Event()
+
+    def record(schedule_ids: List[int]):
+        nonlocal batches
+        now = time.time()
+        batches += 1
+        lags.extend(now - when[schedule_id] for schedule_id in schedule_ids)
+        if len(lags) >= due:
+            done.set()
+
+    if use_apscheduler:
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+        from apscheduler.triggers.date import DateTrigger
+
+        scheduler = AsyncIOScheduler()
+        scheduler.start()
+
+        def add(schedule_id: int, at: float):
+            scheduler.add_job(
+                record, trigger=DateTrigger(run_date=datetime.fromtimestamp(at).astimezone()),
+                args=[[schedule_id]], id=f"alarm_{schedule_id}", misfire_grace_time=None
+            )
+
+        def remove(schedule_id: int):
+            scheduler.remove_job(f"alarm_{schedule_id}")
+    else:
+        async def fire_batch(schedule_ids: List[int]):
+            record(schedule_ids)
+
+        dispatcher = AlarmDispatcher(tick, fire_batch)
+        dispatcher.start()
+        add, remove = dispatcher.add, dispatcher.cancel
+
+    # 먼 미래 알람 (발송되지 않고 메모리만 차지)
+    now = time.time()
+    pending = alarms - due
+    future = [now + 3600 + random.uniform(0, horizon) for _ in range(pending)]
+    memory_before = rss_mb()
+    started = time.perf_counter()
+    for schedule_id, at in enumerate(future):
+        when[schedule_id] = at
+        add(schedule_id, at)
+        if schedule_id % 10000 == 0:
+            await asyncio.sleep(0)
+    insert_seconds = time.perf_counter() - started
+    del future
+
+    # 곧 울릴 알람
+    base = time.time() + 1
+    for schedule_id in range(pending, alarms):
+        at = base + random.uniform(0, spread)
+        when[schedule_id] = at
+        add(schedule_id, at)
+    memory_after = rss_mb()
+
+    started = time.perf_counter()
+    for schedule_id in random.sample(range(pending), min(cancel, pending)):
+        remove(schedule_id)
+    cancel_seconds = time.perf_counter() - started
+
+    await asyncio.wait_for(done.wait(), timeout=spread + 120)
+
+    mode = "APScheduler 작업" if use_apscheduler else f"타이밍 휠 (틱 {tick}초)"
+    ms = [lag * 1000 for lag in lags]
+    print(f"📊 {mode} - 대기 알람 {alarms}개 (먼 미래 {pending}개 + {spread:g}초 안에 {due}개)")
+    print(f"   등록: {insert_seconds:.2f}s ({insert_seconds / max(pending, 1) * 1e6:.2f}µs/개)")
+    print(f"   취소: {min(cancel, pending)}개 {cancel_seconds:.3f}s ({cancel_seconds / max(min(cancel, pending), 1) * 1e6:.2f}µs/개)")
+    print(f"   메모리: +{memory_after - memory_before:.0f}MB (알람당 {(memory_after - memory_before) * 1024 * 1024 / alarms:.0f}바이트, 벤치마크의 시각 표 포함)")
+    print(f"   발송 지연: p50 {percentile(ms, 50):.1f}ms / p99 {percentile(ms, 99):.1f}ms / max {max(ms, default=0):.1f}ms, 배치 {batches}개")
+
+    if use_apscheduler:
+        scheduler.shutdown(wait=False)
+    else:
+        await dispatcher.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="알람 디스패처 벤치마크")
+    parser.add_argument("--alarms", type=int, default=1000000, help="등록할 전체 알람 수")
+    parser.add_argument("--due", type=int, default=100000, help="측정 중에 실제로 울릴 알람 수")
+    parser.add_argument("--spread", type=float, default=10, help="울릴 알람을 흩어 놓는 구간(초)")
+    parser.add_argument("--horizon", type=float, default=86400, help="먼 미래 알람을 흩어 놓는 구간(초)")
+    parser.add_argument("--tick", type=float, default=1, help="타이밍 휠 틱(초)")
+    parser.add_argument("--cancel", type=int, default=100000, help="취소해 볼 먼 미래 알람 수")
+    parser.add_argument("--apscheduler", action="store_true", help="알람마다 APScheduler 작업을 만드는 기존 방식으로 측정")
+    args = parser.parse_args()
+    asyncio.run(run(args.alarms, args.due, args.spread, args.horizon, args.tick, args.cancel, args.apscheduler))
+
+if __name__ == "__main__":
+    main()
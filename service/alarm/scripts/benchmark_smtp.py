@@ -0,0 +1,98 @@
+"""
+알림 메일 발송 처리량 벤치마크
+- 로컬 SMTP 싱크(scripts/smtp_sink.py)로 알림 메일 N통을 보내 처리량과 이벤트 루프 멈춤 시간 측정
+- --direct 를 주면 예전 방식(메일마다 이벤트 루프에서 블로킹 smtplib으로 연결 + 로그인 + 발송 + 종료)으로 측정
+
+사용 예 (service/alarm 폴더에서 실행):
+    python scripts/smtp_sink.py --port 8025 --latency-ms 20
+    python scripts/benchmark_smtp.py --messages 500 --pool-size 8
+    python scripts/benchmark_smtp.py --messages 200 --direct
+"""
+
+import argparse
+import asyncio
+import os
+import smtplib
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.main import SMTPConnectionPool, build_notification_email  # noqa: E402
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def monitor_loop(stalls: List[float], interval: float = 0.01):
+    """이벤트 루프가 interval보다 얼마나 늦게 깨어나는지 기록"""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - started - interval)
+
+async def run(host: str, port: int, messages: int, concurrency: int, pool_size: int, direct: bool):
+    pool = None
+    if direct:
+        async def send(message):
+            # 예전 send_email_notification과 같은 방식 (STARTTLS 제외)
+            server = smtplib.SMTP(host, port)
+            server.login("bench", "bench")
+            server.send_message(message)
+            server.quit()
+    else:
+        pool = SMTPConnectionPool(host, port, "bench", "bench", False, pool_size, 30, 60, 1000)
+        send = pool.send
+
+    remaining = messages
+    errors = 0
+    latencies: List[float] = []
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            message = build_notification_email(f"user{remaining}@example.com", "벤치마크", f"알림 {remaining}", "설명")
+            started = time.perf_counter()
+            try:
+                await send(message)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    stalls: List[float] = []
+    monitor = asyncio.create_task(monitor_loop(stalls))
+    await asyncio.sleep(0.05)  # 모니터가 먼저 돌기 시작하도록
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0.05)  # 블로킹 발송이 끝난 뒤 멈춤 시간이 기록되도록
+    monitor.cancel()
+
+    mode = "메일마다 새 연결 (블로킹)" if direct else f"SMTP 연결 풀 {pool_size}개"
+    ms = [value * 1000 for value in latencies]
+    print(f"📊 {mode} - 메일 {messages}통, 동시 {concurrency}개, 실패 {errors}개")
+    print(f"   처리량: {messages / elapsed:.1f}통/s ({elapsed:.2f}s)")
+    print(f"   메일당 지연: p50 {percentile(ms, 50):.1f}ms / p99 {percentile(ms, 99):.1f}ms")
+    print(f"   이벤트 루프 멈춤: 최대 {max(stalls, default=0) * 1000:.1f}ms / p99 {percentile(stalls, 99) * 1000:.1f}ms")
+    if pool is not None:
+        print(f"   연결: {pool.stats()['connects']}번")
+        await asyncio.to_thread(pool.close)
+
+def main():
+    parser = argparse.ArgumentParser(description="알림 메일 발송 처리량 벤치마크")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50, help="동시에 발송을 요청하는 알람 수")
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--direct", action="store_true", help="메일마다 블로킹 smtplib 연결을 여는 예전 방식으로 측정")
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.messages, args.concurrency, args.pool_size, args.direct))
+
+if __name__ == "__main__":
+    main()
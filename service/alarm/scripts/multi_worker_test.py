@@ -0,0 +1,211 @@
+"""
+여러 알람 워커 프로세스 동시 실행 테스트
+- 한 DB에 같은 시각에 울릴 알람 N개를 만들고 워커(uvicorn 프로세스) K개를 띄운 뒤,
+  이 스크립트 안의 SMTP 싱크로 받은 메일을 세어 빠짐 / 중복 발송이 없는지, 워커별로 얼마나 나눠 보냈는지 확인
+- --kill-after 를 주면 발송 도중 워커 하나를 강제 종료해서, 선점이 만료된 알람을 다른 워커가 이어서 보내는지 확인
+- --moved / --retitled 를 주면 API로 일정을 수정하는 경우도 확인
+  - 울리기 전에 일부 알람의 시각을 늦춤 (수정 요청은 워커 하나가 받으므로 다른 워커의 디스패처에는 예전 시각이 남음) → 바뀐 시각 전에 발송되지 않아야 함
+  - 발송 도중 아직 받지 못한 알람의 제목만 바꿈 (발송 중인 선점은 유지) → 중복 발송이 없어야 함
+
+사용 예 (service/alarm 폴더에서 실행):
+    python scripts/multi_worker_test.py --workers 3 --alarms 3000
+    python scripts/multi_worker_test.py --workers 3 --alarms 3000 --kill-after 2 --lease-seconds 5
+    python scripts/multi_worker_test.py --workers 3 --alarms 3000 --moved 100 --retitled 100
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+import jwt
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from smtp_sink import SMTPSink  # noqa: E402
+
+def get_json(url: str):
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            return json.loads(response.read())
+    except OSError:
+        return None
+
+def put_schedules(edits: List[Tuple[str, int, dict]], secret_key: str) -> int:
+    """(워커 URL, 일정 id, 바꿀 필드) 목록을 PUT /api/schedule/{id}로 보내고 실패 수 반환 (일정 i의 주인은 사용자 i)"""
+    failed = 0
+    for base_url, schedule_id, fields in edits:
+        token = jwt.encode(
+            {"user_id": schedule_id, "type": "access", "exp": datetime.utcnow() + timedelta(minutes=10)},
+            secret_key, algorithm="HS256"
+        )
+        request = urllib.request.Request(
+            f"{base_url}/api/schedule/{schedule_id}", data=json.dumps(fields).encode(), method="PUT",
+            headers={"Content-Type": "application/json", "Authorization": f"Bearer {token}"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=5):
+                pass
+        except OSError as e:
+            failed += 1
+            print(f"❌ 일정 {schedule_id} 수정 실패: {e}")
+    return failed
+
+async def run(workers: int, alarms: int, delay: float, latency: float, lease_seconds: float,
+              kill_after: float, moved: int, move_seconds: float, retitled: int,
+              base_port: int, smtp_port: int, timeout: float):
+    service_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    database = os.path.join(tempfile.mkdtemp(prefix="alarm-workers-"), "alarm.db")
+    secret_key = "multi-worker-test-secret-key-0123456789"
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{database}",
+        "SECRET_KEY": secret_key,
+        "DEBUG": "false",
+        "SMTP_SERVER": "127.0.0.1",
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_USE_TLS": "false",
+        "ALARM_LEASE_SECONDS": str(lease_seconds)
+    }
+
+    # 테이블 생성 + 알람 시드 (app.main은 DATABASE_URL을 import 시점에 읽으므로 별도 프로세스에서 실행)
+    due = datetime.now() + timedelta(seconds=delay)
+    moved_due = due + timedelta(seconds=move_seconds)
+    seed = f"""
+import asyncio
+from datetime import datetime
+from sqlalchemy import insert
+from app.main import create_tables, engine, User, Schedule
+
+async def main():
+    await create_tables()
+    due = datetime.fromisoformat("{due.isoformat()}")
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [
+            {{"id": i, "google_uid": f"worker-test-{{i}}", "email": f"user{{i}}@example.com", "name": f"사용자 {{i}}"}}
+            for i in range(1, {alarms} + 1)
+        ])
+        await conn.execute(insert(Schedule), [
+            {{"user_id": i, "title": f"알림 {{i}}", "scheduled_time": due, "is_completed": False, "is_active": True}}
+            for i in range(1, {alarms} + 1)
+        ])
+    await engine.dispose()
+
+asyncio.run(main())
+"""
+    subprocess.run([sys.executable, "-c", seed], cwd=service_dir, env=env, check=True)
+
+    sink = SMTPSink(latency)
+    server = await asyncio.start_server(sink.handle, "127.0.0.1", smtp_port)
+    processes = []
+    for i in range(workers):
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(base_port + i), "--log-level", "warning"],
+            cwd=service_dir, env={**env, "ALARM_WORKER_ID": f"worker-{i}"},
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        ))
+    print(f"🚀 워커 {workers}개 시작, 알람 {alarms}개가 {delay:g}초 뒤 동시에 울림 (DB: {database})")
+
+    started = time.monotonic()
+    elapsed = None
+    killed = None
+    stats = {}
+    edits_sent = {"moved": moved == 0, "retitled": retitled == 0}
+    edit_failures = 0
+    try:
+        while time.monotonic() - started < delay + timeout:
+            await asyncio.sleep(0.5)
+            for i, process in enumerate(processes):
+                if process.poll() is None:
+                    # 싱크가 같은 이벤트 루프에서 돌고 있으므로 블로킹 요청은 스레드에서
+                    url = f"http://127.0.0.1:{base_port + i}/health/alarm-worker"
+                    stats[i] = await asyncio.to_thread(get_json, url) or stats.get(i)
+            if not edits_sent["moved"] and len(stats) == workers and all(stats.values()):
+                # 일정 1~moved의 시각을 늦춤 (워커를 돌아가며 요청)
+                edits_sent["moved"] = True
+                if datetime.now() >= due:
+                    print("⚠️ 워커가 늦게 떠서 알람이 울린 뒤에 시각을 바꿨습니다 (--delay를 늘리세요)")
+                edits = [
+                    (f"http://127.0.0.1:{base_port + schedule_id % workers}", schedule_id, {"scheduled_time": moved_due.isoformat()})
+                    for schedule_id in range(1, moved + 1)
+                ]
+                edit_failures += await asyncio.to_thread(put_schedules, edits, secret_key)
+                print(f"✏️ 알람 {moved}개 시각을 {move_seconds:g}초 늦춤")
+            if not edits_sent["retitled"] and sink.messages > 0:
+                # 발송 도중 아직 받지 못한 알람의 제목만 바꿈
+                edits_sent["retitled"] = True
+                waiting = [i for i in range(moved + 1, alarms + 1) if f"user{i}@example.com" not in sink.recipients][:retitled]
+                edits = [
+                    (f"http://127.0.0.1:{base_port + schedule_id % workers}", schedule_id, {"title": f"바뀐 알림 {schedule_id}"})
+                    for schedule_id in waiting
+                ]
+                edit_failures += await asyncio.to_thread(put_schedules, edits, secret_key)
+                print(f"✏️ 발송 중 알람 {len(waiting)}개 제목 수정 (메일 {sink.messages}통 발송 시점)")
+            if kill_after and killed is None and time.monotonic() - started > delay + kill_after:
+                killed = 0
+                processes[0].send_signal(signal.SIGKILL)
+                print(f"💥 worker-0 강제 종료 (메일 {sink.messages}통 발송 시점)")
+            if len(sink.recipients) >= alarms:
+                elapsed = time.monotonic() - started - delay
+                await asyncio.sleep(1)  # 뒤늦은 중복 발송이 있는지 잠깐 더 확인
+                break
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in processes:
+            await asyncio.to_thread(process.wait)  # 종료 중인 워커가 싱크에 QUIT을 보내므로 루프를 막지 않음
+        server.close()
+        await server.wait_closed()
+
+    if elapsed is None:
+        elapsed = time.monotonic() - started - delay
+    duplicates = sum(count - 1 for count in sink.recipients.values() if count > 1)
+    missing = alarms - len(sink.recipients)
+    # 바뀐 시각 전에 나간 메일 (다른 워커가 예전 시각에 보낸 경우)
+    early = sum(
+        1 for schedule_id in range(1, moved + 1)
+        if sink.first_received.get(f"user{schedule_id}@example.com", math.inf) < moved_due.timestamp()
+    )
+    print(f"📊 메일 {sink.messages}통 / 알람 {alarms}개 - 빠짐 {missing}개, 중복 {duplicates}통 ({elapsed:.1f}s)")
+    if moved or retitled:
+        print(f"   수정한 알람: 시각 변경 {moved}개 중 예전 시각에 발송 {early}개, 수정 요청 실패 {edit_failures}개")
+    for i in range(workers):
+        worker = stats.get(i) or {}
+        note = " (강제 종료, 종료 직전 통계)" if i == killed else ""
+        print(f"   worker-{i}: 선점 {worker.get('claimed', 0)}개, 발송 {worker.get('sent', 0)}통, "
+              f"건너뜀 {worker.get('skipped', 0)}개, 재시도 대기 {worker.get('reclaimed', 0)}개{note}")
+    return missing == 0 and (duplicates == 0 or killed is not None) and early == 0 and edit_failures == 0
+
+def main():
+    parser = argparse.ArgumentParser(description="여러 알람 워커 프로세스 동시 실행 테스트")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--alarms", type=int, default=3000)
+    parser.add_argument("--delay", type=float, default=8, help="워커가 뜬 뒤 알람이 울리기까지 (초)")
+    parser.add_argument("--latency-ms", type=float, default=5, help="SMTP 싱크 응답 지연")
+    parser.add_argument("--lease-seconds", type=float, default=60)
+    parser.add_argument("--kill-after", type=float, default=0, help="알람이 울리고 이 시간(초) 뒤 worker-0 강제 종료")
+    parser.add_argument("--moved", type=int, default=0, help="울리기 전에 시각을 늦출 알람 수")
+    parser.add_argument("--move-seconds", type=float, default=3, help="--moved 알람을 늦추는 시간 (초)")
+    parser.add_argument("--retitled", type=int, default=0, help="발송 도중 제목을 바꿀 알람 수")
+    parser.add_argument("--base-port", type=int, default=8102)
+    parser.add_argument("--smtp-port", type=int, default=8025)
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+    ok = asyncio.run(run(
+        args.workers, args.alarms, args.delay, args.latency_ms / 1000, args.lease_seconds,
+        args.kill_after, args.moved, args.move_seconds, args.retitled, args.base_port, args.smtp_port, args.timeout
+    ))
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
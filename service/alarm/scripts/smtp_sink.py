@@ -0,0 +1,98 @@
+"""
+로컬 SMTP 싱크 (메일 발송 처리량 테스트용)
+- EHLO / AUTH / MAIL / RCPT / DATA / RSET / NOOP / QUIT 에 항상 성공으로 응답하고 메일은 버림
+- --latency-ms 로 응답마다 지연을 넣어 실제 SMTP 서버까지의 왕복 시간을 흉내
+  (연결 + EHLO + AUTH + QUIT처럼 명령이 많을수록 느려짐, STARTTLS는 지원하지 않음)
+
+사용 예:
+    python scripts/smtp_sink.py --port 8025 --latency-ms 20
+    SMTP_SERVER=localhost SMTP_PORT=8025 SMTP_USE_TLS=false SMTP_USERNAME=bench uvicorn app.main:app --port 8002
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import Dict
+
+class SMTPSink:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.connections = 0
+        self.messages = 0
+        self.recipients: Counter = Counter()  # 수신자별 받은 메일 수 (중복 발송 확인용)
+        self.first_received: Dict[str, float] = {}  # 수신자별 첫 메일을 받은 시각 (epoch 초)
+
+    async def reply(self, writer: asyncio.StreamWriter, text: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        writer.write(text.encode() + b"\r\n")
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            await self.reply(writer, "220 smtp-sink ESMTP")
+            recipients = []
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line[:4].upper()
+                if command == b"EHLO":
+                    await self.reply(writer, "250-smtp-sink\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME")
+                elif command == b"HELO":
+                    await self.reply(writer, "250 smtp-sink")
+                elif command == b"AUTH":
+                    await self.reply(writer, "235 2.7.0 Authentication successful")
+                elif command in (b"MAIL", b"RCPT", b"RSET", b"NOOP"):
+                    if command == b"RCPT":
+                        recipients.append(line.decode(errors="replace").split(":", 1)[-1].strip().strip("<>"))
+                    elif command != b"NOOP":
+                        recipients = []
+                    await self.reply(writer, "250 2.0.0 OK")
+                elif command == b"DATA":
+                    await self.reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    while (await reader.readline()) not in (b".\r\n", b""):
+                        pass
+                    self.messages += 1
+                    self.recipients.update(recipients)
+                    for recipient in recipients:
+                        self.first_received.setdefault(recipient, time.time())
+                    recipients = []
+                    await self.reply(writer, "250 2.0.0 Queued")
+                elif command == b"QUIT":
+                    await self.reply(writer, "221 2.0.0 Bye")
+                    break
+                else:
+                    await self.reply(writer, "502 5.5.2 Command not recognized")
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # 클라이언트가 끊었거나 싱크 종료
+        finally:
+            writer.close()
+
+async def serve(host: str, port: int, latency: float):
+    sink = SMTPSink(latency)
+    server = await asyncio.start_server(sink.handle, host, port)
+    print(f"📮 SMTP 싱크 시작: {host}:{port} (응답 지연 {latency * 1000:.0f}ms)")
+    async with server:
+        last = (0, 0)
+        while True:
+            await asyncio.sleep(5)
+            if (sink.connections, sink.messages) != last:
+                last = (sink.connections, sink.messages)
+                print(f"   {time.strftime('%H:%M:%S')} 연결 {sink.connections}개, 메일 {sink.messages}통")
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 SMTP 싱크")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=20, help="응답마다 넣는 지연 (SMTP 서버 왕복 시간)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.latency_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import insert, select, update
+
+from conftest import main
+
+def worker(name: str, claim_batch_size: int = 50, lease_seconds: float = 60) -> main.AlarmWorker:
+    return main.AlarmWorker(name, claim_batch_size, lease_seconds, concurrency=10)
+
+async def add_schedules(count: int, scheduled_time: datetime = None) -> list:
+    """사용자 i의 일정 i를 만들고 id 목록 반환 (SQLite에는 로컬 시각으로 저장)"""
+    scheduled_time = scheduled_time or datetime.now() - timedelta(seconds=1)
+    async with main.engine.begin() as conn:
+        await conn.execute(insert(main.User), [
+            {"id": i, "google_uid": f"uid-{i}", "email": f"user{i}@example.com", "name": f"사용자 {i}"}
+            for i in range(1, count + 1)
+        ])
+        await conn.execute(insert(main.Schedule), [
+            {"id": i, "user_id": i, "title": f"알림 {i}", "scheduled_time": scheduled_time, "is_completed": False, "is_active": True}
+            for i in range(1, count + 1)
+        ])
+    return list(range(1, count + 1))
+
+async def set_schedule(schedule_id: int, **values):
+    async with main.SessionLocal() as db:
+        await db.execute(update(main.Schedule).where(main.Schedule.id == schedule_id).values(**values))
+        await db.commit()
+
+async def get_schedule(schedule_id: int) -> main.Schedule:
+    async with main.SessionLocal() as db:
+        return await db.get(main.Schedule, schedule_id)
+
+async def completed_ids() -> list:
+    async with main.SessionLocal() as db:
+        return list((await db.scalars(
+            select(main.Schedule.id).where(main.Schedule.is_completed == True).order_by(main.Schedule.id)
+        )).all())
+
+def test_fire_sends_every_claimed_alarm_once_and_completes_it(run, outbox):
+    alarm_worker = worker("w1", claim_batch_size=7)
+
+    async def scenario():
+        ids = await add_schedules(30)
+        await alarm_worker.fire(ids)
+        assert await completed_ids() == ids
+        row = await get_schedule(ids[0])
+        assert (row.lease_owner, row.lease_expires_at) == (None, None)
+    run(scenario())
+    assert sorted(outbox.mails) == sorted((f"user{i}@example.com", f"알림 {i}") for i in range(1, 31))
+    assert (alarm_worker.claimed, alarm_worker.sent, alarm_worker.skipped) == (30, 30, 0)
+
+def test_workers_firing_the_same_alarms_split_them(run, outbox):
+    first, second = worker("w1", claim_batch_size=10), worker("w2", claim_batch_size=10)
+
+    async def scenario():
+        ids = await add_schedules(100)
+        await asyncio.gather(first.fire(ids), second.fire(ids))
+        assert await completed_ids() == ids
+    run(scenario())
+    assert Counter(email for email, _ in outbox.mails) == Counter(f"user{i}@example.com" for i in range(1, 101))
+    assert first.sent + second.sent == 100
+    assert first.skipped + second.skipped == 100
+
+def test_alarm_that_is_not_due_yet_is_not_claimed(run, outbox):
+    # 다른 워커가 시각을 늦춘 일정이 이 워커의 디스패처에는 예전 시각으로 남아 있는 경우
+    alarm_worker = worker("w1")
+
+    async def scenario():
+        [schedule_id] = await add_schedules(1, datetime.now() + timedelta(minutes=5))
+        await alarm_worker.fire([schedule_id])
+        row = await get_schedule(schedule_id)
+        assert not row.is_completed and row.lease_owner is None
+    run(scenario())
+    assert outbox.mails == []
+    assert (alarm_worker.claimed, alarm_worker.skipped) == (0, 1)
+
+def test_expired_lease_is_reclaimed_but_live_lease_is_not(run, outbox):
+    alarm_worker = worker("w1")
+
+    async def scenario():
+        await add_schedules(2)
+        now = datetime.now()
+        await set_schedule(1, lease_owner="dead-worker", lease_expires_at=now - timedelta(seconds=1))
+        await set_schedule(2, lease_owner="busy-worker", lease_expires_at=now + timedelta(minutes=1))
+        await alarm_worker.fire([1, 2])
+        assert await completed_ids() == [1]
+        assert (await get_schedule(2)).lease_owner == "busy-worker"
+    run(scenario())
+    assert outbox.mails == [("user1@example.com", "알림 1")]
+
+def test_failed_send_stays_pending_under_lease(run, outbox):
+    outbox.failing.add("user2@example.com")
+    alarm_worker = worker("w1")
+
+    async def scenario():
+        ids = await add_schedules(3)
+        await alarm_worker.fire(ids)
+        assert await completed_ids() == [1, 3]
+        row = await get_schedule(2)
+        assert row.lease_owner == "w1" and row.lease_expires_at > datetime.now()
+    run(scenario())
+    assert (alarm_worker.sent, alarm_worker.failed) == (2, 1)
+
+def test_complete_is_idempotent_and_skips_rescheduled_alarms(run, outbox):
+    alarm_worker = worker("w1")
+
+    async def scenario():
+        await add_schedules(2)
+        # 발송 중에 일정 2의 시각을 늦춤 → 완료 처리하지 않고 바뀐 시각에 다시 울림
+        await set_schedule(2, scheduled_time=datetime.now() + timedelta(minutes=5))
+        await alarm_worker._complete([1, 2])
+        await alarm_worker._complete([1, 2])
+        assert await completed_ids() == [1]
+    run(scenario())
+
+def test_editing_schedule_resets_lease_only_when_timing_changes(run):
+    token = main.create_access_token({"user_id": 1})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def edit(client, **fields):
+        response = await client.put("/api/schedule/1", json=fields, headers=headers)
+        assert response.status_code == 200
+        row = await get_schedule(1)
+        return row.lease_owner
+
+    async def scenario():
+        await add_schedules(1)
+        later = (datetime.now() + timedelta(minutes=5)).isoformat()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # 발송 중(선점 유효): 제목을 바꾸든 시각을 바꾸든 선점 유지
+            await set_schedule(1, lease_owner="w1", lease_expires_at=datetime.now() + timedelta(minutes=1))
+            assert await edit(client, title="바뀐 제목") == "w1"
+            assert await edit(client, scheduled_time=later) == "w1"
+            # 만료된 선점: 제목만 바꾸면 그대로, 시각이나 활성 상태를 바꾸면 해제
+            await set_schedule(1, lease_expires_at=datetime.now() - timedelta(seconds=1))
+            assert await edit(client, description="설명만 바꿈") == "w1"
+            assert await edit(client, is_active=False) is None
+        main.unschedule_notification(1)
+    run(scenario())
+
+def test_alarm_registered_only_on_a_dead_worker_is_sent_by_another(run, outbox, monkeypatch):
+    # API 요청을 받은 워커 A의 디스패처에만 올라간 알람 - A는 울리기 전에 죽음 (디스패처를 시작하지 않음)
+    worker_a, worker_b = worker("w-a"), worker("w-b")
+    dispatcher_a = main.AlarmDispatcher(0.05, worker_a.fire)
+    dispatcher_b = main.AlarmDispatcher(0.05, worker_b.fire)
+    monkeypatch.setattr(main.settings, "ALARM_TICK_SECONDS", 0.05)
+
+    async def scenario():
+        await add_schedules(3)
+        await set_schedule(2, scheduled_time=datetime.now() + timedelta(minutes=5))  # 아직 시각이 안 됨
+        await set_schedule(3, is_completed=True)
+        dispatcher_a.add(1, datetime.now().timestamp())
+        # 워커 B의 로딩 구간은 이미 지나 있으므로 선점 회수 작업만이 알람을 찾을 수 있음
+        monkeypatch.setattr(main, "alarm_dispatcher", dispatcher_b)
+        dispatcher_b.start()
+        try:
+            await worker_b.reclaim_expired()
+            assert 1 in dispatcher_b and 2 not in dispatcher_b and 3 not in dispatcher_b
+            for _ in range(100):
+                if await completed_ids() == [1, 3]:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await dispatcher_b.close()
+        assert await completed_ids() == [1, 3]
+    run(scenario())
+    assert outbox.mails == [("user1@example.com", "알림 1")]
+    assert (worker_a.sent, worker_b.sent, worker_b.reclaimed) == (0, 1, 1)
@@ -1,17 +1,30 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, LargeBinary, Index, UniqueConstraint, event, inspect, text, bindparam, select, literal, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session, relationship
+from sqlalchemy.orm import Session, relationship, aliased
 from sqlalchemy.sql import func
-from pydantic import BaseModel
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ValidationError
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
+from collections import OrderedDict, deque
+import numpy as np
+import anyio
+import asyncio
+import base64
 import jwt
 from jwt.exceptions import InvalidTokenError
 import httpx
+import json
 import os
+import time
+import re
 
 # 설정
 class Settings:
@@ -22,18 +35,84 @@ class Settings:
     REFRESH_TOKEN_EXPIRE_DAYS = 7
     GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
     GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET", "")
+    GOOGLE_USERINFO_URL = os.getenv("GOOGLE_USERINFO_URL", "https://www.googleapis.com/oauth2/v2/userinfo")
+    # 게이트웨이가 검증한 구글 사용자 정보를 서명해서 넘기는 내부 채널 (비어 있으면 비활성화)
+    INTERNAL_AUTH_SECRET = os.getenv("INTERNAL_AUTH_SECRET", "")
     ALLOWED_ORIGINS = ["http://localhost:3000", "https://your-frontend-domain.vercel.app"]
     ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
     DEBUG = os.getenv("DEBUG", "true").lower() == "true"
     
     # 로컬 Ollama API 설정
     LOCAL_OLLAMA_URL = os.getenv("LOCAL_OLLAMA_URL", "http://localhost:8003")
+    
+    # 업스트림 HTTP 연결 풀 / 타임아웃 설정
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    AI_API_TIMEOUT = float(os.getenv("AI_API_TIMEOUT", "60"))
+    GOOGLE_API_TIMEOUT = float(os.getenv("GOOGLE_API_TIMEOUT", "10"))
+    
+    # 의미 기반 컨텍스트 검색 설정
+    SEMANTIC_CONTEXT_ENABLED = os.getenv("SEMANTIC_CONTEXT_ENABLED", "true").lower() == "true"
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "nomic-embed-text")
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    EMBEDDING_MAX_CHARS = int(os.getenv("EMBEDDING_MAX_CHARS", "2000"))
+    CONTEXT_TOP_K = int(os.getenv("CONTEXT_TOP_K", "5"))
+    CONTEXT_IMPORTANCE_WEIGHT = float(os.getenv("CONTEXT_IMPORTANCE_WEIGHT", "0.2"))
+    CONTEXT_INDEX_MAX_VECTORS = int(os.getenv("CONTEXT_INDEX_MAX_VECTORS", "500000"))
+    
+    # 전문 검색 설정
+    SEARCH_INDEX_ENABLED = os.getenv("SEARCH_INDEX_ENABLED", "true").lower() == "true"
+    SEARCH_MAX_QUERY_TERMS = int(os.getenv("SEARCH_MAX_QUERY_TERMS", "16"))
+    CONTEXT_KEYWORD_RECALL = os.getenv("CONTEXT_KEYWORD_RECALL", "true").lower() == "true"
+    CONTEXT_RECALL_LIMIT = int(os.getenv("CONTEXT_RECALL_LIMIT", "50"))
+    
+    # 대화 메모리 설정 (세션별 최근 대화를 토큰 예산 안에서 AI에 함께 전달)
+    SESSION_MEMORY_ENABLED = os.getenv("SESSION_MEMORY_ENABLED", "true").lower() == "true"
+    SESSION_MEMORY_TOKEN_BUDGET = int(os.getenv("SESSION_MEMORY_TOKEN_BUDGET", "1500"))
+    SESSION_MEMORY_MAX_TURNS = int(os.getenv("SESSION_MEMORY_MAX_TURNS", "40"))
+    SESSION_MEMORY_MAX_SESSIONS = int(os.getenv("SESSION_MEMORY_MAX_SESSIONS", "1000"))
+    
+    # 사용자 캐시 설정 (이전 형식 토큰 / 리프레시 / 내 정보 조회용)
+    USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "300"))
+    USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+    
+    # 채팅 세션 목록 설정 (세션 제목 / 마지막 메시지 미리보기 길이)
+    CHAT_SESSION_TITLE_CHARS = int(os.getenv("CHAT_SESSION_TITLE_CHARS", "40"))
+    CHAT_SESSION_PREVIEW_CHARS = int(os.getenv("CHAT_SESSION_PREVIEW_CHARS", "100"))
+    
+    # 채팅 로그 write-behind 설정 (켜면 요청 경로에서는 큐에 넣고 백그라운드에서 모아서 저장)
+    CHAT_LOG_WRITE_BEHIND = os.getenv("CHAT_LOG_WRITE_BEHIND", "false").lower() == "true"
+    CHAT_LOG_QUEUE_SIZE = int(os.getenv("CHAT_LOG_QUEUE_SIZE", "1000"))  # 대기 턴 수 상한 (가득 차면 요청이 기다림)
+    CHAT_LOG_FLUSH_BATCH = int(os.getenv("CHAT_LOG_FLUSH_BATCH", "200"))  # 한 번에 저장할 최대 턴 수
+    CHAT_LOG_FLUSH_INTERVAL = float(os.getenv("CHAT_LOG_FLUSH_INTERVAL", "0.2"))  # 첫 턴 이후 최대 대기(초)
+    
+    # 일기 목록 설정 (요약 보기에서 본문 대신 보내는 미리보기 길이)
+    DIARY_PREVIEW_CHARS = int(os.getenv("DIARY_PREVIEW_CHARS", "120"))
+    
+    # 일기 일괄 가져오기 설정
+    DIARY_IMPORT_BATCH_SIZE = int(os.getenv("DIARY_IMPORT_BATCH_SIZE", "500"))  # 한 트랜잭션에 저장할 일기 수
+    DIARY_IMPORT_MAX_ERRORS = int(os.getenv("DIARY_IMPORT_MAX_ERRORS", "100"))  # 응답에 담을 행별 오류 수
 
 settings = Settings()
 
-# 데이터베이스 설정
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, pool_recycle=300, echo=settings.DEBUG)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 데이터베이스 설정 (이벤트 루프를 막지 않도록 async 드라이버 사용)
+def async_database_url(url: str) -> str:
+    """동기 드라이버 URL을 async 드라이버 URL로 변환 (sqlite -> aiosqlite, postgresql -> asyncpg)"""
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    if url.startswith("postgres://"):
+        return "postgresql+asyncpg://" + url[len("postgres://"):]
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://"):]
+    return url
+
+class SyncSession(Session):
+    """AsyncSession 내부에서 쓰이는 동기 세션 (flush 이벤트 리스너 등록용)"""
+
+engine = create_async_engine(async_database_url(settings.DATABASE_URL), pool_pre_ping=True, pool_recycle=300, echo=settings.DEBUG)
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False, sync_session_class=SyncSession)
 Base = declarative_base()
 
 # 데이터베이스 모델
@@ -46,7 +125,11 @@ class User(Base):
     name = Column(String(100), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    diary_entries = relationship("DiaryEntry", back_populates="user")
+    diary_entries = relationship(
+        "DiaryEntry",
+        back_populates="user",
+        primaryjoin="User.google_uid == foreign(DiaryEntry.account_id)"
+    )
     chat_logs = relationship("ChatLog", back_populates="user")
     context_data = relationship("UserContextData", back_populates="user")
 
@@ -58,7 +141,16 @@ class DiaryEntry(Base):
     diary = Column(Text, nullable=False)  # 사용자가 입력한 일기/일정
     date = Column(DateTime(timezone=True), nullable=False)  # 입력한 날짜/시간
     
-    user = relationship("User", back_populates="diary_entries")
+    user = relationship(
+        "User",
+        back_populates="diary_entries",
+        primaryjoin="User.google_uid == foreign(DiaryEntry.account_id)"
+    )
+    
+    __table_args__ = (
+        # 일기 목록 키셋 페이지네이션 / 기간 조회용 (최신순은 역방향 스캔)
+        Index("ix_diary_entries_account_date", "account_id", "date", "id"),
+    )
 
 class ChatLog(Base):
     __tablename__ = "chat_logs"
@@ -71,6 +163,31 @@ class ChatLog(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="chat_logs")
+    
+    __table_args__ = (
+        # 히스토리 키셋 페이지네이션용 (세션별 / 사용자 전체)
+        Index("ix_chat_logs_user_session_created", "user_id", "session_id", "created_at", "id"),
+        Index("ix_chat_logs_user_created", "user_id", "created_at", "id"),
+    )
+
+class ChatSession(Base):
+    """채팅 세션 목록용 요약 (ChatLog를 저장할 때 같은 트랜잭션에서 갱신)"""
+    __tablename__ = "chat_sessions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    session_id = Column(String(255), nullable=False)
+    title = Column(String(200), nullable=True)  # 첫 질문 앞부분
+    message_count = Column(Integer, nullable=False, default=0)
+    first_message_at = Column(DateTime(timezone=True), nullable=False)
+    last_message_at = Column(DateTime(timezone=True), nullable=False)
+    last_message_preview = Column(String(500), nullable=True)
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "session_id", name="uq_chat_sessions_user_session"),
+        # 세션 목록 키셋 페이지네이션용 (최근 대화순)
+        Index("ix_chat_sessions_user_last", "user_id", "last_message_at", "id"),
+    )
 
 class UserContextData(Base):
     __tablename__ = "user_context_data"
@@ -87,15 +204,35 @@ class UserContextData(Base):
     
     user = relationship("User", back_populates="context_data")
 
+class ContextEmbedding(Base):
+    __tablename__ = "context_embeddings"
+    
+    context_id = Column(Integer, ForeignKey("user_context_data.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    model = Column(String(100), nullable=False)  # 임베딩 모델 이름
+    dim = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)  # 정규화된 float32 벡터
+
 # Pydantic 스키마
 class GoogleAuthRequest(BaseModel):
     access_token: str
 
+class InternalGoogleAuthRequest(BaseModel):
+    assertion: str  # 게이트웨이가 INTERNAL_AUTH_SECRET으로 서명한 사용자 정보 JWT
+
 class TokenResponse(BaseModel):
     access_token: str
     refresh_token: str
     token_type: str
 
+class AuthUser(BaseModel):
+    """인증된 사용자 (액세스 토큰 클레임 또는 사용자 캐시에서 채움)"""
+    id: int
+    google_uid: str
+    email: str
+    name: str
+    created_at: Optional[datetime] = None
+
 class DiaryCreate(BaseModel):
     diary: str
     date: datetime
@@ -106,6 +243,29 @@ class DiaryResponse(BaseModel):
     diary: str
     date: datetime
 
+class DiaryImportError(BaseModel):
+    index: int  # 0부터 시작하는 행 번호
+    error: str
+
+class DiaryImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[DiaryImportError]  # 최대 DIARY_IMPORT_MAX_ERRORS개
+
+class DiaryListItem(BaseModel):
+    id: int
+    account_id: str
+    date: datetime
+    diary: Optional[str] = None  # 요약 보기에서는 None
+    preview: str
+    truncated: bool  # 미리보기가 본문 일부만 담고 있는지
+
+class DiaryListResponse(BaseModel):
+    diaries: List[DiaryListItem]  # 최신순
+    limit: int
+    has_more: bool
+    next_cursor: Optional[str] = None  # 다음(더 오래된) 페이지: cursor=next_cursor
+
 class ChatMessage(BaseModel):
     message: str
     session_id: Optional[str] = None
@@ -114,6 +274,35 @@ class ChatResponse(BaseModel):
     message: str
     session_id: str
 
+class ChatHistoryItem(BaseModel):
+    id: Optional[int]  # 아직 저장 대기 중(write-behind)이면 None
+    session_id: str
+    role: str
+    message: str
+    created_at: Optional[datetime]
+
+class ChatHistoryResponse(BaseModel):
+    messages: List[ChatHistoryItem]  # 오래된 순
+    limit: int
+    has_older: bool
+    has_newer: bool
+    older_cursor: Optional[str] = None  # 이전 페이지: before=older_cursor
+    newer_cursor: Optional[str] = None  # 다음 페이지: after=newer_cursor
+
+class ChatSessionItem(BaseModel):
+    session_id: str
+    title: Optional[str]
+    message_count: int
+    first_message_at: datetime
+    last_message_at: datetime
+    last_message_preview: Optional[str]
+
+class ChatSessionListResponse(BaseModel):
+    sessions: List[ChatSessionItem]  # 최근 대화순
+    limit: int
+    has_more: bool
+    next_cursor: Optional[str] = None  # 다음 페이지: cursor=next_cursor
+
 class ContextDataCreate(BaseModel):
     data_type: str
     title: Optional[str] = None
@@ -121,6 +310,21 @@ class ContextDataCreate(BaseModel):
     tags: Optional[str] = None
     importance_score: Optional[int] = 1
 
+class SearchHit(BaseModel):
+    source: str  # 'diary', 'context', 'chat'
+    id: int
+    score: float
+    text: str
+    created_at: Optional[datetime]
+    session_id: Optional[str] = None
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchHit]
+    limit: int
+    offset: int
+    has_more: bool
+
 class ContextDataResponse(BaseModel):
     id: int
     data_type: str
@@ -132,12 +336,9 @@ class ContextDataResponse(BaseModel):
     updated_at: datetime
 
 # 의존성
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 security = HTTPBearer()
 
@@ -166,34 +367,214 @@ def verify_token(token: str) -> Optional[Dict[str, Any]]:
     except InvalidTokenError:
         return None
 
+def identity_claims(user) -> Dict[str, Any]:
+    """액세스 토큰에 넣는 사용자 식별 정보 (User / AuthUser, 요청마다 사용자 테이블을 읽지 않도록)"""
+    return {"user_id": user.id, "google_uid": user.google_uid, "email": user.email, "name": user.name}
+
+class UserCache:
+    """user_id -> AuthUser 캐시 (TTL, 최대 개수 초과 시 오래 쓰지 않은 항목부터 제거)
+
+    사용자 정보가 바뀌면 invalidate()로 바로 지웁니다.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._users: "OrderedDict[int, Tuple[float, AuthUser]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: int) -> Optional[AuthUser]:
+        cached = self._users.get(user_id)
+        if cached is not None and cached[0] > time.monotonic():
+            self.hits += 1
+            self._users.move_to_end(user_id)
+            return cached[1]
+        
+        self.misses += 1
+        async with SessionLocal() as db:
+            user = await db.get(User, user_id)
+        if user is None:
+            self._users.pop(user_id, None)
+            return None
+        return self.put(user)
+
+    def put(self, user: User) -> AuthUser:
+        auth_user = AuthUser(
+            id=user.id,
+            google_uid=user.google_uid,
+            email=user.email,
+            name=user.name,
+            created_at=user.created_at
+        )
+        self._users[user.id] = (time.monotonic() + self.ttl, auth_user)
+        self._users.move_to_end(user.id)
+        while len(self._users) > self.max_size:
+            self._users.popitem(last=False)
+        return auth_user
+
+    def invalidate(self, user_id: int):
+        self._users.pop(user_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users": len(self._users),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+user_cache = UserCache(ttl=settings.USER_CACHE_TTL, max_size=settings.USER_CACHE_MAX_SIZE)
+
+async def get_auth_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> AuthUser:
+    """액세스 토큰 검증 후 사용자 식별 정보 반환 (토큰 클레임만 사용, DB 조회 없음)"""
+    payload = verify_token(credentials.credentials)
+    if not payload or payload.get("type") != "access" or not payload.get("user_id"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+    
+    if payload.get("google_uid"):
+        return AuthUser(
+            id=payload["user_id"],
+            google_uid=payload["google_uid"],
+            email=payload.get("email", ""),
+            name=payload.get("name", "")
+        )
+    
+    # 클레임이 없는 이전 형식 토큰은 사용자 캐시로 채움
+    user = await user_cache.get(payload["user_id"])
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    return user
+
+# HTTP 클라이언트 풀 (업스트림별 공유 클라이언트, 앱 시작/종료 시 생성/정리)
+# >>> shared/upstream_clients.py 복사본 (직접 수정 금지 - shared/에서 고친 뒤 python shared/sync.py 실행)
+def http2_supported() -> bool:
+    """h2 패키지가 설치된 경우에만 HTTP/2 사용 (TLS 업스트림에서만 협상됨)"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class UpstreamClientPool:
+    """업스트림별로 keep-alive 연결을 재사용하는 httpx.AsyncClient 관리"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._limits: Dict[str, httpx.Limits] = {}
+        self._requests: Dict[str, int] = {}
+
+    def register(self, name: str, timeout: httpx.Timeout, limits: httpx.Limits, base_url: str = ""):
+        async def count_request(request: httpx.Request):
+            self._requests[name] += 1
+
+        self._requests[name] = 0
+        self._limits[name] = limits
+        self._clients[name] = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=limits,
+            http2=http2_supported(),
+            event_hooks={"request": [count_request]}
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None:
+            raise RuntimeError(f"HTTP 클라이언트 '{name}'이(가) 초기화되지 않았습니다")
+        return client
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """업스트림별 연결 풀 상태 (모니터링용)"""
+        result = {}
+        for name, client in self._clients.items():
+            pool = getattr(client._transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            limits = self._limits[name]
+            result[name] = {
+                "base_url": str(client.base_url) or None,
+                "http2_enabled": http2_supported(),
+                "requests_total": self._requests[name],
+                "connections": len(connections),
+                "idle_connections": sum(1 for conn in connections if conn.is_idle()),
+                "http2_connections": sum(
+                    1 for conn in connections if "HTTP/2" in conn.info()
+                ),
+                "max_connections": limits.max_connections,
+                "max_keepalive_connections": limits.max_keepalive_connections,
+                "keepalive_expiry": limits.keepalive_expiry
+            }
+        return result
+# <<< shared/upstream_clients.py
+
+def build_http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+    )
+
+http_clients = UpstreamClientPool()
+
 # 로컬 Ollama API 호출 함수
-async def call_local_ollama_api(message: str, context: str = "") -> str:
+AI_BUSY_MESSAGE = "죄송합니다. 지금은 요청이 많아 답변을 드릴 수 없습니다. 잠시 후 다시 시도해주세요."
+
+class AIServiceError(Exception):
+    """AI API 호출 실패 (detail은 사용자에게 보여줄 안내 문구)"""
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+async def call_local_ollama_api(
+    message: str,
+    context: str = "",
+    user_id: Optional[str] = None,
+    history: Optional[List[Dict[str, str]]] = None
+) -> str:
     """로컬 Ollama API를 호출하여 응답 생성"""
     try:
         print(f"🤖 AI API 호출: {settings.LOCAL_OLLAMA_URL}")
         print(f"📝 사용자 메시지: {message[:50]}...")
         print(f"📚 컨텍스트: {context[:100] if context else '없음'}...")
+        print(f"💬 이전 대화: {len(history or [])}개")
         
         # 로컬 Ollama API 호출
-        url = f"{settings.LOCAL_OLLAMA_URL}/api/chat"
+        url = "/api/chat"
         data = {
             "message": message,
             "context": context,
-            "model": "llama2"
+            "messages": history or [],
+            "model": "llama2",
+            "user_id": user_id
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=data, timeout=60.0)
-            print(f"📡 AI API 응답 상태: {response.status_code}")
-            
-            if response.status_code == 200:
-                result = response.json()
-                ai_response = result.get("response", "죄송합니다. 응답을 생성할 수 없습니다.")
-                print(f"✅ AI 응답: {ai_response[:100]}...")
-                return ai_response
-            else:
-                print(f"❌ 로컬 Ollama API 오류: {response.status_code} - {response.text}")
-                return "죄송합니다. 현재 AI 서비스에 문제가 있습니다."
+        response = await http_clients.get("ai_api").post(url, json=data)
+        print(f"📡 AI API 응답 상태: {response.status_code}")
+        
+        if response.status_code == 200:
+            result = response.json()
+            ai_response = result.get("response", "죄송합니다. 응답을 생성할 수 없습니다.")
+            print(f"✅ AI 응답: {ai_response[:100]}...")
+            return ai_response
+        elif response.status_code == 429:
+            print(f"🚦 AI API 대기열 초과: {response.headers.get('Retry-After')}초 후 재시도 권장")
+            return AI_BUSY_MESSAGE
+        else:
+            print(f"❌ 로컬 Ollama API 오류: {response.status_code} - {response.text}")
+            return "죄송합니다. 현재 AI 서비스에 문제가 있습니다."
                 
     except httpx.ConnectError:
         print(f"❌ AI API 연결 실패: {settings.LOCAL_OLLAMA_URL}에 연결할 수 없습니다.")
@@ -205,6 +586,1041 @@ async def call_local_ollama_api(message: str, context: str = "") -> str:
         print(f"❌ 로컬 Ollama API 호출 실패: {e}")
         return "죄송합니다. 현재 AI 서비스에 문제가 있습니다."
 
+async def stream_local_ollama_api(
+    message: str,
+    context: str = "",
+    user_id: Optional[str] = None,
+    history: Optional[List[Dict[str, str]]] = None
+) -> AsyncIterator[str]:
+    """로컬 Ollama API 스트리밍 호출 - 생성되는 토큰을 순서대로 반환
+
+    AI API가 거절하거나 스트림 도중 실패하면 AIServiceError를 발생시킵니다 (오류 문구를 토큰으로 섞지 않음).
+    """
+    url = "/api/chat/stream"
+    data = {
+        "message": message,
+        "context": context,
+        "messages": history or [],
+        "model": "llama2",
+        "user_id": user_id
+    }
+    
+    try:
+        async with http_clients.get("ai_api").stream("POST", url, json=data) as response:
+            print(f"📡 AI API 스트림 응답 상태: {response.status_code}")
+            if response.status_code == 429:
+                await response.aread()
+                print(f"🚦 AI API 대기열 초과: {response.headers.get('Retry-After')}초 후 재시도 권장")
+                raise AIServiceError(AI_BUSY_MESSAGE)
+            if response.status_code != 200:
+                body = await response.aread()
+                print(f"❌ 로컬 Ollama API 오류: {response.status_code} - {body[:200]}")
+                raise AIServiceError("죄송합니다. 현재 AI 서비스에 문제가 있습니다.")
+            
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    print(f"❌ AI API 스트림 오류: {chunk['error']}")
+                    raise AIServiceError("죄송합니다. 현재 AI 서비스에 문제가 있습니다.")
+                if chunk.get("response"):
+                    yield chunk["response"]
+                    
+    except httpx.ConnectError:
+        print(f"❌ AI API 연결 실패: {settings.LOCAL_OLLAMA_URL}에 연결할 수 없습니다.")
+        raise AIServiceError("죄송합니다. AI 서비스에 연결할 수 없습니다. AI API 서비스가 실행 중인지 확인해주세요.")
+    except httpx.TimeoutException:
+        print("⏰ AI API 응답 시간 초과")
+        raise AIServiceError("죄송합니다. AI 응답 시간이 초과되었습니다.")
+    except httpx.HTTPError as e:
+        print(f"❌ AI API 스트림 중단: {type(e).__name__} {e}")
+        raise AIServiceError("죄송합니다. AI 응답을 받는 중 연결이 끊겼습니다.")
+    except json.JSONDecodeError as e:
+        print(f"❌ AI API 스트림 형식 오류: {e}")
+        raise AIServiceError("죄송합니다. 현재 AI 서비스에 문제가 있습니다.")
+
+# 전문 검색 인덱스 (일기, 컨텍스트 데이터, 채팅 로그)
+SEARCH_SOURCES = {"diary": 1, "context": 2, "chat": 3}
+SEARCH_TOKEN_RE = re.compile(r"[가-힣]+|[^\W_가-힣]+")
+
+def ngram_tokenize(text: str) -> List[List[str]]:
+    """단어별 검색 토큰 목록 (한글은 음절 bigram, 그 외 문자는 소문자 단어 그대로)
+
+    조사가 붙은 한글 어절도 찾을 수 있도록 bigram으로 쪼갭니다.
+    예: "공원에서" -> ["공원", "원에", "에서"]
+    """
+    words = []
+    for run in SEARCH_TOKEN_RE.findall(text.lower()):
+        if "가" <= run[0] <= "힣" and len(run) > 1:
+            words.append([run[i:i + 2] for i in range(len(run) - 1)])
+        else:
+            words.append([run])
+    return words
+
+def search_owner_key(user_id: Optional[int] = None, google_uid: Optional[str] = None) -> str:
+    """검색 문서 소유자 키 (일기는 구글 아이디, 나머지는 사용자 ID 기준)"""
+    if google_uid is not None:
+        return "g" + re.sub(r"\W", "", google_uid)
+    return f"u{user_id}"
+
+def search_document_for(obj) -> Optional[Dict[str, Any]]:
+    """ORM 객체를 검색 문서로 변환 (검색 대상이 아니면 None)"""
+    if isinstance(obj, DiaryEntry):
+        source, owner, body, created_at = "diary", search_owner_key(google_uid=obj.account_id), obj.diary, obj.date
+    elif isinstance(obj, UserContextData):
+        body = f"{obj.title}\n{obj.content}" if obj.title else obj.content
+        source, owner, created_at = "context", search_owner_key(obj.user_id), obj.__dict__.get("created_at")
+    elif isinstance(obj, ChatLog):
+        source, owner, body, created_at = "chat", search_owner_key(obj.user_id), obj.message, obj.__dict__.get("created_at")
+    else:
+        return None
+    
+    return {
+        "id": SearchIndex.doc_id(source, obj.id),
+        "owner": owner,
+        "source": source,
+        "source_id": obj.id,
+        "created_at": created_at or datetime.utcnow(),
+        "body": " ".join(token for word in ngram_tokenize(body or "") for token in word)
+    }
+
+class SearchIndex:
+    """SQLite(FTS5) / PostgreSQL(tsvector + GIN) 전문 검색 인덱스"""
+
+    TABLE = "search_index"
+
+    def __init__(self):
+        self._available: Optional[bool] = None
+
+    @staticmethod
+    def doc_id(source: str, source_id: int) -> int:
+        return source_id * 4 + SEARCH_SOURCES[source]
+
+    def create(self, conn):
+        """검색 인덱스 테이블 생성 (지원하지 않는 DB는 건너뜀, conn.run_sync로 호출)"""
+        if conn.dialect.name == "sqlite":
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.TABLE} USING fts5("
+                "body, owner, source UNINDEXED, source_id UNINDEXED, created_at UNINDEXED, "
+                "tokenize='unicode61')"
+            ))
+        elif conn.dialect.name == "postgresql":
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+                "id BIGINT PRIMARY KEY, owner VARCHAR(300) NOT NULL, source VARCHAR(20) NOT NULL, "
+                "source_id INTEGER NOT NULL, created_at TIMESTAMPTZ, body TEXT NOT NULL, tsv TSVECTOR NOT NULL)"
+            ))
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{self.TABLE}_tsv ON {self.TABLE} USING GIN (tsv)"))
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{self.TABLE}_owner ON {self.TABLE} (owner)"))
+        else:
+            print(f"⚠️ {conn.dialect.name}에서는 전문 검색 인덱스를 지원하지 않습니다")
+            return
+        self._available = True
+
+    async def check_available(self, db: AsyncSession) -> bool:
+        if self._available is None:
+            conn = await db.connection()
+            return await conn.run_sync(self.is_available)
+        return self._available
+
+    def is_available(self, conn) -> bool:
+        if self._available is None:
+            self._available = (
+                settings.SEARCH_INDEX_ENABLED
+                and conn.dialect.name in ("sqlite", "postgresql")
+                and inspect(conn).has_table(self.TABLE)
+            )
+        return self._available
+
+    def upsert(self, conn, docs: List[Dict[str, Any]]):
+        if not docs:
+            return
+        if conn.dialect.name == "sqlite":
+            self.delete(conn, [doc["id"] for doc in docs])
+            conn.execute(text(
+                f"INSERT INTO {self.TABLE} (rowid, body, owner, source, source_id, created_at) "
+                "VALUES (:id, :body, :owner, :source, :source_id, :created_at)"
+            ), [{**doc, "created_at": doc["created_at"].isoformat()} for doc in docs])
+        else:
+            conn.execute(text(
+                f"INSERT INTO {self.TABLE} (id, owner, source, source_id, created_at, body, tsv) "
+                "VALUES (:id, :owner, :source, :source_id, :created_at, :body, to_tsvector('simple', :body)) "
+                "ON CONFLICT (id) DO UPDATE SET body = EXCLUDED.body, tsv = EXCLUDED.tsv"
+            ), docs)
+
+    def delete(self, conn, doc_ids: List[int]):
+        if not doc_ids:
+            return
+        key = "rowid" if conn.dialect.name == "sqlite" else "id"
+        conn.execute(
+            text(f"DELETE FROM {self.TABLE} WHERE {key} IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": doc_ids}
+        )
+
+    async def search(
+        self,
+        db: AsyncSession,
+        owners: List[str],
+        query: str,
+        sources: Optional[List[str]] = None,
+        limit: int = 20,
+        offset: int = 0,
+        match_any: bool = False
+    ) -> List[Any]:
+        """관련도순 (source, source_id, created_at, score) 목록
+
+        match_any=False 이면 모든 검색어를, True 이면 하나 이상을 포함하는 문서를 찾습니다.
+        """
+        words = ngram_tokenize(query)[:settings.SEARCH_MAX_QUERY_TERMS]
+        if not words or not owners:
+            return []
+        
+        conn = await db.connection()
+        params: Dict[str, Any] = {"limit": limit, "offset": offset}
+        if conn.dialect.name == "sqlite":
+            phrases = ['"' + " ".join(word) + '"' for word in words]
+            terms = (" OR " if match_any else " AND ").join(phrases)
+            owner_terms = " OR ".join(f'"{owner}"' for owner in owners)
+            params["match"] = f"owner:({owner_terms}) AND body:({terms})"
+            sql = (
+                f"SELECT source, source_id, created_at, -bm25({self.TABLE}) AS score "
+                f"FROM {self.TABLE} WHERE {self.TABLE} MATCH :match"
+            )
+            if sources:
+                sql += " AND source IN :sources"
+            sql += f" ORDER BY bm25({self.TABLE}) LIMIT :limit OFFSET :offset"
+        else:
+            joiner = " | " if match_any else " & "
+            params["tsquery"] = joiner.join("(" + " <-> ".join(f"'{token}'" for token in word) + ")" for word in words)
+            params["owners"] = owners
+            sql = (
+                f"SELECT source, source_id, created_at, ts_rank(tsv, q) AS score "
+                f"FROM {self.TABLE}, to_tsquery('simple', :tsquery) AS q "
+                "WHERE owner IN :owners AND tsv @@ q"
+            )
+            if sources:
+                sql += " AND source IN :sources"
+            sql += " ORDER BY score DESC LIMIT :limit OFFSET :offset"
+        
+        statement = text(sql)
+        if sources:
+            params["sources"] = sources
+            statement = statement.bindparams(bindparam("sources", expanding=True))
+        if "owners" in params:
+            statement = statement.bindparams(bindparam("owners", expanding=True))
+        return (await conn.execute(statement, params)).all()
+
+    async def rebuild(self, db: AsyncSession, batch_size: int = 1000):
+        """기존 데이터 전체를 배치로 다시 색인"""
+        conn = await db.connection()
+        await conn.execute(text(f"DELETE FROM {self.TABLE}"))
+        for model in (DiaryEntry, UserContextData, ChatLog):
+            last_id = 0
+            while True:
+                rows = (await db.scalars(
+                    select(model).where(model.id > last_id).order_by(model.id).limit(batch_size)
+                )).all()
+                if not rows:
+                    break
+                docs = [search_document_for(row) for row in rows]
+                await conn.run_sync(lambda sync_conn: self.upsert(sync_conn, docs))
+                last_id = rows[-1].id
+                db.expunge_all()
+        await db.commit()
+
+search_index = SearchIndex()
+
+@event.listens_for(SyncSession, "after_flush")
+def sync_search_index(session, flush_context):
+    """일기/컨텍스트/채팅 로그 쓰기를 같은 트랜잭션에서 검색 인덱스에 반영"""
+    upserts = [
+        doc for doc in (
+            search_document_for(obj)
+            for obj in list(session.new) + [o for o in session.dirty if session.is_modified(o)]
+        ) if doc
+    ]
+    deletes = [
+        SearchIndex.doc_id(source, obj.id)
+        for obj in session.deleted
+        for source, model in (("diary", DiaryEntry), ("context", UserContextData), ("chat", ChatLog))
+        if isinstance(obj, model)
+    ]
+    if not upserts and not deletes:
+        return
+    
+    conn = session.connection()
+    if not search_index.is_available(conn):
+        return
+    search_index.delete(conn, deletes)
+    search_index.upsert(conn, upserts)
+
+async def keyword_recall_context_ids(db: AsyncSession, user_id: int, query: str) -> List[int]:
+    """질문 키워드가 들어간 컨텍스트 데이터 ID (관련도순, 후보 선별용)"""
+    if not await search_index.check_available(db):
+        return []
+    rows = await search_index.search(
+        db,
+        [search_owner_key(user_id)],
+        query,
+        sources=["context"],
+        limit=settings.CONTEXT_RECALL_LIMIT,
+        match_any=True
+    )
+    return [row.source_id for row in rows]
+
+# 의미 기반 컨텍스트 검색 (사용자별 NumPy 임베딩 인덱스)
+class AiApiEmbedder:
+    """ai_api /api/embed 를 통해 임베딩 계산 (테스트에서는 같은 인터페이스의 객체로 교체)"""
+
+    model = settings.EMBEDDING_MODEL
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        response = await http_clients.get("ai_api").post(
+            "/api/embed",
+            json={"texts": texts, "model": self.model}
+        )
+        response.raise_for_status()
+        return np.asarray(response.json()["embeddings"], dtype=np.float32)
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+class UserVectorIndex:
+    """사용자 한 명의 컨텍스트 임베딩 인덱스 (정규화된 float32 행렬 + 중요도)"""
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.dim = dim
+        self.size = 0
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.importance = np.empty(capacity, dtype=np.float32)
+        self.matrix = np.empty((capacity, dim), dtype=np.float32)
+
+    def _reserve(self, extra: int):
+        needed = self.size + extra
+        if needed <= len(self.ids):
+            return
+        capacity = max(needed, len(self.ids) * 2)
+        self.ids = np.resize(self.ids, capacity)
+        self.importance = np.resize(self.importance, capacity)
+        matrix = np.empty((capacity, self.dim), dtype=np.float32)
+        matrix[:self.size] = self.matrix[:self.size]
+        self.matrix = matrix
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray, importance: np.ndarray):
+        """정규화된 벡터 추가"""
+        count = len(ids)
+        self._reserve(count)
+        self.ids[self.size:self.size + count] = ids
+        # 중요도(1-5)는 검색 때마다 다시 계산하지 않도록 0-1로 정규화해 저장
+        self.importance[self.size:self.size + count] = np.clip((importance - 1.0) / 4.0, 0.0, 1.0)
+        self.matrix[self.size:self.size + count] = vectors
+        self.size += count
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        importance_weight: float,
+        candidate_ids: Optional[List[int]] = None
+    ) -> List[int]:
+        """코사인 유사도와 중요도(1-5)를 섞은 점수로 상위 k개 ID 반환
+
+        candidate_ids가 주어지면 (키워드 검색 등으로 고른) 후보 행만 비교합니다.
+        """
+        ids = self.ids[:self.size]
+        matrix = self.matrix[:self.size]
+        importance = self.importance[:self.size]
+        if candidate_ids is not None:
+            rows = np.flatnonzero(np.isin(ids, candidate_ids))
+            ids, matrix, importance = ids[rows], matrix[rows], importance[rows]
+        if len(ids) == 0:
+            return []
+        
+        similarity = matrix @ query
+        scores = (1.0 - importance_weight) * similarity + importance_weight * importance
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return ids[top].tolist()
+
+class ContextRetriever:
+    """UserContextData 임베딩 저장/로딩과 채팅 시점의 top-k 검색
+
+    임베딩 계산은 ContextEmbeddingQueue가 백그라운드에서 하고, 인덱스는 이미 저장된 벡터로만 만듭니다.
+    """
+
+    def __init__(self, embedder, max_vectors: int):
+        self.embedder = embedder
+        self.max_vectors = max_vectors
+        self._indexes: "OrderedDict[int, UserVectorIndex]" = OrderedDict()
+        # 로딩 중인 사용자 → [로딩 수, 로딩 중에 저장된 (ids, 벡터, 중요도)] (읽은 뒤 저장된 벡터가 인덱스에서 빠지지 않도록)
+        self._loading: Dict[int, list] = {}
+
+    @staticmethod
+    def _entry_text(title: Optional[str], content: str) -> str:
+        text = f"{title}\n{content}" if title else content
+        return text[:settings.EMBEDDING_MAX_CHARS]
+
+    async def _embed(self, texts: List[str]) -> np.ndarray:
+        return normalize_rows(await self.embedder.embed(texts))
+
+    async def _store(self, db: AsyncSession, entries: List[Any], vectors: np.ndarray):
+        """임베딩 저장 - 같은 모델 임베딩이 이미 있으면 그대로 두므로 여러 번 (동시에) 저장해도 같은 결과"""
+        insert_fn = postgresql_insert if engine.dialect.name == "postgresql" else sqlite_insert
+        statement = insert_fn(ContextEmbedding)
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=["context_id"],
+            set_={"model": excluded.model, "dim": excluded.dim, "vector": excluded.vector},
+            where=ContextEmbedding.model != excluded.model  # 임베딩 모델을 바꾼 경우만 교체
+        )
+        await db.execute(statement, [
+            {
+                "context_id": entry.id,
+                "user_id": entry.user_id,
+                "model": self.embedder.model,
+                "dim": vectors.shape[1],
+                "vector": vector.tobytes()
+            }
+            for entry, vector in zip(entries, vectors)
+        ])
+        await db.commit()
+
+    def add_vectors(self, user_id: int, ids: List[int], vectors: np.ndarray, importance: List[float]):
+        """새로 저장한 임베딩을 로딩된 (또는 로딩 중인) 인덱스에 반영"""
+        loading = self._loading.get(user_id)
+        if loading is not None:
+            loading[1].append((ids, vectors, importance))
+        index = self._indexes.get(user_id)
+        if index is None:
+            return
+        if index.dim != vectors.shape[1]:
+            self.invalidate(user_id)
+            return
+        index.add(np.asarray(ids, dtype=np.int64), vectors, np.asarray(importance, dtype=np.float32))
+
+    def _evict(self):
+        total = sum(index.size for index in self._indexes.values())
+        while total > self.max_vectors and len(self._indexes) > 1:
+            _, index = self._indexes.popitem(last=False)
+            total -= index.size
+
+    def invalidate(self, user_id: int):
+        self._indexes.pop(user_id, None)
+
+    async def load_index(self, db: AsyncSession, user_id: int) -> Optional[UserVectorIndex]:
+        """저장된 임베딩으로 사용자 인덱스 로딩 (임베딩이 아직 없는 행은 계산되면 add_vectors로 추가됨)"""
+        index = self._indexes.get(user_id)
+        if index is not None:
+            self._indexes.move_to_end(user_id)
+            return index
+
+        loading = self._loading.setdefault(user_id, [0, []])
+        loading[0] += 1
+        try:
+            rows = (await db.execute(
+                select(
+                    UserContextData.id,
+                    UserContextData.importance_score,
+                    ContextEmbedding.vector
+                ).join(
+                    ContextEmbedding,
+                    (ContextEmbedding.context_id == UserContextData.id) & (ContextEmbedding.model == self.embedder.model)
+                ).where(UserContextData.user_id == user_id)
+            )).all()
+        finally:
+            loading[0] -= 1
+            if loading[0] == 0:
+                del self._loading[user_id]
+
+        if not rows and not loading[1]:
+            return None
+        index = self._indexes.get(user_id)  # 같은 사용자를 동시에 로딩한 다른 요청이 먼저 올렸으면 그대로 사용
+        if index is not None:
+            return index
+
+        dim = len(rows[0].vector) // 4 if rows else loading[1][0][1].shape[1]
+        index = UserVectorIndex(dim, capacity=len(rows) + sum(len(ids) for ids, _, _ in loading[1]))
+        if rows:
+            index.add(
+                np.asarray([row.id for row in rows], dtype=np.int64),
+                np.vstack([np.frombuffer(row.vector, dtype=np.float32) for row in rows]),
+                np.asarray([row.importance_score or 1 for row in rows], dtype=np.float32)
+            )
+        # 읽는 동안 저장된 임베딩 중 조회 결과에 없는 것 추가
+        for ids, vectors, importance in loading[1]:
+            ids = np.asarray(ids, dtype=np.int64)
+            new = ~np.isin(ids, index.ids[:index.size])
+            if new.any() and vectors.shape[1] == dim:
+                index.add(ids[new], vectors[new], np.asarray(importance, dtype=np.float32)[new])
+        self._indexes[user_id] = index
+        self._evict()
+        return index
+
+    async def search(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        query: str,
+        k: int,
+        candidate_ids: Optional[List[int]] = None
+    ) -> Optional[List["UserContextData"]]:
+        """질문과 관련도가 높은 컨텍스트 데이터 top-k (찾은 항목이 없으면 None)"""
+        index = await self.load_index(db, user_id)
+        if index is None or index.size == 0:
+            return None
+
+        query_vector = (await self._embed([query]))[0]
+        if query_vector.shape[0] != index.dim:
+            # 임베딩 모델이 바뀐 경우 다음 요청에서 다시 로딩
+            self.invalidate(user_id)
+            return None
+
+        ids = index.search(query_vector, k, settings.CONTEXT_IMPORTANCE_WEIGHT, candidate_ids)
+        if not ids:
+            return None
+        entries = (await db.scalars(select(UserContextData).where(UserContextData.id.in_(ids)))).all()
+        by_id = {entry.id: entry for entry in entries}
+        return [by_id[i] for i in ids if i in by_id]
+
+context_retriever = ContextRetriever(AiApiEmbedder(), settings.CONTEXT_INDEX_MAX_VECTORS)
+
+class ContextEmbeddingQueue:
+    """컨텍스트 데이터 임베딩 백그라운드 계산 큐
+
+    일기 작성/가져오기는 새 컨텍스트 데이터 id를 넣기만 하고, 백그라운드 작업이 batch_size개씩
+    임베딩을 계산/저장한 뒤 로딩된 인덱스에 반영합니다 (채팅 요청은 임베딩 계산을 기다리지 않음).
+    시작할 때는 임베딩이 없는 기존 행(이전 실행에서 못 끝낸 큐 포함)부터 채웁니다.
+    """
+
+    def __init__(self, retriever: ContextRetriever, batch_size: int, max_retries: int = 3):
+        self.retriever = retriever
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._backfilled: Optional[asyncio.Event] = None
+        self.enqueued = 0
+        self.embedded = 0
+        self.batches = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._backfilled = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """남은 항목은 다음 시작 때 임베딩이 없는 행으로 다시 찾으므로 기다리지 않고 종료"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def enqueue(self, context_ids: List[int]):
+        if self._queue is None or not context_ids:
+            return
+        for start in range(0, len(context_ids), self.batch_size):
+            self._queue.put_nowait(context_ids[start:start + self.batch_size])
+        self.enqueued += len(context_ids)
+
+    async def join(self):
+        """시작 시 백필과 지금까지 넣은 항목을 모두 처리할 때까지 대기 (테스트/스크립트용)"""
+        if self._queue is not None:
+            await self._backfilled.wait()
+            await self._queue.join()
+
+    async def _run(self):
+        try:
+            await self._embed_missing()
+        except Exception as e:
+            print(f"❌ 컨텍스트 임베딩 백필 실패: {e}")
+        self._backfilled.set()
+        while True:
+            context_ids = await self._queue.get()
+            try:
+                await self._embed_batch(context_ids)
+            finally:
+                self._queue.task_done()
+
+    async def _embed_missing(self):
+        """임베딩이 없는 기존 행을 id 순서로 batch_size개씩 계산"""
+        last_id = 0
+        while True:
+            async with SessionLocal() as db:
+                context_ids = (await db.scalars(
+                    self._missing_query().where(UserContextData.id > last_id)
+                    .order_by(UserContextData.id).limit(self.batch_size)
+                )).all()
+            if not context_ids:
+                return
+            await self._embed_batch(list(context_ids))
+            last_id = context_ids[-1]
+
+    def _missing_query(self):
+        return select(UserContextData.id).outerjoin(
+            ContextEmbedding,
+            (ContextEmbedding.context_id == UserContextData.id) & (ContextEmbedding.model == self.retriever.embedder.model)
+        ).where(ContextEmbedding.context_id == None)
+
+    async def _embed_batch(self, context_ids: List[int]):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                async with SessionLocal() as db:
+                    # 그 사이 다른 프로세스가 저장한 행은 건너뜀
+                    entries = (await db.execute(
+                        select(
+                            UserContextData.id, UserContextData.user_id, UserContextData.title,
+                            UserContextData.content, UserContextData.importance_score
+                        ).where(UserContextData.id.in_(self._missing_query().where(UserContextData.id.in_(context_ids))))
+                    )).all()
+                    if not entries:
+                        return
+                    vectors = await self.retriever._embed([self.retriever._entry_text(e.title, e.content) for e in entries])
+                    await self.retriever._store(db, entries, vectors)
+                break
+            except Exception as e:
+                print(f"❌ 컨텍스트 임베딩 계산 실패 ({attempt}/{self.max_retries}): {e}")
+                if attempt == self.max_retries:
+                    self.failed += len(context_ids)
+                    return
+                await asyncio.sleep(attempt)
+
+        by_user: Dict[int, List[int]] = {}
+        for position, entry in enumerate(entries):
+            by_user.setdefault(entry.user_id, []).append(position)
+        for user_id, positions in by_user.items():
+            self.retriever.add_vectors(
+                user_id,
+                [entries[i].id for i in positions],
+                vectors[positions],
+                [entries[i].importance_score or 1 for i in positions]
+            )
+        self.embedded += len(entries)
+        self.batches += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued_batches": self._queue.qsize() if self._queue else 0,
+            "batch_size": self.batch_size,
+            "enqueued": self.enqueued,
+            "embedded": self.embedded,
+            "batches": self.batches,
+            "failed": self.failed
+        }
+
+context_embedding_queue = ContextEmbeddingQueue(context_retriever, settings.EMBEDDING_BATCH_SIZE)
+
+async def build_user_context(db: AsyncSession, user_id: int, query: Optional[str] = None) -> str:
+    """사용자의 컨텍스트 데이터(일기 등)를 프롬프트용 문자열로 변환
+
+    질문이 주어지면 전문 검색으로 키워드 후보를 먼저 추린 뒤 임베딩 유사도로 다시 순위를
+    매깁니다. 검색을 쓸 수 없으면 중요도/최신순 상위 항목으로 대체합니다.
+    """
+    context_data = None
+    candidate_ids = None
+    if query and settings.CONTEXT_KEYWORD_RECALL:
+        try:
+            candidate_ids = await keyword_recall_context_ids(db, user_id, query) or None
+        except Exception as e:
+            print(f"⚠️ 키워드 후보 검색 실패: {e}")
+    
+    if query and settings.SEMANTIC_CONTEXT_ENABLED:
+        try:
+            context_data = await context_retriever.search(
+                db, user_id, query, settings.CONTEXT_TOP_K, candidate_ids
+            )
+        except Exception as e:
+            print(f"⚠️ 의미 기반 컨텍스트 검색 실패, 기본 정렬 사용: {e}")
+            await db.rollback()
+    
+    if context_data is None and candidate_ids:
+        top_ids = candidate_ids[:settings.CONTEXT_TOP_K]
+        by_id = {
+            entry.id: entry
+            for entry in (await db.scalars(select(UserContextData).where(UserContextData.id.in_(top_ids)))).all()
+        }
+        context_data = [by_id[i] for i in top_ids if i in by_id]
+    
+    if context_data is None:
+        context_data = (await db.scalars(
+            select(UserContextData).where(
+                UserContextData.user_id == user_id
+            ).order_by(UserContextData.importance_score.desc(), UserContextData.created_at.desc()).limit(settings.CONTEXT_TOP_K)
+        )).all()
+    
+    if not context_data:
+        print("📚 사용자 컨텍스트 데이터 없음")
+        return ""
+    
+    print(f"📚 사용자 컨텍스트 데이터 {len(context_data)}개 발견")
+    context_text = "\n".join([
+        f"[{data.data_type}] {data.title or ''}: {data.content[:200]}..."
+        for data in context_data
+    ])
+    print(f"📝 컨텍스트 요약: {context_text[:200]}...")
+    return context_text
+
+# 대화 메모리 (세션별 최근 대화 창, 토큰 예산으로 자르고 LRU로 세션 제거)
+HANGUL_RE = re.compile(r"[가-힣]")
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 토큰 수 추정 (한글은 음절당 1, 그 외는 4글자당 1, 메시지당 고정 4)"""
+    hangul = len(HANGUL_RE.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4 + 4
+
+class SessionWindow:
+    """한 세션의 최근 대화 (오래된 순), 토큰 예산/최대 턴 수를 넘으면 앞에서부터 제거"""
+
+    def __init__(self, token_budget: int, max_turns: int):
+        self.token_budget = token_budget
+        self.max_turns = max_turns
+        self.turns: "deque[tuple]" = deque()
+        self.tokens = 0
+
+    def append(self, role: str, content: str):
+        tokens = estimate_tokens(content)
+        self.turns.append((role, content, tokens))
+        self.tokens += tokens
+        while self.turns and (self.tokens > self.token_budget or len(self.turns) > self.max_turns):
+            _, _, dropped = self.turns.popleft()
+            self.tokens -= dropped
+
+    def messages(self) -> List[Dict[str, str]]:
+        turns = list(self.turns)
+        # 잘린 대화가 AI 답변으로 시작하지 않도록 맞춤
+        while turns and turns[0][0] != "user":
+            turns.pop(0)
+        return [{"role": role, "content": content} for role, content, _ in turns]
+
+class SessionMemory:
+    """세션별 대화 창 캐시 - 없으면 ChatLog에서 최근 대화를 읽어 채움"""
+
+    def __init__(self, token_budget: int, max_turns: int, max_sessions: int):
+        self.token_budget = token_budget
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self._windows: "OrderedDict[tuple, SessionWindow]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def _hydrate(self, db: AsyncSession, user_id: int, session_id: str) -> SessionWindow:
+        # 아직 저장되지 않은 대화 (write-behind, 조회 중 저장된 행이 빠지지 않도록 먼저 가져옴)
+        pending = chat_log_writer.pending(user_id, session_id)
+        rows = (await db.execute(
+            select(ChatLog.id, ChatLog.role, ChatLog.message).where(
+                ChatLog.session_id == session_id,
+                ChatLog.user_id == user_id
+            ).order_by(ChatLog.id.desc()).limit(self.max_turns)
+        )).all()
+        window = SessionWindow(self.token_budget, self.max_turns)
+        for row in reversed(rows):
+            window.append(row.role, row.message)
+        row_ids = {row.id for row in rows}
+        for log, _ in pending:
+            if log.id is None or log.id not in row_ids:
+                window.append(log.role, log.message)
+        return window
+
+    async def history(self, db: AsyncSession, user_id: int, session_id: str) -> List[Dict[str, str]]:
+        """AI에 함께 보낼 이전 대화 (토큰 예산 이내, 오래된 순)"""
+        key = (user_id, session_id)
+        window = self._windows.get(key)
+        if window is not None:
+            self.hits += 1
+            self._windows.move_to_end(key)
+            return window.messages()
+        
+        self.misses += 1
+        window = await self._hydrate(db, user_id, session_id)
+        self._windows[key] = window
+        while len(self._windows) > self.max_sessions:
+            self._windows.popitem(last=False)
+        return window.messages()
+
+    def append(self, user_id: int, session_id: str, turns: List[tuple]):
+        """저장된 대화를 캐시된 창에 반영 (캐시에 없으면 다음 조회 때 DB에서 읽음)"""
+        window = self._windows.get((user_id, session_id))
+        if window is None:
+            return
+        for role, content in turns:
+            window.append(role, content)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._windows),
+            "max_sessions": self.max_sessions,
+            "token_budget": self.token_budget,
+            "cached_tokens": sum(window.tokens for window in self._windows.values()),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+session_memory = SessionMemory(
+    token_budget=settings.SESSION_MEMORY_TOKEN_BUDGET,
+    max_turns=settings.SESSION_MEMORY_MAX_TURNS,
+    max_sessions=settings.SESSION_MEMORY_MAX_SESSIONS
+)
+
+async def load_session_history(db: AsyncSession, user_id: int, session_id: str) -> List[Dict[str, str]]:
+    if not settings.SESSION_MEMORY_ENABLED:
+        return []
+    try:
+        return await session_memory.history(db, user_id, session_id)
+    except Exception as e:
+        print(f"⚠️ 이전 대화 조회 실패: {e}")
+        return []
+
+# 채팅 세션 목록 (chat_sessions 읽기 모델)
+def one_line(text: str, limit: int) -> str:
+    """공백을 정리한 한 줄 요약"""
+    return " ".join(text.split())[:limit]
+
+def chat_session_upsert(dialect: str, replace: bool = False):
+    """chat_sessions upsert 문
+
+    replace=False: 새 턴을 더함 (메시지 수 누적, 마지막 메시지 갱신, 제목/시작 시각 유지)
+    replace=True: 백필 결과로 행 전체를 덮어씀
+    """
+    table = ChatSession.__table__
+    insert_fn = postgresql_insert if dialect == "postgresql" else sqlite_insert
+    statement = insert_fn(table)
+    excluded = statement.excluded
+    if replace:
+        updates = {
+            "title": excluded.title,
+            "message_count": excluded.message_count,
+            "first_message_at": excluded.first_message_at,
+            "last_message_at": excluded.last_message_at,
+            "last_message_preview": excluded.last_message_preview
+        }
+    else:
+        updates = {
+            "message_count": table.c.message_count + excluded.message_count,
+            "last_message_at": excluded.last_message_at,
+            "last_message_preview": excluded.last_message_preview
+        }
+    return statement.on_conflict_do_update(index_elements=["user_id", "session_id"], set_=updates)
+
+class PendingChatTurn:
+    """저장할 질문/응답 한 쌍 (ChatLog 객체는 저장되면 id가 채워짐)"""
+
+    def __init__(self, user_id: int, session_id: str, user_message: str, ai_message: str):
+        self.user_id = user_id
+        self.session_id = session_id
+        self.queued_at = datetime.now(timezone.utc)
+        self.logs = [
+            ChatLog(user_id=user_id, session_id=session_id, role="user", message=user_message),
+            ChatLog(user_id=user_id, session_id=session_id, role="assistant", message=ai_message)
+        ]
+
+async def write_chat_turns(db: AsyncSession, turns: List[PendingChatTurn]):
+    """ChatLog 행과 세션 요약 upsert를 현재 트랜잭션에 추가 (커밋은 호출한 쪽에서)"""
+    db.add_all([log for turn in turns for log in turn.logs])
+    await db.flush()
+    
+    # 같은 세션의 턴은 한 행으로 합쳐서 upsert
+    sessions: Dict[tuple, Dict[str, Any]] = {}
+    for turn in turns:
+        user_log, ai_log = turn.logs
+        row = sessions.get((turn.user_id, turn.session_id))
+        if row is None:
+            sessions[(turn.user_id, turn.session_id)] = {
+                "user_id": turn.user_id,
+                "session_id": turn.session_id,
+                "title": one_line(user_log.message, settings.CHAT_SESSION_TITLE_CHARS),
+                "message_count": 2,
+                "first_message_at": turn.queued_at,
+                "last_message_at": turn.queued_at,
+                "last_message_preview": one_line(ai_log.message, settings.CHAT_SESSION_PREVIEW_CHARS)
+            }
+        else:
+            row["message_count"] += 2
+            row["last_message_at"] = turn.queued_at
+            row["last_message_preview"] = one_line(ai_log.message, settings.CHAT_SESSION_PREVIEW_CHARS)
+    await db.execute(chat_session_upsert(engine.dialect.name), list(sessions.values()))
+
+class ChatLogWriter:
+    """채팅 로그 write-behind 큐
+
+    요청 경로에서는 턴을 큐에 넣기만 하고, 백그라운드 작업이 배치 크기만큼 모이거나
+    첫 턴 이후 flush_interval이 지나면 한 트랜잭션으로 모아서 저장합니다.
+    큐가 가득 차면 enqueue가 자리가 날 때까지 기다리고(back-pressure),
+    저장 전인 턴은 pending()으로 조회할 수 있습니다.
+    """
+
+    def __init__(self, max_pending: int, batch_size: int, flush_interval: float, max_retries: int = 3):
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, List[PendingChatTurn]] = {}
+        self.enqueued = 0
+        self.flushed = 0
+        self.batches = 0
+        self.backpressure_waits = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """남은 턴을 모두 저장하고 종료"""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def enqueue(self, turn: PendingChatTurn):
+        if self._queue.full():
+            self.backpressure_waits += 1
+        await self._queue.put(turn)
+        self._pending.setdefault(turn.user_id, []).append(turn)
+        self.enqueued += 1
+
+    def pending(self, user_id: int, session_id: Optional[str] = None) -> List[tuple]:
+        """저장 대기 중인 (ChatLog, 큐에 넣은 시각) 목록 (오래된 순)
+
+        DB 조회 전에 가져온 뒤, 그 사이 저장되어 id가 채워진 행은 조회 결과와 id로 중복을 제거합니다.
+        """
+        return [
+            (log, turn.queued_at)
+            for turn in self._pending.get(user_id, [])
+            if session_id is None or turn.session_id == session_id
+            for log in turn.logs
+        ]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            turn = await self._queue.get()
+            if turn is None:
+                break
+            batch = [turn]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    turn = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        turn = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if turn is None:
+                    closing = True
+                    break
+                batch.append(turn)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[PendingChatTurn]):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                async with SessionLocal() as db:
+                    await write_chat_turns(db, batch)
+                    await db.commit()
+                self.flushed += len(batch)
+                self.batches += 1
+                break
+            except Exception as e:
+                print(f"❌ 채팅 로그 일괄 저장 실패 ({attempt}/{self.max_retries}): {e}")
+                for turn in batch:
+                    for log in turn.logs:
+                        log.id = None
+                if attempt == self.max_retries:
+                    self.dropped += len(batch)
+                else:
+                    await asyncio.sleep(self.flush_interval * attempt)
+        
+        for turn in batch:
+            turns = self._pending.get(turn.user_id, [])
+            if turn in turns:
+                turns.remove(turn)
+            if not turns:
+                self._pending.pop(turn.user_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_pending": self.max_pending,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "backpressure_waits": self.backpressure_waits,
+            "dropped": self.dropped
+        }
+
+chat_log_writer = ChatLogWriter(
+    max_pending=settings.CHAT_LOG_QUEUE_SIZE,
+    batch_size=settings.CHAT_LOG_FLUSH_BATCH,
+    flush_interval=settings.CHAT_LOG_FLUSH_INTERVAL
+)
+
+async def save_chat_turn(db: AsyncSession, user_id: int, session_id: str, user_message: str, ai_message: str):
+    """질문/응답을 ChatLog와 세션 요약에 저장하고 대화 메모리에 반영
+
+    write-behind가 켜져 있으면 큐에 넣고 바로 반환, 아니면 한 트랜잭션으로 바로 저장합니다.
+    """
+    turn = PendingChatTurn(user_id, session_id, user_message, ai_message)
+    if chat_log_writer.running:
+        await chat_log_writer.enqueue(turn)
+    else:
+        await write_chat_turns(db, [turn])
+        await db.commit()
+    session_memory.append(user_id, session_id, [("user", user_message), ("assistant", ai_message)])
+
+# 키셋(커서) 페이지네이션 - (시각, id) 기준으로 마지막 행 다음부터 인덱스 범위 조회
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def keyset_datetime(value: datetime):
+    """커서 시각을 비교용 파라미터로 변환
+
+    SQLite는 DATETIME을 문자열로 비교하므로 server_default(CURRENT_TIMESTAMP)가
+    저장하는 형식과 같게 맞춰야 같은 시각의 행이 정확히 비교됩니다.
+    """
+    if engine.dialect.name == "sqlite":
+        return literal(value.strftime("%Y-%m-%d %H:%M:%S.%f" if value.microsecond else "%Y-%m-%d %H:%M:%S"))
+    return value
+
 # FastAPI 앱 생성
 app = FastAPI(
     title="오터스 LLM Link Service",
@@ -230,23 +1646,107 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "llmlink"}
 
+@app.get("/health/http-pool")
+async def http_pool_stats():
+    return http_clients.stats()
+
+@app.get("/health/session-memory")
+async def session_memory_stats():
+    return session_memory.stats()
+
+@app.get("/health/user-cache")
+async def user_cache_stats():
+    return user_cache.stats()
+
+@app.get("/health/chat-log-writer")
+async def chat_log_writer_stats():
+    return chat_log_writer.stats()
+
+@app.get("/health/context-embeddings")
+async def context_embedding_stats():
+    return context_embedding_queue.stats()
+
+@app.on_event("startup")
+async def startup_event():
+    http_clients.register(
+        "ai_api",
+        base_url=settings.LOCAL_OLLAMA_URL,
+        timeout=httpx.Timeout(settings.AI_API_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+        limits=build_http_limits()
+    )
+    http_clients.register(
+        "google",
+        timeout=httpx.Timeout(settings.GOOGLE_API_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+        limits=build_http_limits()
+    )
+    if settings.CHAT_LOG_WRITE_BEHIND:
+        chat_log_writer.start()
+    if settings.SEMANTIC_CONTEXT_ENABLED:
+        context_embedding_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await context_embedding_queue.close()
+    await chat_log_writer.close()
+    await http_clients.close()
+
 # 인증 엔드포인트
+INTERNAL_AUTH_ISSUER = "gateway-googleauth"
+INTERNAL_AUTH_AUDIENCE = "llmlink"
+
+async def issue_tokens_for_google_user(db: AsyncSession, google_uid: str, email: str, name: str) -> TokenResponse:
+    """구글 사용자 조회/생성 후 토큰 발급"""
+    user = await db.scalar(select(User).where(User.google_uid == google_uid))
+    if not user:
+        user = User(
+            google_uid=google_uid,
+            email=email,
+            name=name
+        )
+        db.add(user)
+        try:
+            await db.commit()
+            await db.refresh(user)
+        except IntegrityError:
+            # 같은 사용자의 첫 로그인이 동시에 들어온 경우 먼저 생성된 사용자 사용
+            await db.rollback()
+            user = await db.scalar(select(User).where(User.google_uid == google_uid))
+    elif (user.email, user.name) != (email, name):
+        # 구글 계정 정보가 바뀐 경우 갱신 (새 토큰 클레임에 반영)
+        user.email = email
+        user.name = name
+        await db.commit()
+        user_cache.invalidate(user.id)
+    
+    access_token = create_access_token(
+        data=identity_claims(user)
+    )
+    refresh_token = create_refresh_token(
+        data={"user_id": user.id}
+    )
+    
+    return TokenResponse(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        token_type="bearer"
+    )
+
 @app.post("/api/auth/google", response_model=TokenResponse)
-async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db)):
+async def google_auth(request: GoogleAuthRequest, db: AsyncSession = Depends(get_db)):
     """Google OAuth2 인증 처리"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://www.googleapis.com/oauth2/v2/userinfo?access_token={request.access_token}"
+        response = await http_clients.get("google").get(
+            settings.GOOGLE_USERINFO_URL,
+            params={"access_token": request.access_token}
+        )
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid Google token"
             )
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid Google token"
-                )
-            
-            google_user = response.json()
-            
+        
+        google_user = response.json()
+        
         google_uid = google_user.get("id")
         email = google_user.get("email")
         name = google_user.get("name")
@@ -257,36 +1757,53 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
                 detail="Missing required user information"
             )
         
-        user = db.query(User).filter(User.google_uid == google_uid).first()
-        if not user:
-            user = User(
-                google_uid=google_uid,
-                email=email,
-                name=name
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-        
-        access_token = create_access_token(
-            data={"user_id": user.id, "email": user.email}
-        )
-        refresh_token = create_refresh_token(
-            data={"user_id": user.id}
-        )
-        
-        return TokenResponse(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            token_type="bearer"
-        )
+        return await issue_tokens_for_google_user(db, google_uid, email, name)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Authentication failed: {str(e)}"
         )
 
+@app.post("/api/auth/internal/google", response_model=TokenResponse)
+async def internal_google_auth(request: InternalGoogleAuthRequest, db: AsyncSession = Depends(get_db)):
+    """게이트웨이가 이미 검증한 구글 사용자로 토큰 발급 (구글 API를 다시 호출하지 않음)
+
+    assertion은 INTERNAL_AUTH_SECRET으로 서명된 짧은 만료의 JWT이며
+    `sub`(구글 아이디), `email`, `name` 클레임을 담습니다.
+    """
+    if not settings.INTERNAL_AUTH_SECRET:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Internal auth is disabled"
+        )
+    
+    try:
+        claims = jwt.decode(
+            request.assertion,
+            settings.INTERNAL_AUTH_SECRET,
+            algorithms=["HS256"],
+            audience=INTERNAL_AUTH_AUDIENCE,
+            issuer=INTERNAL_AUTH_ISSUER,
+            options={"require": ["exp", "iat", "sub"]}
+        )
+    except InvalidTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid internal assertion"
+        )
+    
+    google_uid, email, name = claims.get("sub"), claims.get("email"), claims.get("name")
+    if not all([google_uid, email, name]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Missing required user information"
+        )
+    
+    return await issue_tokens_for_google_user(db, google_uid, email, name)
+
 @app.post("/api/auth/refresh", response_model=TokenResponse)
 async def refresh_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """리프레시 토큰으로 새 액세스 토큰 발급"""
@@ -306,8 +1823,15 @@ async def refresh_token(credentials: HTTPAuthorizationCredentials = Depends(secu
             detail="Invalid token payload"
         )
     
+    user = await user_cache.get(user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    
     new_access_token = create_access_token(
-        data={"user_id": user_id}
+        data=identity_claims(user)
     )
     
     return TokenResponse(
@@ -317,21 +1841,9 @@ async def refresh_token(credentials: HTTPAuthorizationCredentials = Depends(secu
     )
 
 @app.get("/api/auth/me")
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
-    """현재 사용자 정보 조회"""
-    token = credentials.credentials
-    user_id = get_user_id_from_token(token)
-    
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
-    
-    user = db.query(User).filter(User.id == user_id).first()
+async def get_current_user(current_user: AuthUser = Depends(get_auth_user)):
+    """현재 사용자 정보 조회 (사용자 캐시에서 조회)"""
+    user = await user_cache.get(current_user.id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -346,41 +1858,13 @@ async def get_current_user(
     }
 
 # 일기 엔드포인트
-@app.post("/api/diary", response_model=DiaryResponse)
-async def create_diary(
-    diary: DiaryCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
-    """일기 작성"""
-    token = credentials.credentials
-    user_id = get_user_id_from_token(token)
-    
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
-    
-    # 사용자 정보 가져오기
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
+def diary_rows(user_id: int, google_uid: str, diary: DiaryCreate) -> Tuple[DiaryEntry, UserContextData]:
+    """일기 행과 AI가 참조할 수 있도록 함께 저장하는 컨텍스트 데이터 행"""
     diary_entry = DiaryEntry(
-        account_id=user.google_uid,  # 구글 아이디
-        diary=diary.diary,           # 사용자가 입력한 일기/일정
-        date=diary.date              # 입력한 날짜/시간
+        account_id=google_uid,  # 구글 아이디
+        diary=diary.diary,      # 사용자가 입력한 일기/일정
+        date=diary.date         # 입력한 날짜/시간
     )
-    
-    db.add(diary_entry)
-    db.commit()
-    db.refresh(diary_entry)
-    
-    # 일기를 컨텍스트 데이터에도 저장 (AI가 참조할 수 있도록)
     context_data = UserContextData(
         user_id=user_id,
         data_type="diary",
@@ -389,9 +1873,151 @@ async def create_diary(
         tags="일기,개인기록",
         importance_score=3
     )
+    return diary_entry, context_data
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """JSON 배열 본문을 전체를 메모리에 올리지 않고 항목 단위로 파싱"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+    pending = b""
+    async for chunk in chunks:
+        try:
+            buffer += (pending + chunk).decode()
+            pending = b""
+        except UnicodeDecodeError:
+            # 청크 경계에서 잘린 멀티바이트 문자는 다음 청크와 합쳐서 디코딩
+            pending += chunk
+            continue
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position == len(buffer):
+                break
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError("JSON 배열이 아닙니다")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # 항목이 다음 청크까지 이어짐
+            yield item
+        buffer = buffer[position:]
+    if pending or buffer.strip() or not started:
+        raise ValueError("JSON 배열이 끝나지 않았습니다")
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """NDJSON 본문을 줄 단위로 파싱 (잘못된 줄은 예외 객체를 그대로 넘김)"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    yield e
+    if buffer.strip():
+        try:
+            yield json.loads(buffer)
+        except ValueError as e:
+            yield e
+
+@app.post("/api/diary/import", response_model=DiaryImportResponse)
+async def import_diaries(
+    request: Request,
+    current_user: AuthUser = Depends(get_auth_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """일기 일괄 가져오기
+
+    본문은 `[{"diary": ..., "date": ...}, ...]` JSON 배열 또는
+    `Content-Type: application/x-ndjson`인 한 줄에 하나씩의 JSON입니다.
+    스트리밍으로 읽으면서 DIARY_IMPORT_BATCH_SIZE개씩 한 트랜잭션으로 저장하고,
+    형식이 잘못된 행은 건너뛰고 행 번호와 함께 오류로 보고합니다.
+    """
+    user_id = current_user.id
+    
+    google_uid = current_user.google_uid
+    
+    imported = 0
+    errors: List[DiaryImportError] = []
+    batch: List[Tuple[int, DiaryCreate]] = []
+    
+    def add_error(index: int, message: str):
+        errors.append(DiaryImportError(index=index, error=message))
+    
+    async def flush():
+        nonlocal imported
+        rows = [row for _, diary in batch for row in diary_rows(user_id, google_uid, diary)]
+        try:
+            db.add_all(rows)
+            await db.commit()
+            imported += len(batch)
+            # 저장된 컨텍스트 행의 임베딩은 백그라운드 큐에서 배치로 계산
+            context_embedding_queue.enqueue([row.id for row in rows if isinstance(row, UserContextData)])
+        except Exception as e:
+            await db.rollback()
+            for index, _ in batch:
+                add_error(index, f"저장 실패: {e}")
+        db.expunge_all()
+        batch.clear()
+    
+    content_type = request.headers.get("content-type", "")
+    ndjson = "ndjson" in content_type
+    items = iter_ndjson(request.stream()) if ndjson else iter_json_array(request.stream())
+    index = 0
+    try:
+        async for item in items:
+            if isinstance(item, Exception):
+                add_error(index, f"JSON 파싱 실패: {item}")
+            else:
+                try:
+                    batch.append((index, DiaryCreate.model_validate(item)))
+                except ValidationError as e:
+                    add_error(index, "; ".join(
+                        f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors()
+                    ))
+            index += 1
+            if len(batch) >= settings.DIARY_IMPORT_BATCH_SIZE:
+                await flush()
+    except ValueError as e:
+        # JSON 배열 자체가 깨진 경우 그 지점에서 중단 (앞에서 저장한 배치는 유지)
+        add_error(index, f"JSON 파싱 실패: {e}")
+    if batch:
+        await flush()
+    
+    return DiaryImportResponse(
+        imported=imported,
+        failed=len(errors),
+        errors=errors[:settings.DIARY_IMPORT_MAX_ERRORS]
+    )
+
+@app.post("/api/diary", response_model=DiaryResponse)
+async def create_diary(
+    diary: DiaryCreate,
+    current_user: AuthUser = Depends(get_auth_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """일기 작성"""
+    user_id = current_user.id
+    
+    google_uid = current_user.google_uid
     
-    db.add(context_data)
-    db.commit()
+    # 일기와 AI 참조용 컨텍스트 데이터를 한 트랜잭션으로 저장
+    diary_entry, context_data = diary_rows(user_id, google_uid, diary)
+    db.add_all([diary_entry, context_data])
+    await db.commit()
+    
+    # AI 컨텍스트 검색용 임베딩은 백그라운드에서 계산
+    context_embedding_queue.enqueue([context_data.id])
     
     return DiaryResponse(
         id=diary_entry.id,
@@ -400,160 +2026,457 @@ async def create_diary(
         date=diary_entry.date
     )
 
-@app.get("/api/diary", response_model=List[DiaryResponse])
+@app.get("/api/diary", response_model=DiaryListResponse)
 async def get_diaries(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    limit: int = Query(30, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    start: Optional[datetime] = Query(None, description="이 시각 이후 일기 (포함)"),
+    end: Optional[datetime] = Query(None, description="이 시각 이전 일기 (미포함)"),
+    summary: bool = Query(False, description="본문 대신 미리보기만 반환"),
+    current_user: AuthUser = Depends(get_auth_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """사용자의 일기 목록 조회"""
-    token = credentials.credentials
-    user_id = get_user_id_from_token(token)
-    
-    if not user_id:
+    """사용자의 일기 목록 조회 (최신순, 키셋 페이지네이션)
+
+    `start`/`end`로 기간(월/캘린더 보기)을 지정할 수 있고, `summary=true`이면
+    전체 본문을 읽지 않고 앞부분 미리보기만 반환합니다.
+    """
+    if start and end and start >= end:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start는 end보다 이전이어야 합니다"
         )
     
-    diaries = db.query(DiaryEntry).filter(DiaryEntry.user_id == user_id).order_by(DiaryEntry.created_at.desc()).all()
+    google_uid = current_user.google_uid
     
-    return [
-        DiaryResponse(
-            id=diary.id,
-            title=diary.title,
-            content=diary.content,
-            created_at=diary.created_at
+    # 미리보기보다 한 글자 더 읽어서 잘렸는지 판단
+    preview_chars = settings.DIARY_PREVIEW_CHARS
+    body = func.substr(DiaryEntry.diary, 1, preview_chars + 1) if summary else DiaryEntry.diary
+    query = select(
+        DiaryEntry.id, DiaryEntry.account_id, DiaryEntry.date, body.label("body")
+    ).where(DiaryEntry.account_id == google_uid)
+    if start:
+        query = query.where(DiaryEntry.date >= start)
+    if end:
+        query = query.where(DiaryEntry.date < end)
+    if cursor:
+        date, row_id = decode_cursor(cursor)
+        query = query.where(tuple_(DiaryEntry.date, DiaryEntry.id) < tuple_(date, row_id))
+    query = query.order_by(DiaryEntry.date.desc(), DiaryEntry.id.desc())
+    
+    # 다음 페이지 존재 여부 확인을 위해 하나 더 조회
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    diaries = [
+        DiaryListItem(
+            id=row.id,
+            account_id=row.account_id,
+            date=row.date,
+            diary=None if summary else row.body,
+            preview=row.body[:preview_chars],
+            truncated=len(row.body) > preview_chars
         )
-        for diary in diaries
+        for row in rows
     ]
+    return DiaryListResponse(
+        diaries=diaries,
+        limit=limit,
+        has_more=has_more,
+        next_cursor=encode_cursor(rows[-1].date, rows[-1].id) if has_more else None
+    )
+
+@app.get("/api/diary/{diary_id}", response_model=DiaryResponse)
+async def get_diary(
+    diary_id: int,
+    current_user: AuthUser = Depends(get_auth_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """일기 한 개 조회 (요약 목록에서 전체 본문 열기)"""
+    diary = await db.scalar(
+        select(DiaryEntry).where(DiaryEntry.id == diary_id, DiaryEntry.account_id == current_user.google_uid)
+    )
+    if not diary:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Diary not found"
+        )
+    
+    return DiaryResponse(
+        id=diary.id,
+        account_id=diary.account_id,
+        diary=diary.diary,
+        date=diary.date
+    )
 
 # 채팅 엔드포인트
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat_with_ai(
     chat_message: ChatMessage,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    current_user: AuthUser = Depends(get_auth_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """AI와 채팅"""
-    token = credentials.credentials
-    user_id = get_user_id_from_token(token)
-    
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
+    user_id = current_user.id
     
     # 세션 ID 생성 (없는 경우)
     session_id = chat_message.session_id or f"session_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     
-    # 사용자 메시지 저장
-    user_chat_log = ChatLog(
-        user_id=user_id,
-        session_id=session_id,
-        role="user",
-        message=chat_message.message
-    )
-    db.add(user_chat_log)
-    
     try:
-        # 사용자의 컨텍스트 데이터(일기 등) 가져오기
-        context_data = db.query(UserContextData).filter(
-            UserContextData.user_id == user_id
-        ).order_by(UserContextData.importance_score.desc(), UserContextData.created_at.desc()).limit(5).all()
-        
-        # 컨텍스트 데이터를 문자열로 변환
-        context_text = ""
-        if context_data:
-            print(f"📚 사용자 컨텍스트 데이터 {len(context_data)}개 발견")
-            context_text = "\n".join([
-                f"[{data.data_type}] {data.title or ''}: {data.content[:200]}..."
-                for data in context_data
-            ])
-            print(f"📝 컨텍스트 요약: {context_text[:200]}...")
-        else:
-            print("📚 사용자 컨텍스트 데이터 없음")
+        # 사용자의 컨텍스트 데이터(일기 등)와 같은 세션의 이전 대화 가져오기
+        context_text = await build_user_context(db, user_id, chat_message.message)
+        history = await load_session_history(db, user_id, session_id)
         
-        # 로컬 Ollama API 호출 (컨텍스트 포함)
-        ai_message = await call_local_ollama_api(chat_message.message, context_text)
+        # 로컬 Ollama API 호출 (컨텍스트, 이전 대화 포함)
+        ai_message = await call_local_ollama_api(chat_message.message, context_text, str(user_id), history)
                 
     except Exception as e:
         ai_message = f"AI 서비스 연결 오류: {str(e)}"
     
-    # AI 응답 저장
-    ai_chat_log = ChatLog(
-        user_id=user_id,
-        session_id=session_id,
-        role="assistant",
-        message=ai_message
-    )
-    db.add(ai_chat_log)
-    db.commit()
+    # 질문/응답 저장 (세션 목록 요약 포함)
+    await save_chat_turn(db, user_id, session_id, chat_message.message, ai_message)
     
     return ChatResponse(
         message=ai_message,
         session_id=session_id
     )
 
-@app.get("/api/chat/history")
+@app.post("/api/chat/stream")
+async def chat_with_ai_stream(
+    chat_message: ChatMessage,
+    current_user: AuthUser = Depends(get_auth_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """AI와 스트리밍 채팅 (Server-Sent Events)
+
+    토큰마다 `data: {"token": ...}` 이벤트를 보내고, 마지막에
+    `data: {"done": true, "message": 전체 응답, "session_id": ...}` 이벤트로 종료합니다.
+    AI 서비스가 실패하면 `data: {"error": 안내 문구, "session_id": ...}` 이벤트로 종료합니다.
+    스트림이 끝나면(클라이언트가 중간에 끊은 경우 포함) 모델이 생성한 부분만 ChatLog에 저장하고,
+    토큰이 나오기 전에 실패했으면 저장하지 않습니다.
+    """
+    user_id = current_user.id
+    
+    # 세션 ID 생성 (없는 경우)
+    session_id = chat_message.session_id or f"session_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    
+    try:
+        context_text = await build_user_context(db, user_id, chat_message.message)
+    except Exception as e:
+        print(f"❌ 컨텍스트 조회 실패: {e}")
+        context_text = ""
+    history = await load_session_history(db, user_id, session_id)
+    
+    async def event_stream():
+        tokens: List[str] = []
+        failed = False
+        try:
+            async for piece in stream_local_ollama_api(chat_message.message, context_text, str(user_id), history):
+                tokens.append(piece)
+                yield f"data: {json.dumps({'token': piece}, ensure_ascii=False)}\n\n"
+            
+            yield "data: " + json.dumps({
+                "done": True,
+                "message": "".join(tokens),
+                "session_id": session_id
+            }, ensure_ascii=False) + "\n\n"
+        except Exception as e:
+            failed = True
+            if isinstance(e, AIServiceError):
+                error_message = e.detail
+            else:
+                print(f"❌ 스트리밍 채팅 실패: {e}")
+                error_message = "죄송합니다. 현재 AI 서비스에 문제가 있습니다."
+            yield f"data: {json.dumps({'error': error_message, 'session_id': session_id}, ensure_ascii=False)}\n\n"
+        finally:
+            # 스트림 응답 중에는 요청 스코프 세션이 이미 닫혔을 수 있으므로 별도 세션 사용.
+            # 클라이언트가 끊으면 이 제너레이터가 취소되므로, 저장은 취소되지 않도록 보호
+            # 토큰이 나오기 전에 실패했으면 저장할 응답이 없음
+            if tokens or not failed:
+                with anyio.CancelScope(shield=True):
+                    try:
+                        async with SessionLocal() as log_db:
+                            await save_chat_turn(log_db, user_id, session_id, chat_message.message, "".join(tokens))
+                    except Exception as e:
+                        print(f"❌ 채팅 로그 저장 실패: {e}")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/chat/history", response_model=ChatHistoryResponse)
 async def get_chat_history(
     session_id: Optional[str] = None,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = Query(None, description="이 커서보다 오래된 메시지"),
+    after: Optional[str] = Query(None, description="이 커서보다 최근 메시지"),
+    current_user: AuthUser = Depends(get_auth_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """채팅 히스토리 조회"""
-    token = credentials.credentials
-    user_id = get_user_id_from_token(token)
+    """채팅 히스토리 조회 (키셋 페이지네이션)
+
+    커서 없이 호출하면 최근 `limit`개(채팅 다시 열기용)를, `before`/`after`를 주면
+    그 커서 앞/뒤 페이지를 반환합니다. 메시지는 항상 오래된 순입니다.
+    """
+    user_id = current_user.id
     
-    if not user_id:
+    if before and after:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="before와 after는 함께 사용할 수 없습니다"
         )
     
-    query = db.query(ChatLog).filter(ChatLog.user_id == user_id)
+    query = select(
+        ChatLog.id, ChatLog.session_id, ChatLog.role, ChatLog.message, ChatLog.created_at
+    ).where(ChatLog.user_id == user_id)
     if session_id:
-        query = query.filter(ChatLog.session_id == session_id)
+        query = query.where(ChatLog.session_id == session_id)
     
-    chat_logs = query.order_by(ChatLog.created_at.asc()).all()
+    # 저장 대기 중인 메시지는 DB 조회보다 먼저 가져와야 그 사이에 저장된 행이 빠지지 않음
+    pending = chat_log_writer.pending(user_id, session_id) if chat_log_writer.running else []
     
-    return [
-        {
-            "id": log.id,
-            "session_id": log.session_id,
-            "role": log.role,
-            "message": log.message,
-            "created_at": log.created_at
-        }
-        for log in chat_logs
+    position = tuple_(ChatLog.created_at, ChatLog.id)
+    if after:
+        created_at, row_id = decode_cursor(after)
+        query = query.where(position > tuple_(keyset_datetime(created_at), row_id))
+        query = query.order_by(ChatLog.created_at.asc(), ChatLog.id.asc())
+    else:
+        if before:
+            created_at, row_id = decode_cursor(before)
+            query = query.where(position < tuple_(keyset_datetime(created_at), row_id))
+        query = query.order_by(ChatLog.created_at.desc(), ChatLog.id.desc())
+    
+    # 다음 페이지 존재 여부 확인을 위해 하나 더 조회
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not after:
+        rows.reverse()
+    
+    messages = [
+        ChatHistoryItem(
+            id=row.id,
+            session_id=row.session_id,
+            role=row.role,
+            message=row.message,
+            created_at=row.created_at
+        )
+        for row in rows
     ]
+    # 가장 최근 페이지면 아직 저장되지 않은 메시지를 뒤에 붙임 (limit에 포함하지 않음)
+    if pending and not (has_more if after else before):
+        row_ids = {row.id for row in rows}
+        messages += [
+            ChatHistoryItem(
+                id=log.id,
+                session_id=log.session_id,
+                role=log.role,
+                message=log.message,
+                created_at=queued_at
+            )
+            for log, queued_at in pending
+            if log.id is None or log.id not in row_ids
+        ]
+    return ChatHistoryResponse(
+        messages=messages,
+        limit=limit,
+        has_older=has_more if not after else True,
+        has_newer=has_more if after else bool(before),
+        older_cursor=encode_cursor(rows[0].created_at, rows[0].id) if rows else None,
+        newer_cursor=encode_cursor(rows[-1].created_at, rows[-1].id) if rows else None
+    )
 
-@app.post("/api/chat/new-session")
-async def create_new_session(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+@app.get("/api/chat/sessions", response_model=ChatSessionListResponse)
+async def get_chat_sessions(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    current_user: AuthUser = Depends(get_auth_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """새로운 채팅 세션 생성"""
-    token = credentials.credentials
-    user_id = get_user_id_from_token(token)
+    """채팅 세션 목록 (최근 대화순, chat_sessions 요약 테이블만 조회)"""
+    user_id = current_user.id
     
-    if not user_id:
+    query = select(ChatSession).where(ChatSession.user_id == user_id)
+    if cursor:
+        last_message_at, row_id = decode_cursor(cursor)
+        query = query.where(tuple_(ChatSession.last_message_at, ChatSession.id) < tuple_(last_message_at, row_id))
+    query = query.order_by(ChatSession.last_message_at.desc(), ChatSession.id.desc())
+    
+    # 다음 페이지 존재 여부 확인을 위해 하나 더 조회
+    rows = (await db.scalars(query.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    sessions = [
+        ChatSessionItem(
+            session_id=row.session_id,
+            title=row.title,
+            message_count=row.message_count,
+            first_message_at=row.first_message_at,
+            last_message_at=row.last_message_at,
+            last_message_preview=row.last_message_preview
+        )
+        for row in rows
+    ]
+    return ChatSessionListResponse(
+        sessions=sessions,
+        limit=limit,
+        has_more=has_more,
+        next_cursor=encode_cursor(rows[-1].last_message_at, rows[-1].id) if has_more else None
+    )
+
+# 검색 엔드포인트
+@app.get("/api/search", response_model=SearchResponse)
+async def search_user_data(
+    q: str = Query(..., min_length=1),
+    sources: Optional[str] = Query(None, description="쉼표로 구분: diary,context,chat"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: AuthUser = Depends(get_auth_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """일기, 컨텍스트 데이터, 채팅 로그 통합 전문 검색 (관련도순, 페이지네이션)"""
+    user_id = current_user.id
+    
+    source_list = [s.strip() for s in sources.split(",") if s.strip()] if sources else None
+    if source_list and any(s not in SEARCH_SOURCES for s in source_list):
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sources는 {', '.join(SEARCH_SOURCES)} 중에서 선택해야 합니다"
         )
     
+    if not await search_index.check_available(db):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Search index is not available"
+        )
+    
+    owners = [search_owner_key(user_id), search_owner_key(google_uid=current_user.google_uid)]
+    
+    # 다음 페이지 존재 여부 확인을 위해 하나 더 조회
+    rows = await search_index.search(db, owners, q, source_list, limit + 1, offset)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    # 원본 행 일괄 조회
+    ids_by_source: Dict[str, List[int]] = {}
+    for row in rows:
+        ids_by_source.setdefault(row.source, []).append(row.source_id)
+    originals: Dict[tuple, Any] = {}
+    for source, model in (("diary", DiaryEntry), ("context", UserContextData), ("chat", ChatLog)):
+        if source in ids_by_source:
+            for obj in (await db.scalars(select(model).where(model.id.in_(ids_by_source[source])))).all():
+                originals[(source, obj.id)] = obj
+    
+    results = []
+    for row in rows:
+        obj = originals.get((row.source, row.source_id))
+        if obj is None:
+            continue
+        if row.source == "diary":
+            body, created_at, session_id = obj.diary, obj.date, None
+        elif row.source == "context":
+            body, created_at, session_id = obj.content, obj.created_at, None
+        else:
+            body, created_at, session_id = obj.message, obj.created_at, obj.session_id
+        results.append(SearchHit(
+            source=row.source,
+            id=row.source_id,
+            score=float(row.score),
+            text=body[:200],
+            created_at=created_at,
+            session_id=session_id
+        ))
+    
+    return SearchResponse(query=q, results=results, limit=limit, offset=offset, has_more=has_more)
+
+@app.post("/api/chat/new-session")
+async def create_new_session(
+    current_user: AuthUser = Depends(get_auth_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """새로운 채팅 세션 생성"""
+    user_id = current_user.id
+    
     session_id = f"session_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     
     return {"session_id": session_id, "message": "새로운 채팅 세션이 시작되었습니다."}
 
 # 데이터베이스 테이블 생성 함수
-def create_tables():
+def create_missing_indexes(conn):
+    """이미 있는 테이블에 나중에 추가된 인덱스 생성 (create_all은 새 테이블의 인덱스만 만듦)"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+async def create_tables():
     """데이터베이스 테이블 생성"""
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_missing_indexes)
+        await conn.run_sync(search_index.create)
+
+async def rebuild_search_index():
+    """기존 일기/컨텍스트/채팅 로그 전체 재색인"""
+    async with SessionLocal() as db:
+        await search_index.rebuild(db)
+
+async def backfill_chat_sessions(batch_size: int = 500):
+    """기존 ChatLog로 chat_sessions 재구성 (사용자 batch_size명씩, 다시 실행해도 같은 결과)"""
+    log, first, last = ChatLog, aliased(ChatLog), aliased(ChatLog)
+    same_session = lambda other: (other.user_id == log.user_id) & (other.session_id == log.session_id)
+    title = select(func.substr(first.message, 1, settings.CHAT_SESSION_TITLE_CHARS * 4)).where(
+        same_session(first), first.role == "user"
+    ).order_by(first.created_at.asc(), first.id.asc()).limit(1).correlate(log).scalar_subquery()
+    preview = select(func.substr(last.message, 1, settings.CHAT_SESSION_PREVIEW_CHARS * 4)).where(
+        same_session(last)
+    ).order_by(last.created_at.desc(), last.id.desc()).limit(1).correlate(log).scalar_subquery()
+    
+    upsert = chat_session_upsert(engine.dialect.name, replace=True)
+    total = 0
+    last_user_id = 0
+    async with SessionLocal() as db:
+        while True:
+            user_ids = (await db.scalars(
+                select(User.id).where(User.id > last_user_id).order_by(User.id).limit(batch_size)
+            )).all()
+            if not user_ids:
+                break
+            rows = (await db.execute(
+                select(
+                    log.user_id, log.session_id,
+                    func.count(log.id).label("message_count"),
+                    func.min(log.created_at).label("first_message_at"),
+                    func.max(log.created_at).label("last_message_at"),
+                    title.label("title"),
+                    preview.label("preview")
+                ).where(log.user_id.in_(user_ids)).group_by(log.user_id, log.session_id)
+            )).all()
+            if rows:
+                await db.execute(upsert, [
+                    {
+                        "user_id": row.user_id,
+                        "session_id": row.session_id,
+                        "title": one_line(row.title, settings.CHAT_SESSION_TITLE_CHARS) if row.title else None,
+                        "message_count": row.message_count,
+                        "first_message_at": row.first_message_at,
+                        "last_message_at": row.last_message_at,
+                        "last_message_preview": one_line(row.preview or "", settings.CHAT_SESSION_PREVIEW_CHARS)
+                    }
+                    for row in rows
+                ])
+            await db.commit()
+            total += len(rows)
+            last_user_id = user_ids[-1]
+            print(f"🔄 채팅 세션 백필 중... 사용자 ID {last_user_id}까지, 세션 {total}개")
+    print(f"✅ 채팅 세션 {total}개 재구성 완료")
 
 # 애플리케이션 시작 시 테이블 생성
 if __name__ == "__main__":
-    create_tables()
+    import asyncio
+    asyncio.run(create_tables())
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
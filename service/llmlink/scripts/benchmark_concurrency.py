@@ -0,0 +1,159 @@
+"""
+동시 요청 처리량 벤치마크
+- 실행 중인 서비스에 같은 요청을 동시에 보내 처리량(req/s)과 지연 시간을 측정
+- 측정하는 동안 가벼운 엔드포인트(/health)를 주기적으로 호출해 이벤트 루프가 막히는 정도도 함께 측정
+
+사용 예:
+    # 1) 벤치마크용 데이터 생성 (llmlink 폴더에서 실행)
+    DATABASE_URL=sqlite:///./bench.db python scripts/benchmark_concurrency.py seed --users 1000 --logs-per-user 200
+
+    # 2) 같은 DB로 서버 실행 후 측정
+    DATABASE_URL=sqlite:///./bench.db uvicorn app.main:app --port 8000
+    python scripts/benchmark_concurrency.py run --token <seed가 출력한 토큰> --path /api/chat/history
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+import httpx
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def format_latencies(name: str, latencies: List[float]) -> str:
+    ms = [value * 1000 for value in latencies]
+    return (
+        f"{name}: p50 {percentile(ms, 50):.1f}ms / p95 {percentile(ms, 95):.1f}ms / "
+        f"p99 {percentile(ms, 99):.1f}ms / max {max(ms, default=0):.1f}ms"
+    )
+
+async def seed(users: int, logs_per_user: int):
+    """사용자와 채팅 로그를 대량으로 생성하고 첫 사용자의 액세스 토큰 출력"""
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+    from app.main import SessionLocal, User, ChatLog, create_tables, create_access_token, identity_claims
+    from datetime import timedelta
+    from sqlalchemy import insert, select
+
+    await create_tables()
+    async with SessionLocal() as db:
+        await db.execute(insert(User), [
+            {"google_uid": f"bench-{i}", "email": f"bench{i}@example.com", "name": f"bench{i}"}
+            for i in range(users)
+        ])
+        await db.commit()
+        first_id = await db.scalar(select(User.id).where(User.google_uid == "bench-0"))
+        # 검색 인덱스 동기화를 거치지 않도록 Core insert로 일괄 입력
+        batch = []
+        for user_offset in range(users):
+            for i in range(logs_per_user):
+                batch.append({
+                    "user_id": first_id + user_offset,
+                    "session_id": f"session_bench_{user_offset}_{i // 20}",
+                    "role": "user" if i % 2 == 0 else "assistant",
+                    "message": f"벤치마크 메시지 {i}"
+                })
+            if len(batch) >= 10000:
+                await db.execute(insert(ChatLog), batch)
+                batch = []
+        if batch:
+            await db.execute(insert(ChatLog), batch)
+        await db.commit()
+        print(f"✅ 사용자 {users}명, 채팅 로그 {users * logs_per_user}개 생성")
+        first_user = await db.get(User, first_id)
+    print(create_access_token(identity_claims(first_user), timedelta(days=1)))
+
+async def run(
+    url: str,
+    token: str,
+    path: str,
+    concurrency: int,
+    requests: int,
+    probe_path: str,
+    probe_interval: float,
+    timeout: float
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    latencies: List[float] = []
+    probe_latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        # 연결 예열
+        await client.get(path, headers=headers)
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path, headers=headers)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        async def probe(stop: asyncio.Event):
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    await client.get(probe_path)
+                except httpx.HTTPError:
+                    pass
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(probe_interval)
+
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+
+    print(f"📊 {path} - 동시 {concurrency}개, 요청 {requests}개, 실패 {errors}개")
+    print(f"   처리량: {requests / elapsed:.1f} req/s ({elapsed:.2f}s)")
+    print(f"   {format_latencies('요청 지연', latencies)}")
+    print(f"   {format_latencies(f'{probe_path} 지연', probe_latencies)} (평균 {statistics.mean(probe_latencies) * 1000:.1f}ms)")
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 요청 처리량 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = sub.add_parser("seed", help="벤치마크용 데이터 생성 (DATABASE_URL 사용)")
+    seed_parser.add_argument("--users", type=int, default=1000)
+    seed_parser.add_argument("--logs-per-user", type=int, default=200)
+
+    run_parser = sub.add_parser("run", help="실행 중인 서버에 부하 전송")
+    run_parser.add_argument("--url", default="http://localhost:8000")
+    run_parser.add_argument("--token", required=True)
+    run_parser.add_argument("--path", default="/api/chat/history")
+    run_parser.add_argument("--concurrency", type=int, default=32)
+    run_parser.add_argument("--requests", type=int, default=500)
+    run_parser.add_argument("--probe-path", default="/health")
+    run_parser.add_argument("--probe-interval", type=float, default=0.05)
+    run_parser.add_argument("--timeout", type=float, default=30, help="요청 타임아웃(초), 초과하면 실패로 집계")
+
+    args = parser.parse_args()
+    if args.command == "seed":
+        asyncio.run(seed(args.users, args.logs_per_user))
+    else:
+        asyncio.run(run(
+            args.url, args.token, args.path, args.concurrency,
+            args.requests, args.probe_path, args.probe_interval, args.timeout
+        ))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+
+# app.main은 import할 때 DATABASE_URL을 읽으므로 먼저 테스트용 SQLite 파일로 지정
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="llmlink-tests-"), "test.db"))
+os.environ.setdefault("DEBUG", "false")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import app.main as main  # noqa: E402
+
+def run_async(coro):
+    """새 이벤트 루프에서 실행하고 그 루프에 묶인 DB 연결 정리"""
+    async def wrapped():
+        try:
+            return await coro
+        finally:
+            await main.engine.dispose()
+    return asyncio.run(wrapped())
+
+@pytest.fixture
+def run():
+    """테이블을 비운 DB에서 코루틴을 실행하는 함수"""
+    async def reset():
+        async with main.engine.begin() as conn:
+            await conn.run_sync(main.Base.metadata.drop_all)
+        await main.create_tables()
+    run_async(reset())
+    return run_async
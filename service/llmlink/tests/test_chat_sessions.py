@@ -0,0 +1,102 @@
+import asyncio
+
+import httpx
+from sqlalchemy import delete, func, select
+
+from conftest import main
+
+async def add_user(name: str) -> int:
+    async with main.SessionLocal() as db:
+        user = main.User(google_uid=f"uid-{name}", email=f"{name}@example.com", name=name)
+        db.add(user)
+        await db.commit()
+        return user.id
+
+async def save_turn(user_id: int, session_id: str, question: str, answer: str):
+    async with main.SessionLocal() as db:
+        await main.save_chat_turn(db, user_id, session_id, question, answer)
+
+async def session_rows():
+    """비교용 (user_id, session_id, title, message_count, preview) 목록"""
+    async with main.SessionLocal() as db:
+        rows = (await db.scalars(
+            select(main.ChatSession).order_by(main.ChatSession.user_id, main.ChatSession.session_id)
+        )).all()
+    return [(r.user_id, r.session_id, r.title, r.message_count, r.last_message_preview) for r in rows]
+
+def test_turns_update_session_summary(run):
+    async def scenario():
+        user_id = await add_user("a")
+        await save_turn(user_id, "s1", "  오늘   날씨\n어때?  ", "맑아요")
+        await save_turn(user_id, "s1", "내일은?", "비가 와요")
+        await save_turn(user_id, "s2", "다른 질문", "다른 답")
+        async with main.SessionLocal() as db:
+            session = await db.scalar(select(main.ChatSession).where(main.ChatSession.session_id == "s1"))
+        assert await session_rows() == [
+            (user_id, "s1", "오늘 날씨 어때?", 4, "비가 와요"),
+            (user_id, "s2", "다른 질문", 2, "다른 답")
+        ]
+        assert session.first_message_at < session.last_message_at
+    run(scenario())
+
+def test_title_and_preview_are_truncated(run):
+    async def scenario():
+        user_id = await add_user("a")
+        await save_turn(user_id, "s1", "가" * 500, "나" * 1000)
+        [(_, _, title, _, preview)] = await session_rows()
+        assert title == "가" * main.settings.CHAT_SESSION_TITLE_CHARS
+        assert preview == "나" * main.settings.CHAT_SESSION_PREVIEW_CHARS
+    run(scenario())
+
+def test_concurrent_turns_do_not_lose_updates(run):
+    async def scenario():
+        user_id = await add_user("a")
+        await asyncio.gather(*(save_turn(user_id, "s1", f"질문 {i}", f"답 {i}") for i in range(20)))
+        async with main.SessionLocal() as db:
+            logs = await db.scalar(select(func.count(main.ChatLog.id)))
+        [(_, _, _, message_count, _)] = await session_rows()
+        assert logs == message_count == 40
+    run(scenario())
+
+def test_backfill_rebuilds_same_rows_and_is_idempotent(run):
+    async def scenario():
+        users = [await add_user(name) for name in ["a", "b", "c"]]
+        for i in range(12):
+            user_id = users[i % 3]
+            await save_turn(user_id, f"s{i % 2}", f"질문 {i}   끝", f"답 {i}")
+        incremental = await session_rows()
+
+        async with main.SessionLocal() as db:
+            await db.execute(delete(main.ChatSession))
+            await db.commit()
+        await main.backfill_chat_sessions(batch_size=2)
+        assert await session_rows() == incremental
+        await main.backfill_chat_sessions(batch_size=2)
+        assert await session_rows() == incremental
+    run(scenario())
+
+def test_session_list_is_ordered_and_paginated(run):
+    async def scenario():
+        user_id = await add_user("a")
+        other_id = await add_user("b")
+        for i in range(5):
+            await save_turn(user_id, f"s{i}", f"질문 {i}", f"답 {i}")
+        await save_turn(other_id, "other", "남의 질문", "남의 답")
+        await save_turn(user_id, "s1", "다시 질문", "다시 답")  # s1이 가장 최근
+
+        token = main.create_access_token({"user_id": user_id, "google_uid": "uid-a", "email": "a@example.com", "name": "a"})
+        transport = httpx.ASGITransport(app=main.app)
+        pages = []
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers={"Authorization": f"Bearer {token}"}) as client:
+            params = {"limit": 2}
+            while True:
+                response = await client.get("/api/chat/sessions", params=params)
+                assert response.status_code == 200
+                body = response.json()
+                pages.append([item["session_id"] for item in body["sessions"]])
+                if not body["has_more"]:
+                    assert body["next_cursor"] is None
+                    break
+                params = {"limit": 2, "cursor": body["next_cursor"]}
+        assert pages == [["s1", "s4"], ["s3", "s2"], ["s0"]]
+    run(scenario())
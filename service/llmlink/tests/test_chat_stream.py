@@ -0,0 +1,79 @@
+import json
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from conftest import main
+
+def ai_api_stub(*, status_code: int = 200, lines=(), fail_after=None):
+    """/api/chat/stream 스텁 - lines를 NDJSON으로 보내고, fail_after개를 보낸 뒤 연결이 끊긴 것처럼 실패"""
+    async def body():
+        for index, line in enumerate(lines):
+            if index == fail_after:
+                raise httpx.ReadError("connection reset")
+            yield (line if isinstance(line, str) else json.dumps(line)).encode() + b"\n"
+        if fail_after is not None and fail_after >= len(lines):
+            raise httpx.ReadError("connection reset")
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/api/chat/stream":
+            return httpx.Response(404)
+        if status_code != 200:
+            return httpx.Response(status_code, json={"detail": "busy"}, headers={"Retry-After": "3"})
+        return httpx.Response(200, content=body(), headers={"Content-Type": "application/x-ndjson"})
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://ai-api")
+
+async def stream_chat(monkeypatch, ai_api: httpx.AsyncClient, message: str = "안녕"):
+    """스트리밍 채팅 후 (SSE 이벤트 목록, 저장된 (role, message) 목록, 다음 요청에 보낼 이전 대화)"""
+    monkeypatch.setattr(main.http_clients, "get", lambda name: ai_api)
+    async with main.SessionLocal() as db:
+        user = main.User(google_uid="uid-a", email="a@example.com", name="a")
+        db.add(user)
+        await db.commit()
+    token = main.create_access_token(main.identity_claims(user))
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/chat/stream", json={"message": message, "session_id": "s1"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+    await ai_api.aclose()
+    events = [json.loads(line[len("data: "):]) for line in response.text.split("\n\n") if line.startswith("data: ")]
+    async with main.SessionLocal() as db:
+        logs = (await db.execute(select(main.ChatLog.role, main.ChatLog.message).order_by(main.ChatLog.id))).all()
+        history = await main.session_memory.history(db, user.id, "s1")
+    return events, [tuple(log) for log in logs], [(turn["role"], turn["content"]) for turn in history]
+
+@pytest.fixture(autouse=True)
+def isolated_memory(monkeypatch):
+    monkeypatch.setattr(main.settings, "SESSION_MEMORY_ENABLED", True)
+    monkeypatch.setattr(main, "session_memory", main.SessionMemory(token_budget=2000, max_turns=20, max_sessions=10))
+
+def test_tokens_are_streamed_and_saved(run, monkeypatch):
+    ai_api = ai_api_stub(lines=[{"response": "안녕"}, {"response": "하세요"}, {"done": True}])
+    events, logs, history = run(stream_chat(monkeypatch, ai_api))
+    assert events == [{"token": "안녕"}, {"token": "하세요"}, {"done": True, "message": "안녕하세요", "session_id": "s1"}]
+    assert logs == history == [("user", "안녕"), ("assistant", "안녕하세요")]
+
+def test_busy_ai_api_sends_error_event_and_saves_nothing(run, monkeypatch):
+    events, logs, history = run(stream_chat(monkeypatch, ai_api_stub(status_code=429)))
+    assert events == [{"error": main.AI_BUSY_MESSAGE, "session_id": "s1"}]
+    assert logs == history == []
+
+@pytest.mark.parametrize("lines, fail_after", [
+    ([{"response": "부분 "}, {"response": "응답"}, {"error": "model crashed"}], None),
+    ([{"response": "부분 "}, {"response": "응답"}, "{not json"], None),
+    ([{"response": "부분 "}, {"response": "응답"}], 2),
+])
+def test_failure_mid_stream_sends_error_event_and_saves_only_model_output(run, monkeypatch, lines, fail_after):
+    events, logs, history = run(stream_chat(monkeypatch, ai_api_stub(lines=lines, fail_after=fail_after)))
+    assert events[:2] == [{"token": "부분 "}, {"token": "응답"}]
+    assert len(events) == 3 and events[2]["session_id"] == "s1" and events[2]["error"]
+    assert "done" not in events[2]
+    assert logs == history == [("user", "안녕"), ("assistant", "부분 응답")]
+
+def test_connection_failure_before_any_token_saves_nothing(run, monkeypatch):
+    events, logs, history = run(stream_chat(monkeypatch, ai_api_stub(lines=[], fail_after=0)))
+    assert [list(event) for event in events] == [["error", "session_id"]]
+    assert logs == history == []
@@ -0,0 +1,161 @@
+import asyncio
+import zlib
+
+import httpx
+import numpy as np
+from sqlalchemy import func, insert, select
+
+from conftest import main
+
+class FakeEmbedder:
+    """글자 단위 해시 벡터 (같은 글은 같은 벡터) - 호출마다 텍스트 수 기록"""
+
+    model = "fake-embed"
+
+    def __init__(self, dim: int = 16, gate: asyncio.Event = None):
+        self.dim = dim
+        self.gate = gate
+        self.calls = []
+
+    async def embed(self, texts):
+        self.calls.append(len(texts))
+        if self.gate is not None:
+            await self.gate.wait()
+        await asyncio.sleep(0)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for char in text:
+                vectors[row, zlib.crc32(char.encode()) % self.dim] += 1
+        return vectors
+
+async def add_context_rows(user_id: int, contents, importance: int = 3) -> list:
+    async with main.SessionLocal() as db:
+        if await db.get(main.User, user_id) is None:
+            db.add(main.User(id=user_id, google_uid=f"uid-{user_id}", email=f"{user_id}@example.com", name=str(user_id)))
+            await db.flush()
+        ids = (await db.scalars(insert(main.UserContextData).returning(main.UserContextData.id), [
+            {"user_id": user_id, "data_type": "diary", "title": "일기", "content": content, "importance_score": importance}
+            for content in contents
+        ])).all()
+        await db.commit()
+    return list(ids)
+
+async def stored_embeddings() -> int:
+    async with main.SessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(main.ContextEmbedding))
+
+def make_queue(embedder: FakeEmbedder, batch_size: int = 8):
+    retriever = main.ContextRetriever(embedder, max_vectors=10000)
+    return retriever, main.ContextEmbeddingQueue(retriever, batch_size)
+
+def test_chat_search_never_embeds_context_rows(run):
+    embedder = FakeEmbedder()
+    retriever, _ = make_queue(embedder)
+
+    async def scenario():
+        await add_context_rows(1, [f"일기 {i}" for i in range(50)])
+        async with main.SessionLocal() as db:
+            assert await retriever.search(db, 1, "공원", k=5) is None
+        assert await stored_embeddings() == 0
+    run(scenario())
+    assert embedder.calls == []  # 임베딩이 하나도 없으면 질문도 임베딩하지 않고 기본 정렬로 대체
+
+def test_backfill_embeds_existing_rows_in_batches_on_start(run):
+    embedder = FakeEmbedder()
+    retriever, queue = make_queue(embedder, batch_size=8)
+
+    async def scenario():
+        await add_context_rows(1, [f"일기 {i}" for i in range(12)])
+        await add_context_rows(2, [f"메모 {i}" for i in range(5)])
+        queue.start()
+        try:
+            await queue.join()
+        finally:
+            await queue.close()
+        assert await stored_embeddings() == 17
+        async with main.SessionLocal() as db:
+            assert (await retriever.load_index(db, 1)).size == 12
+            assert (await retriever.load_index(db, 2)).size == 5
+    run(scenario())
+    assert embedder.calls == [8, 8, 1]
+    assert (queue.embedded, queue.batches, queue.failed) == (17, 3, 0)
+
+def test_queued_rows_are_added_to_the_loaded_index(run):
+    embedder = FakeEmbedder()
+    retriever, queue = make_queue(embedder)
+
+    async def scenario():
+        queue.start()
+        try:
+            queue.enqueue(await add_context_rows(1, ["산책한 날", "비 오는 날"]))
+            await queue.join()
+            async with main.SessionLocal() as db:
+                index = await retriever.load_index(db, 1)
+                assert index.size == 2
+                new_ids = await add_context_rows(1, ["공원에서 자전거"], importance=5)
+                queue.enqueue(new_ids + new_ids)  # 같은 행을 두 번 넣어도 한 번만 계산
+                await queue.join()
+                assert await retriever.load_index(db, 1) is index and index.size == 3
+                [found] = await retriever.search(db, 1, "공원에서 자전거", k=1)
+                assert found.id == new_ids[0]
+        finally:
+            await queue.close()
+    run(scenario())
+    assert queue.embedded == 3
+
+def test_store_is_idempotent_under_concurrent_writers(run):
+    embedder = FakeEmbedder()
+    first, _ = make_queue(embedder)
+    second, _ = make_queue(embedder)
+
+    async def store(retriever, entries):
+        async with main.SessionLocal() as db:
+            await retriever._store(db, entries, await embedder.embed([entry.content for entry in entries]))
+
+    async def scenario():
+        ids = await add_context_rows(1, ["하나", "둘", "셋"])
+        async with main.SessionLocal() as db:
+            entries = (await db.execute(
+                select(main.UserContextData.id, main.UserContextData.user_id, main.UserContextData.content)
+                .where(main.UserContextData.id.in_(ids))
+            )).all()
+        # 두 프로세스가 같은 행을 동시에 계산해서 저장하는 경우
+        await asyncio.gather(store(first, entries), store(second, entries[:2]))
+        await store(first, entries)
+        assert await stored_embeddings() == 3
+    run(scenario())
+
+def test_import_queues_embeddings_without_waiting_for_them(run, monkeypatch):
+    gate = asyncio.Event()
+    embedder = FakeEmbedder(gate=gate)
+    retriever, queue = make_queue(embedder, batch_size=4)
+    monkeypatch.setattr(main, "context_embedding_queue", queue)
+    monkeypatch.setattr(main.settings, "DIARY_IMPORT_BATCH_SIZE", 3)
+    lines = "\n".join(f'{{"diary": "가져온 일기 {i}", "date": "2024-01-{i + 1:02d}"}}' for i in range(7))
+
+    async def scenario():
+        async with main.SessionLocal() as db:
+            user = main.User(google_uid="uid-a", email="a@example.com", name="a")
+            db.add(user)
+            await db.commit()
+        token = main.create_access_token(main.identity_claims(user))
+        queue.start()
+        try:
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post(
+                    "/api/diary/import", content=lines.encode(),
+                    headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"}
+                )
+            assert response.json()["imported"] == 7
+            # 임베딩이 막혀 있어도 응답은 먼저 돌아옴
+            assert await stored_embeddings() == 0
+            gate.set()
+            await queue.join()
+        finally:
+            await queue.close()
+        assert await stored_embeddings() == 7
+        async with main.SessionLocal() as db:
+            assert (await retriever.load_index(db, user.id)).size == 7
+    run(scenario())
+    assert queue.enqueued == 7
@@ -0,0 +1,151 @@
+"""구글 ID 토큰 로컬 검증기 (JWKS 공개키 캐시)
+
+gateway/googleauth, service/googleauth가 같은 코드를 씁니다.
+서비스마다 app/main.py 한 파일로 배포하므로 import하지 않고 아래 표시 이후 부분을 각 main.py에 복사해 둡니다.
+여기서 고친 뒤 `python shared/sync.py`로 복사본을 갱신합니다.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import jwt
+from jwt.exceptions import InvalidTokenError
+
+# --- 복사 시작 ---
+class GoogleIdTokenVerifier:
+    """구글 ID 토큰 서명/클레임을 캐시된 JWKS 공개키로 검증
+
+    공개키는 응답의 Cache-Control max-age에 맞춰 백그라운드에서 갱신하고,
+    모르는 kid의 토큰이 오면(키 교체 직후) min_refresh_interval마다 최대 한 번 바로 다시 가져옵니다.
+    갱신이 실패하면 마지막으로 받은 키로 계속 검증합니다.
+    이메일이 들어 있는 토큰은 구글이 소유를 확인한 이메일(email_verified)일 때만 통과시킵니다.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        http_client: Callable[[], httpx.AsyncClient],
+        audience: str,
+        issuers: List[str],
+        default_max_age: float,
+        min_refresh_interval: float,
+        leeway: float = 30
+    ):
+        self.jwks_url = jwks_url
+        self.http_client = http_client
+        self.audience = audience
+        self.issuers = issuers
+        self.default_max_age = default_max_age
+        self.min_refresh_interval = min_refresh_interval
+        self.leeway = leeway
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._expires_at = 0.0
+        self._last_fetch = float("-inf")
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.fallback_fetches = 0
+        self.verified = 0
+        self.rejected = 0
+
+    def _max_age(self, headers: httpx.Headers) -> float:
+        for directive in headers.get("cache-control", "").split(","):
+            name, _, value = directive.strip().partition("=")
+            if name.lower() == "max-age" and value.isdigit():
+                age = headers.get("age", "")
+                return max(self.min_refresh_interval, int(value) - (int(age) if age.isdigit() else 0))
+        return self.default_max_age
+
+    async def _fetch(self) -> bool:
+        self._last_fetch = time.monotonic()
+        try:
+            response = await self.http_client().get(self.jwks_url)
+            response.raise_for_status()
+            keys = {}
+            for jwk in response.json().get("keys", []):
+                try:
+                    key = jwt.PyJWK(jwk)
+                except jwt.exceptions.PyJWKError:
+                    continue
+                if key.key_id:
+                    keys[key.key_id] = key
+            if not keys:
+                raise ValueError("JWKS에 사용할 수 있는 키가 없습니다")
+        except Exception as e:
+            self.refresh_failures += 1
+            print(f"⚠️ 구글 공개키(JWKS) 갱신 실패, 기존 키 {len(self._keys)}개로 계속 검증: {e}")
+            return False
+        
+        self._keys = keys
+        self._expires_at = time.monotonic() + self._max_age(response.headers)
+        self.refreshes += 1
+        return True
+
+    async def refresh(self) -> bool:
+        async with self._lock:
+            return await self._fetch()
+
+    async def _run(self):
+        while True:
+            await self.refresh()
+            # 만료 시각에 갱신, 실패했으면 min_refresh_interval 뒤에 다시 시도
+            await asyncio.sleep(max(self.min_refresh_interval, self._expires_at - time.monotonic()))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _key_for(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+        async with self._lock:
+            # 진행 중인 갱신이 끝나길 기다린 뒤 다시 확인 (최근에 가져왔으면 재요청하지 않음)
+            if kid not in self._keys and time.monotonic() - self._last_fetch >= self.min_refresh_interval:
+                self.fallback_fetches += 1
+                await self._fetch()
+        return self._keys.get(kid)
+
+    async def verify(self, id_token: str) -> Dict[str, Any]:
+        """검증된 ID 토큰 클레임 반환 (실패하면 InvalidTokenError)"""
+        try:
+            kid = jwt.get_unverified_header(id_token).get("kid")
+            key = await self._key_for(kid)
+            if key is None:
+                raise InvalidTokenError(f"알 수 없는 서명 키: {kid}")
+            claims = jwt.decode(
+                id_token,
+                key.key,
+                algorithms=["RS256"],
+                audience=self.audience,
+                leeway=self.leeway,
+                options={"require": ["exp", "iat", "iss", "aud", "sub"]}
+            )
+            if claims["iss"] not in self.issuers:
+                raise InvalidTokenError(f"잘못된 발급자: {claims['iss']}")
+            # 확인되지 않은 이메일은 남의 이메일일 수 있으므로 신뢰하지 않음 (구버전 토큰은 문자열 "true")
+            if "email" in claims and claims.get("email_verified") not in (True, "true"):
+                raise InvalidTokenError(f"인증되지 않은 이메일: {claims['email']}")
+        except InvalidTokenError:
+            self.rejected += 1
+            raise
+        self.verified += 1
+        return claims
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "keys": sorted(self._keys),
+            "expires_in": round(self._expires_at - time.monotonic(), 1) if self._keys else None,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "fallback_fetches": self.fallback_fetches,
+            "verified": self.verified,
+            "rejected": self.rejected
+        }
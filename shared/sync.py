@@ -0,0 +1,82 @@
+"""
+shared/의 공유 코드를 각 서비스 app/main.py에 복사
+- 서비스는 app/main.py 한 파일로 실행/배포하므로(python app/main.py, uvicorn app.main:app) 공유 코드를 import하지 않고 복사본을 둠
+- 공유 파일의 `# --- 복사 시작 ---` 아래 부분을 각 main.py의 `# >>> shared/<파일>` ~ `# <<< shared/<파일>` 사이에 덮어씀
+- --check 를 주면 파일은 건드리지 않고, 복사본이 공유 파일과 다르면 실패
+
+사용 예 (저장소 루트에서 실행):
+    python shared/sync.py
+    python shared/sync.py --check
+"""
+
+import argparse
+import os
+import sys
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 공유 파일 -> 복사본을 둔 서비스
+SHARED = {
+    "upstream_clients.py": [
+        "ai_api/app/main.py",
+        "gateway/googleauth/app/main.py",
+        "service/googleauth/app/main.py",
+        "service/llmlink/app/main.py",
+    ],
+    "google_id_token.py": [
+        "gateway/googleauth/app/main.py",
+        "service/googleauth/app/main.py",
+    ],
+}
+
+COPY_MARKER = "# --- 복사 시작 ---\n"
+
+def shared_block(name: str) -> str:
+    with open(os.path.join(ROOT, "shared", name), encoding="utf-8") as f:
+        text = f.read()
+    if COPY_MARKER not in text:
+        raise ValueError(f"shared/{name}에 '{COPY_MARKER.strip()}' 표시가 없습니다")
+    return text.split(COPY_MARKER, 1)[1]
+
+def markers(name: str):
+    return (
+        f"# >>> shared/{name} 복사본 (직접 수정 금지 - shared/에서 고친 뒤 python shared/sync.py 실행)\n",
+        f"# <<< shared/{name}\n"
+    )
+
+def sync(check: bool = False) -> List[str]:
+    """복사본 갱신 (check면 갱신하지 않음). 공유 파일과 달랐던 복사본 목록 반환"""
+    outdated = []
+    for name, targets in SHARED.items():
+        block = shared_block(name)
+        start, end = markers(name)
+        for target in targets:
+            path = os.path.join(ROOT, target)
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            if start not in text or end not in text:
+                raise ValueError(f"{target}에 shared/{name} 복사 위치 표시가 없습니다")
+            before, rest = text.split(start, 1)
+            current, after = rest.split(end, 1)
+            if current == block:
+                continue
+            outdated.append(target)
+            if not check:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(before + start + block + end + after)
+    return outdated
+
+def main():
+    parser = argparse.ArgumentParser(description="shared/의 공유 코드를 각 서비스 main.py에 복사")
+    parser.add_argument("--check", action="store_true", help="복사본이 공유 파일과 다르면 실패 (파일은 수정하지 않음)")
+    args = parser.parse_args()
+    outdated = sync(args.check)
+    for target in outdated:
+        print(f"{'❌ 다름' if args.check else '✅ 갱신'}: {target}")
+    if not outdated:
+        print("✅ 모든 복사본이 최신입니다")
+    sys.exit(1 if args.check and outdated else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.exceptions import InvalidTokenError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from google_id_token import GoogleIdTokenVerifier  # noqa: E402
+
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+ISSUER = "https://accounts.google.com"
+
+class FakeGoogle:
+    """JWKS 응답 + ID 토큰 발급 (키를 바꿔 가며 테스트)"""
+
+    def __init__(self):
+        self.keys = {}
+        self.fetches = 0
+        self.rotate()
+
+    def rotate(self) -> str:
+        kid = f"key-{len(self.keys) + 1}"
+        self.keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        return kid
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.fetches += 1
+        keys = []
+        for kid, key in self.keys.items():
+            jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key()))
+            keys.append({**jwk, "kid": kid, "alg": "RS256", "use": "sig"})
+        return httpx.Response(200, json={"keys": keys}, headers={"Cache-Control": "public, max-age=3600"})
+
+    def token(self, kid: str = "key-1", **claims) -> str:
+        now = int(time.time())
+        payload = {
+            "iss": ISSUER, "aud": CLIENT_ID, "sub": "1234", "iat": now, "exp": now + 600,
+            "email": "user@example.com", "email_verified": True, **claims
+        }
+        payload = {name: value for name, value in payload.items() if value is not None}
+        return jwt.encode(payload, self.keys[kid], algorithm="RS256", headers={"kid": kid})
+
+def verify(google: FakeGoogle, *tokens):
+    """토큰들을 차례로 검증해서 (클레임 또는 예외) 목록 반환 (함수를 주면 첫 키 조회 뒤에 토큰 생성)"""
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(google.handler))
+        verifier = GoogleIdTokenVerifier(
+            jwks_url="https://www.googleapis.com/oauth2/v3/certs",
+            http_client=lambda: client,
+            audience=CLIENT_ID,
+            issuers=[ISSUER, "accounts.google.com"],
+            default_max_age=3600,
+            min_refresh_interval=0
+        )
+        await verifier.refresh()
+        results = []
+        for token in tokens:
+            try:
+                results.append(await verifier.verify(token() if callable(token) else token))
+            except InvalidTokenError as e:
+                results.append(e)
+        await client.aclose()
+        return results
+    return asyncio.run(run())
+
+@pytest.fixture(scope="module")
+def google():
+    return FakeGoogle()
+
+def test_accepts_token_with_verified_email(google):
+    [claims] = verify(google, google.token())
+    assert claims["email"] == "user@example.com"
+
+@pytest.mark.parametrize("email_verified", [False, "false", None])
+def test_rejects_unverified_email(google, email_verified):
+    [result] = verify(google, google.token(email_verified=email_verified))
+    assert isinstance(result, InvalidTokenError)
+
+def test_accepts_legacy_string_email_verified(google):
+    [claims] = verify(google, google.token(email_verified="true"))
+    assert claims["sub"] == "1234"
+
+def test_rejects_wrong_audience_issuer_and_expired(google):
+    results = verify(
+        google,
+        google.token(aud="someone-else"),
+        google.token(iss="https://evil.example.com"),
+        google.token(exp=int(time.time()) - 3600)
+    )
+    assert all(isinstance(result, InvalidTokenError) for result in results)
+
+def test_refetches_keys_for_unknown_kid():
+    google = FakeGoogle()
+    # 첫 조회 뒤 키가 바뀌면 모르는 kid로 한 번 더 가져와서 검증
+    [claims] = verify(google, lambda: google.token(kid=google.rotate()))
+    assert claims["sub"] == "1234"
+    assert google.fetches == 2
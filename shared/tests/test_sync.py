@@ -0,0 +1,25 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import sync  # noqa: E402
+
+def test_service_copies_match_shared_files():
+    assert sync.sync(check=True) == []
+
+def test_sync_rewrites_only_between_markers(tmp_path, monkeypatch):
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "shared" / "helper.py").write_text("import os\n\n# --- 복사 시작 ---\ndef helper():\n    return 2\n", encoding="utf-8")
+    start, end = sync.markers("helper.py")
+    target = tmp_path / "main.py"
+    target.write_text(f"before = 1\n{start}def helper():\n    return 1\n{end}after = 3\n", encoding="utf-8")
+    monkeypatch.setattr(sync, "ROOT", str(tmp_path))
+    monkeypatch.setattr(sync, "SHARED", {"helper.py": ["main.py"]})
+
+    assert sync.sync(check=True) == ["main.py"]
+    assert "return 1" in target.read_text(encoding="utf-8")
+
+    assert sync.sync() == ["main.py"]
+    assert target.read_text(encoding="utf-8") == f"before = 1\n{start}def helper():\n    return 2\n{end}after = 3\n"
+    assert sync.sync(check=True) == []
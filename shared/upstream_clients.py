@@ -0,0 +1,74 @@
+"""업스트림별 공유 httpx 클라이언트 풀
+
+ai_api, gateway/googleauth, service/googleauth, service/llmlink가 같은 코드를 씁니다.
+서비스마다 app/main.py 한 파일로 배포하므로 import하지 않고 아래 표시 이후 부분을 각 main.py에 복사해 둡니다.
+여기서 고친 뒤 `python shared/sync.py`로 복사본을 갱신합니다.
+"""
+
+from typing import Any, Dict
+
+import httpx
+
+# --- 복사 시작 ---
+def http2_supported() -> bool:
+    """h2 패키지가 설치된 경우에만 HTTP/2 사용 (TLS 업스트림에서만 협상됨)"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class UpstreamClientPool:
+    """업스트림별로 keep-alive 연결을 재사용하는 httpx.AsyncClient 관리"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._limits: Dict[str, httpx.Limits] = {}
+        self._requests: Dict[str, int] = {}
+
+    def register(self, name: str, timeout: httpx.Timeout, limits: httpx.Limits, base_url: str = ""):
+        async def count_request(request: httpx.Request):
+            self._requests[name] += 1
+
+        self._requests[name] = 0
+        self._limits[name] = limits
+        self._clients[name] = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=limits,
+            http2=http2_supported(),
+            event_hooks={"request": [count_request]}
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None:
+            raise RuntimeError(f"HTTP 클라이언트 '{name}'이(가) 초기화되지 않았습니다")
+        return client
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """업스트림별 연결 풀 상태 (모니터링용)"""
+        result = {}
+        for name, client in self._clients.items():
+            pool = getattr(client._transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            limits = self._limits[name]
+            result[name] = {
+                "base_url": str(client.base_url) or None,
+                "http2_enabled": http2_supported(),
+                "requests_total": self._requests[name],
+                "connections": len(connections),
+                "idle_connections": sum(1 for conn in connections if conn.is_idle()),
+                "http2_connections": sum(
+                    1 for conn in connections if "HTTP/2" in conn.info()
+                ),
+                "max_connections": limits.max_connections,
+                "max_keepalive_connections": limits.max_keepalive_connections,
+                "keepalive_expiry": limits.keepalive_expiry
+            }
+        return result